@@ -0,0 +1,176 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import concurrent.futures
+import json
+import logging
+import threading
+import time
+import requests
+from ftd_api.concurrency import THROTTLE_STATUS_CODES
+
+# Supported batch actions, the names match the actions used in import/export records
+BATCH_ACTIONS = ('CREATE', 'EDIT', 'DELETE')
+# A CREATE (POST) is not idempotent, it is only retried on the statuses the device answers
+# without applying the request.  A 503 may come from a proxy after the POST was applied.
+CREATE_RETRY_STATUS_CODES = (423, 429)
+
+
+class BatchOperation:
+    """
+    A single object operation.
+
+    CREATE posts data to url (the collection, e.g. /object/networks)
+    EDIT puts data to url/<data['id']>
+    DELETE deletes url/<object_id> (object_id defaults to data['id'])
+    """
+
+    def __init__(self, action, url, data=None, object_id=None):
+        """
+        Parameters:
+
+        action -- One of CREATE, EDIT or DELETE
+        url -- The collection URL after the FTD-API base (/api/fdm/latest)
+        data -- The object (required for CREATE and EDIT)
+        object_id -- Id of the object to delete if data is not passed
+        """
+        if action not in BATCH_ACTIONS:
+            raise Exception(f'Unknown batch action: {action}')
+        if action in ('CREATE', 'EDIT') and data is None:
+            raise Exception(f'{action} requires the object data')
+        if object_id is None and data is not None:
+            object_id = data.get('id')
+        if action in ('EDIT', 'DELETE') and object_id is None:
+            raise Exception(f'{action} requires the id of the object')
+        self.action = action
+        self.url = url
+        self.data = data
+        self.object_id = object_id
+
+    def get_object_url(self):
+        """
+        Return the URL the request for this operation is sent to
+        """
+        if self.action == 'CREATE':
+            return self.url
+        return f"{self.url.rstrip('/')}/{self.object_id}"
+
+
+class BatchExecutor:
+    """
+    This class applies a list of object operations concurrently with a bounded number of
+    workers.  Requests failing with a connection error or an overload status (423/429/503)
+    are retried with an exponential backoff.  CREATE operations are only retried on 423/429,
+    after a connection error the object may or may not have been created so the operation
+    fails rather than risk a duplicate.  Every operation gets a result record; with
+    stop_on_first_error the operations not yet started when the first one fails are skipped,
+    otherwise all operations are attempted and all errors collected.
+    """
+
+    def __init__(self, client, max_workers=8, retries=3, retry_delay=1.0, stop_on_first_error=False):
+        """
+        Parameters:
+
+        client -- Logged in FTDClient (shared by the workers)
+        max_workers -- Maximum number of operations in progress at the same time
+        retries -- Number of times a retryable failure is retried
+        retry_delay -- Seconds to wait before the first retry, doubled for each further retry
+        stop_on_first_error -- If True skip the remaining operations after the first failure
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.stop_on_first_error = stop_on_first_error
+
+    def _send(self, operation):
+        """
+        Helper to send the request of a single operation
+        """
+        url = operation.get_object_url()
+        if operation.action == 'CREATE':
+            return self.client.do_post_raw_with_base_url(url, json.dumps(operation.data))
+        elif operation.action == 'EDIT':
+            return self.client.do_put_raw_with_base_url(url, json.dumps(operation.data))
+        return self.client.do_delete_raw_with_base_url(url)
+
+    def _run_operation(self, index, operation, stop_event):
+        """
+        Run a single operation with retries returning its result record
+        """
+        result = {
+            'index': index,
+            'action': operation.action,
+            'url': operation.get_object_url(),
+            'status': 'SKIPPED',
+            'status_code': None,
+            'attempts': 0,
+            'response': None,
+            'error': None
+        }
+        if stop_event.is_set():
+            return result
+        retry_status_codes = CREATE_RETRY_STATUS_CODES if operation.action == 'CREATE' else THROTTLE_STATUS_CODES
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+            result['attempts'] = attempt + 1
+            try:
+                response = self._send(operation)
+            except (requests.exceptions.ConnectionError, ConnectionError) as err:
+                if operation.action == 'CREATE':
+                    result['error'] = f'Connection error, the object may or may not have been created: {err}'
+                    break
+                result['error'] = f'Connection error: {err}'
+                continue
+            result['status_code'] = response.status_code
+            if response.status_code in retry_status_codes:
+                result['error'] = f'Device busy: {response.status_code}'
+                continue
+            if response.status_code in THROTTLE_STATUS_CODES:
+                result['error'] = f'Device busy, the object may or may not have been created: {response.status_code}'
+                break
+            if 200 <= response.status_code < 300:
+                result['status'] = 'SUCCESS'
+                result['error'] = None
+                if response.content:
+                    result['response'] = response.json()
+                return result
+            # Anything else (validation errors, missing objects...) will not get better with a retry
+            result['error'] = response.text
+            break
+        result['status'] = 'FAILED'
+        logging.error(f"{operation.action} {result['url']} failed: {result['error']}")
+        if self.stop_on_first_error:
+            stop_event.set()
+        return result
+
+    def run(self, operation_list):
+        """
+        Apply the operations
+
+        Parameters:
+
+        operation_list -- List of BatchOperation
+
+        Return is the list of result records in the order of the operations.  Each record has
+        index, action, url, status (SUCCESS, FAILED or SKIPPED), status_code, attempts,
+        response (the parsed response body) and error.
+        """
+        stop_event = threading.Event()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_operation, index, operation, stop_event)
+                       for index, operation in enumerate(operation_list)]
+            result_list = [future.result() for future in futures]
+        failed = len([x for x in result_list if x['status'] == 'FAILED'])
+        skipped = len([x for x in result_list if x['status'] == 'SKIPPED'])
+        logging.info(f'Batch complete: {len(result_list) - failed - skipped} succeeded, {failed} failed, {skipped} skipped')
+        return result_list
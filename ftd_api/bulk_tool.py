@@ -11,19 +11,96 @@ updated
 '''
 from ftd_api import parse_json
 from ftd_api import parse_csv
+from ftd_api import config_diff
+from ftd_api.config_index import ConfigIndex
+from ftd_api.reference_graph import ReferenceGraph
+from ftd_api.compact import CompactLoader
+from ftd_api.offset_index import scan_array_records
+from ftd_api.reference_resolver import ReferenceResolver
+from ftd_api.csv_schema import ColumnTypeIndex
+from ftd_api.compact import compact_json_default
 from ftd_api.parse_json import pretty_print_json_file
 from ftd_api.file_helper import read_string_from_file
 from ftd_api.parse_yaml import write_dict_to_yaml_file
 from ftd_api.parse_yaml import read_yaml_to_dict
+from ftd_api.parse_yaml import write_dict_list_to_yaml_stream
+from ftd_api.parse_yaml import read_yaml_stream
+from ftd_api.parse_yaml import YamlStreamWriter
+from ftd_api.parse_ndjson import write_dict_list_to_ndjson_file
+from ftd_api.parse_ndjson import read_ndjson_file
+from ftd_api.parse_ndjson import NdjsonStreamWriter
 from ftd_api.file_helper import print_string_to_file
+from ftd_api.metrics import JobPhaseTimer
+from ftd_api.tracing import traced
 from requests.exceptions import ConnectionError
+import concurrent.futures
+import queue
+import threading
 import time
 import json
+import mmap
 import random
+import re
 import logging
 import os.path
+import tempfile
 import zipfile
 
+# Name of the config file found inside the export zip for each export type
+EXPORT_CONFIG_FILE_NAMES = {
+    'FULL_EXPORT': 'full_config.txt',
+    'PENDING_CHANGE_EXPORT': 'pending_change_config.txt',
+    'PARTIAL_EXPORT': 'partial_config.txt'
+}
+
+# File name used to keep the prior export snapshot for incremental exports
+EXPORT_SNAPSHOT_FILE_NAME = 'export_snapshot.json'
+
+# File name the added/changed/removed sets of an incremental export are written to
+EXPORT_CHANGES_FILE_NAME = 'export_changes.json'
+
+# File extension used for each output format
+FORMAT_FILE_EXTENSIONS = {
+    'CSV': '.csv',
+    'JSON': '.json',
+    'YAML': '.yaml',
+    'YAML_STREAM': '.yaml',
+    'NDJSON': '.ndjson'
+}
+
+
+def _load_import_file(input_format, input_file, compact=False):
+    """
+    Helper to parse a single import file, this is module level so it can be run in a process pool
+
+    Parameters:
+
+    input_format -- enum (JSON | CSV | YAML | YAML_STREAM | NDJSON)
+    input_file -- The file to parse
+    compact -- If True the records are loaded in the compact form (see CompactLoader)
+
+    Return is a tuple of the parsed list of records and the time taken to parse in seconds
+    """
+    start_time = time.time()
+    if input_format == 'CSV':
+        file_object_list = parse_csv.parse_csv_to_dict(input_file)
+    elif input_format == 'JSON':
+        if compact:
+            file_object_list = CompactLoader().loads(read_string_from_file(input_file))
+        else:
+            file_object_list = json.loads(read_string_from_file(input_file))
+    elif input_format == 'YAML':
+        file_object_list = read_yaml_to_dict(input_file)
+    elif input_format == 'YAML_STREAM':
+        file_object_list = list(read_yaml_stream(input_file))
+    elif input_format == 'NDJSON':
+        file_object_list = list(read_ndjson_file(input_file))
+    else:
+        raise Exception(f'Unsupported import format: {input_format}')
+    if compact and input_format != 'JSON':
+        file_object_list = CompactLoader().compact(file_object_list)
+    return file_object_list, time.time() - start_time
+
 
 class BulkTool:
 
@@ -35,6 +112,20 @@ class BulkTool:
         """
         # Instantiate an FTD client
         self.client = client
+        # Lazily built object type -> single object URL index (see get_type_url_index)
+        self._type_url_index = None
+        # Name to id maps of referenced types kept for the session (see get_reference_resolver)
+        self._reference_resolver = None
+        # The OpenAPI spec and the CSV column types derived from it, fetched/built on first use
+        self._openapi_spec = None
+        self._column_type_index = None
+
+    @property
+    def tracer(self):
+        """
+        The tracer of the client, phases of the bulk operations are recorded as spans with it
+        """
+        return self.client.tracer
         
     def _do_get_export_job_status(self, job_history_uuid):
         """
@@ -64,6 +155,7 @@ class BulkTool:
         """
         return self.client.do_get_raw_with_base_url(f'/jobs/configimportstatus/{str(job_history_id)}')
 
+    @traced('_do_import_file')
     def _do_import_file(self, file_name, entity_filter_list=None):
         """
         This method will do the actual import of the configuration file
@@ -86,6 +178,7 @@ class BulkTool:
         if response.status_code == 200:
             #success case
             response_json = response.json()
+            job_timer = JobPhaseTimer()
             # Now that we have successfully scheduled it let's check for status on the job
             while True:
                 try:
@@ -96,8 +189,18 @@ class BulkTool:
                     time.sleep(1)
                     continue
                 # IN_PROGRESS and QUEUED are the two "working states" where it will still do more work
+                if status.status_code == 200:
+                    job_timer.observe(status.json()['status'])
                 if status.status_code == 200 and status.json()['status'] not in ('IN_PROGRESS', 'QUEUED'):
                     # 200 and not in progress is a terminal state
+                    span = self.tracer.current_span()
+                    span.set_attribute('queued_seconds', job_timer.phase_seconds['QUEUED'])
+                    span.set_attribute('in_progress_seconds', job_timer.phase_seconds['IN_PROGRESS'])
+                    span.set_attribute('status', status.json()['status'])
+                    self.client.metrics.record_job('configimport',
+                                                   job_timer.phase_seconds['QUEUED'],
+                                                   job_timer.phase_seconds['IN_PROGRESS'],
+                                                   status.json()['status'])
                     return status.json()
                 elif (status.status_code == 200 and status.json()['status'] in ('IN_PROGRESS', 'QUEUED')) or status.status_code in (423, 503):
                     # Two cases here:
@@ -115,6 +218,7 @@ class BulkTool:
 
 
 
+    @traced('_do_get_download_file')
     def _do_get_download_file(self, export_file_name, save_file_name):
         """
         Method to fetch export file by the name provided in the status call where it will
@@ -131,6 +235,7 @@ class BulkTool:
             with open(save_file_name, 'wb') as filehandle:
                 for chunk in response:
                     filehandle.write(chunk)
+            self.tracer.current_span().set_attribute('bytes', os.path.getsize(save_file_name))
         else:
             raise Exception('Error downloading config file code: '+response.status_code)
 
@@ -163,6 +268,7 @@ class BulkTool:
                 entity_filter_list.append('name=' + objname)
         return entity_filter_list
 
+    @traced('_do_download_export_file')
     def _do_download_export_file(self, export_file_name='/tmp/export.zip',  
                                  id_list=None, type_list=None, name_list=None, 
                                  export_type='FULL_EXPORT'):
@@ -200,6 +306,7 @@ class BulkTool:
             # Success get job status
             job_history_uuid = response.json()['jobHistoryUuid']
             job_status_response = None
+            job_timer = JobPhaseTimer()
 
             # Spin until job is done
             while True:
@@ -207,8 +314,17 @@ class BulkTool:
                     # Sleep two seconds so we don't spin too fast
                     time.sleep(2)
                 job_status_response = self._do_get_export_job_status(job_history_uuid)
+                job_timer.observe(job_status_response['status'])
                 if job_status_response['status'] != 'IN_PROGRESS' and job_status_response['status'] != 'QUEUED':
                     break
+            span = self.tracer.current_span()
+            span.set_attribute('export_type', export_type)
+            span.set_attribute('queued_seconds', job_timer.phase_seconds['QUEUED'])
+            span.set_attribute('in_progress_seconds', job_timer.phase_seconds['IN_PROGRESS'])
+            self.client.metrics.record_job('configexport',
+                                           job_timer.phase_seconds['QUEUED'],
+                                           job_timer.phase_seconds['IN_PROGRESS'],
+                                           job_status_response['status'])
             if job_status_response['status'] == 'SUCCESS':
                 # It worked retrieve the name and download the file
                 return self._do_get_download_file(job_history_uuid, save_file_name=export_file_name)
@@ -218,6 +334,7 @@ class BulkTool:
             raise Exception('Failed to schedule export job code. Response status code: '+str(response.status_code))
 
 
+    @traced('_do_upload_import_dict_list')
     def _do_upload_import_dict_list(self, 
                                     dict_list, 
                                     upload_file_name_without_path='importfile.txt', 
@@ -245,7 +362,10 @@ class BulkTool:
         body += 'Content-Type: text/plain\r\n\r\n'
 
         # File goes here
-        body += json.dumps(dict_list)+'\r\n'
+        with self.client.metrics.time_phase('import_serialization'), self.tracer.span('serialize_import_file') as span:
+            body += json.dumps(dict_list, default=compact_json_default)+'\r\n'
+            span.set_attribute('object_count', len(dict_list))
+            span.set_attribute('bytes', len(body.encode('utf-8')))
         body += '\r\n--'+multipart_separator + '--\r\n'
 
         response = self.client.do_post_raw_with_base_url('/action/uploadconfigfile',
@@ -281,6 +401,7 @@ class BulkTool:
         with open(file_name) as upload_filehandle:
             return self._do_upload_import_dict_list(json.loads(upload_filehandle.read()), upload_file_name_without_path=file_name_without_path)
 
+    @traced('_extract_config_file_from_export')
     def _extract_config_file_from_export(self, export_zip_file, dest_directory, export_type=None):
         """
         This method will extract the configuration file from the zip file
@@ -308,6 +429,7 @@ class BulkTool:
             if not os.path.isfile(config_file_name):
                 raise Exception(f'Unable to find config export txt file: {config_file_name}')
             else:
+                self.tracer.current_span().set_attribute('bytes', os.path.getsize(config_file_name))
                 return os.path.normpath(config_file_name)
         else:    
             # No type is provided search for the file
@@ -318,9 +440,96 @@ class BulkTool:
                     config_file_name = dest_directory + '/' + 'partial_config.txt'
                     if not os.path.isfile(config_file_name):
                         raise Exception('Unable to find config export txt file')
+            self.tracer.current_span().set_attribute('bytes', os.path.getsize(config_file_name))
             return os.path.normpath(config_file_name)
 
-    def _convert_export_file_to_csv(self, export_zip_file, dest_directory, export_type=None):
+    def _iter_config_records(self, json_file):
+        """
+        Generator yielding the records of an extracted config file one at a time, the file is
+        memory mapped and only the record being yielded is parsed
+
+        Parameters:
+
+        json_file -- The extracted config file (a JSON array of records)
+        """
+        with open(json_file, 'rb') as file_handle:
+            if os.fstat(file_handle.fileno()).st_size == 0:
+                raise Exception(f'Empty config export txt file: {json_file}')
+            with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for offset, length in scan_array_records(buffer):
+                    yield json.loads(buffer[offset:offset + length])
+
+    @traced('_read_config_from_export')
+    def _read_config_from_export(self, export_zip_file, export_type=None):
+        """
+        This method will read the configuration file straight out of the export zip
+        without extracting it to disk
+
+        Parameters:
+
+        export_zip_file -- This is the input zip file
+        export_type -- Optional specifies the type of export being done (FULL_EXPORT, PENDING_CHANGE_EXPORT or PARTIAL_EXPORT)
+
+        Return value is the parsed list of records from the config file
+        """
+        if export_type is not None:
+            candidate_names = [EXPORT_CONFIG_FILE_NAMES[export_type]]
+        else:
+            candidate_names = list(EXPORT_CONFIG_FILE_NAMES.values())
+        with zipfile.ZipFile(export_zip_file, 'r') as zip_ref:
+            zip_names = zip_ref.namelist()
+            for config_file_name in candidate_names:
+                if config_file_name in zip_names:
+                    object_list = json.loads(zip_ref.read(config_file_name))
+                    self.tracer.current_span().set_attribute('object_count', len(object_list))
+                    return object_list
+        raise Exception('Unable to find config export txt file')
+
+    def _group_object_list_by_type(self, object_list):
+        """
+        Helper to split a list of export records into a dict of type -> list of records
+        records without a data block (metadata) are skipped.  A ConfigIndex may be passed
+        instead of the list to reuse an index that was already built.
+        """
+        config_index = object_list if isinstance(object_list, ConfigIndex) else ConfigIndex(object_list)
+        return dict(config_index.iter_types())
+
+    def load_config_index(self, export_zip_file, export_type=None):
+        """
+        This method reads the config of an export zip file into a ConfigIndex for fast lookups
+        by id, (type, name), name and type
+
+        Parameters:
+        export_zip_file -- This is the fully qualified path to the export zip file
+        export_type -- Optional specifies the type of export being done (FULL_EXPORT, PENDING_CHANGE_EXPORT or PARTIAL_EXPORT)
+        """
+        return ConfigIndex(self._read_config_from_export(export_zip_file, export_type=export_type))
+
+    def get_openapi_spec(self):
+        """
+        This method returns the OpenAPI spec of the device, fetched once and kept for the session
+        """
+        if self._openapi_spec is None:
+            self._openapi_spec = self.client.get_openapi_spec()
+        return self._openapi_spec
+
+    def get_csv_column_types(self, object_type):
+        """
+        This method returns the CSV column type table of an object type taken from the model
+        definitions of the OpenAPI spec (see csv_schema.build_column_type_table), None if the
+        spec has no model for the type.  Tables are built once per type.
+
+        Parameters:
+
+        object_type -- The object type (e.g. networkobject)
+        """
+        if self._column_type_index is None:
+            self._column_type_index = ColumnTypeIndex(self.get_openapi_spec())
+        return self._column_type_index.get_table(object_type)
+
+    @traced('_convert_export_file_to_csv')
+    def _convert_export_file_to_csv(self, export_zip_file, dest_directory, export_type=None, compact=False,
+                                    schema_types=False):
         """
         This method will take an input zip file and will explode it into a csv file
         per type of object
@@ -329,25 +538,93 @@ class BulkTool:
         export_zip_file -- This is the fully qualified path to the export zip file
         dest_directory -- This is the destination directory to create the CSV files in (recommend an empty directory)
         export_type -- Optional specifies the type of export being done (FULL_EXPORT, PENDING_CHANGE_EXPORT or PARTIAL_EXPORT)
+        compact -- If True the export is loaded in the compact form (see CompactLoader)
+        schema_types -- If True the CSV column types are taken from the OpenAPI spec instead of the values
 
         Note:  The raw full_config.txt file will be exploded in the dest_directory
         """
-        type_to_object_list_dict = {}
         config_file_name = self._extract_config_file_from_export(export_zip_file, dest_directory, export_type=export_type)
         with open(config_file_name) as full_config_json_handle:
             full_export_doc = full_config_json_handle.read()
-            full_export_json = json.loads(full_export_doc)
-            #loop through json documents separating by type
-            for myobject in full_export_json:
-                if 'data' in myobject and 'type' in myobject['data']:
-                    if myobject['data']['type'] in type_to_object_list_dict:
-                        type_list = type_to_object_list_dict[myobject['data']['type']]
-                        type_list.append(myobject)
-                    else:
-                        type_to_object_list_dict[myobject['data']['type']] = [myobject]
-
-        for key_type, value_obj_list in type_to_object_list_dict.items():
-            parse_json.dict_list_to_csv(value_obj_list, dest_directory + '/' + key_type+'.csv')
+            if compact:
+                loader = CompactLoader()
+                full_export_json = loader.loads(full_export_doc)
+                logging.debug(f'Compact load: {loader.get_stats()}')
+            else:
+                full_export_json = json.loads(full_export_doc)
+            # index the json documents once by type
+            config_index = ConfigIndex(full_export_json)
+
+        span = self.tracer.current_span()
+        span.set_attribute('object_count', len(config_index))
+        span.set_attribute('type_count', len(config_index.get_type_list()))
+        for key_type, value_obj_list in config_index.iter_types():
+            fieldname_to_type = self.get_csv_column_types(key_type) if schema_types else None
+            parse_json.dict_list_to_csv(value_obj_list, dest_directory + '/' + key_type+'.csv',
+                                        fieldname_to_type=fieldname_to_type)
+
+    def _write_type_file(self, object_list, file_name, output_format, fieldname_to_type=None):
+        """
+        Helper to write the records of a single type in the requested output format
+
+        Parameters:
+        object_list -- The records to write
+        file_name -- The file to write (without the extension)
+        output_format -- enum JSON, CSV, YAML, YAML_STREAM, NDJSON
+        fieldname_to_type -- Optional CSV column type table (see get_csv_column_types)
+        """
+        if output_format == 'CSV':
+            parse_json.dict_list_to_csv(object_list, file_name + '.csv', fieldname_to_type=fieldname_to_type)
+        elif output_format == 'JSON':
+            print_string_to_file(file_name + '.json', json.dumps(object_list, indent=3, sort_keys=True))
+        elif output_format == 'YAML':
+            write_dict_to_yaml_file(file_name + '.yaml', object_list)
+        elif output_format == 'YAML_STREAM':
+            write_dict_list_to_yaml_stream(file_name + '.yaml', object_list)
+        elif output_format == 'NDJSON':
+            write_dict_list_to_ndjson_file(file_name + '.ndjson', object_list)
+
+    @traced('_incremental_export')
+    def _incremental_export(self, export_zip_file, dest_directory, export_type=None, output_format='JSON',
+                            schema_types=False):
+        """
+        This method will compare the export against the snapshot stored by the prior incremental
+        export in the dest_directory and will only rewrite the per-type files of the types that
+        have added, changed or removed objects.  Objects are compared on id and version.
+
+        Parameters:
+        export_zip_file -- This is the fully qualified path to the export zip file
+        dest_directory -- The directory holding the per-type files and the snapshot
+        export_type -- Optional specifies the type of export being done (FULL_EXPORT, PENDING_CHANGE_EXPORT or PARTIAL_EXPORT)
+        output_format -- enum JSON, CSV, YAML, YAML_STREAM, NDJSON
+        schema_types -- If True CSV column types are taken from the OpenAPI spec instead of the values
+
+        The added/changed/removed sets are written to export_changes.json and the diff is returned
+        """
+        object_list = self._read_config_from_export(export_zip_file, export_type=export_type)
+        snapshot_file = os.path.normpath(dest_directory + '/' + EXPORT_SNAPSHOT_FILE_NAME)
+        diff = config_diff.diff_object_list_against_snapshot(object_list, config_diff.read_snapshot(snapshot_file))
+        logging.info(f'Incremental export added: {len(diff["added"])}, changed: {len(diff["changed"])}, removed: {len(diff["removed"])}')
+
+        type_to_object_list_dict = self._group_object_list_by_type(object_list)
+        extension = FORMAT_FILE_EXTENSIONS[output_format]
+        for affected_type in config_diff.get_affected_types(diff):
+            file_name = os.path.normpath(dest_directory + '/' + affected_type)
+            if affected_type in type_to_object_list_dict:
+                logging.debug(f'Rewriting export file for type: {affected_type}')
+                fieldname_to_type = None
+                if schema_types and output_format == 'CSV':
+                    fieldname_to_type = self.get_csv_column_types(affected_type)
+                self._write_type_file(type_to_object_list_dict[affected_type], file_name, output_format,
+                                      fieldname_to_type=fieldname_to_type)
+            elif os.path.isfile(file_name + extension):
+                # Every object of this type is gone
+                os.remove(file_name + extension)
+
+        print_string_to_file(os.path.normpath(dest_directory + '/' + EXPORT_CHANGES_FILE_NAME),
+                             json.dumps(diff, indent=3, sort_keys=True))
+        config_diff.write_snapshot(snapshot_file, config_diff.snapshot_from_object_list(object_list))
+        return diff
 
     def _get_referenced_model_set(self, openapi_dict):
         """
@@ -425,7 +702,7 @@ class BulkTool:
         attempting to filter out some of the object types which are not referenced by
         rest APIs or are wrapper classes.
         """
-        openapi_dict = self.client.get_openapi_spec()
+        openapi_dict = self.get_openapi_spec()
 
         # This method will look at the definitions and pulls out all wrappers
         # finding the list of referenced classes that they point to
@@ -446,49 +723,244 @@ class BulkTool:
         referenced_model_list = [x for x in referenced_model_set if x.find('wrapper') == -1]
         referenced_model_list.sort()
         return referenced_model_list
+
+    def get_type_url_index(self, openapi_dict=None):
+        """
+        This method builds an index from object type to the URL a single object of that type
+        is read from, taken from the GET paths of the OpenAPI spec that end in an id parameter
+        e.g. networkobject -> /object/networks/{objId}.  Paths nested under a parent object
+        (e.g. accessrules of an access policy) need the parent id as well and are left out.
+        The index is built once and kept.
+
+        Parameters:
+
+        openapi_dict -- Optional parsed OpenAPI spec, fetched from the device if not passed
+
+        Return is the dict of lower case type name to URL template
+        """
+        if self._type_url_index is not None:
+            return self._type_url_index
+        if openapi_dict is None:
+            openapi_dict = self.get_openapi_spec()
+        type_url_index = {}
+        for path, path_value in openapi_dict['paths'].items():
+            # Single object paths end with the id parameter and have no other parameter
+            if not re.search(r'/\{[^}/]+\}$', path) or path.count('{') != 1 or 'get' not in path_value:
+                continue
+            schema = path_value['get'].get('responses', {}).get('200', {}).get('schema', {})
+            if '$ref' not in schema:
+                continue
+            type_url_index.setdefault(schema['$ref'].split('/')[-1].lower(), path)
+        self._type_url_index = type_url_index
+        return type_url_index
+
+    def _get_object_by_id(self, url_template, object_id):
+        """
+        Helper to fetch a single object returning None if it does not exist
+        """
+        url = re.sub(r'\{[^}/]+\}$', object_id, url_template)
+        response = self.client.do_get_raw_with_base_url(url)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise Exception(f'Unable to fetch {url}: {response.status_code} {response.text}')
+        return response.json()
+
+    @traced('get_objects_by_id')
+    def get_objects_by_id(self, object_ref_list, object_type=None, max_workers=8):
+        """
+        This method fetches individual objects by id concurrently without running an export
+        job.  Duplicate references are only fetched once.
+
+        Parameters:
+
+        object_ref_list -- List of (type, id) tuples, reference dicts with type and id keys
+                           or plain ids if object_type is passed
+        object_type -- The type of the objects if only ids are passed
+        max_workers -- Maximum number of objects fetched at the same time
+
+        Return is the list of objects in the order of object_ref_list with None for objects
+        that do not exist
+        """
+        type_url_index = self.get_type_url_index()
+        key_list = []
+        for object_ref in object_ref_list:
+            if isinstance(object_ref, dict):
+                key = (object_ref['type'].lower(), object_ref['id'])
+            elif isinstance(object_ref, (tuple, list)):
+                key = (object_ref[0].lower(), object_ref[1])
+            elif object_type is not None:
+                key = (object_type.lower(), object_ref)
+            else:
+                raise Exception(f'No type given for object id: {object_ref}')
+            if key[0] not in type_url_index:
+                raise Exception(f'No URL found in the OpenAPI spec for type: {key[0]}')
+            key_list.append(key)
+
+        unique_key_list = list(dict.fromkeys(key_list))
+        logging.info(f'Fetching {len(unique_key_list)} objects ({len(key_list)} requested)')
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(self._get_object_by_id, type_url_index[key[0]], key[1])
+                       for key in unique_key_list}
+            object_by_key = {key: future.result() for key, future in futures.items()}
+        span = self.tracer.current_span()
+        span.set_attribute('object_count', len(key_list))
+        span.set_attribute('request_count', len(unique_key_list))
+        return [object_by_key[key] for key in key_list]
     
-    def url_export(self, url, destination_directory, output_format='JSON'):
+    def get_reference_resolver(self, cache_file=None, push_down_fields=True):
+        """
+        This method returns the ReferenceResolver of this session, created on first use so the
+        name to id maps fetched are reused by every later import
+
+        Parameters:
+
+        cache_file -- Optional JSON file the name to id maps are also cached in across sessions
+        push_down_fields -- If False the id/name/type projection is only done locally
+                            (for devices rejecting the fields parameter)
+        """
+        resolver = self._reference_resolver
+        if resolver is None or resolver.cache_file != cache_file or resolver.push_down_fields != push_down_fields:
+            self._reference_resolver = ReferenceResolver(self, cache_file=cache_file, push_down_fields=push_down_fields)
+        return self._reference_resolver
+
+    def _open_stream_writer(self, destination_directory, output_format):
+        """
+        Helper to create the incremental writer used by url_export for an output format
+
+        Parameters:
+
+        destination_directory -- The destination directory to write the data to
+        output_format - enum (JSON | CSV | YAML | YAML_STREAM | NDJSON)
+
+        Return is a tuple of the writer and the path of the file being written
+        """
+        file_path = os.path.normpath(destination_directory + '/export' + FORMAT_FILE_EXTENSIONS[output_format])
+        if output_format == 'JSON':
+            writer = parse_json.JsonArrayStreamWriter(file_path)
+        elif output_format == 'CSV':
+            writer = parse_json.CsvStreamWriter(file_path)
+        elif output_format == 'YAML':
+            writer = YamlStreamWriter(file_path)
+        elif output_format == 'YAML_STREAM':
+            writer = YamlStreamWriter(file_path, multi_document=True)
+        elif output_format == 'NDJSON':
+            writer = NdjsonStreamWriter(file_path)
+        else:
+            raise Exception(f'Unsupported export format: {output_format}')
+        return writer, file_path
+
+    def _fetch_pages_into_queue(self, url, page_queue, stop_event, parent_span=None, page_args=None):
+        """
+        Producer side of the url_export pipeline, this runs on its own thread putting the
+        list of items of each page on the queue as it arrives.  None is put on the queue
+        when all pages have been read and an exception is passed through the queue if the
+        fetch fails.
+
+        Parameters:
+
+        url -- The URL to request the data
+        page_queue -- The bounded queue to put pages on
+        stop_event -- Set by the consumer if it stopped reading the queue
+        parent_span -- The url_export span the fetch span is nested under
+        page_args -- Optional keyword arguments passed to iter_multi_page (filter/fields)
+        """
+        try:
+            with self.tracer.span('fetch_pages', parent=parent_span) as span:
+                page_count = 0
+                for items in self.client.iter_multi_page(url, **(page_args or {})):
+                    if stop_event.is_set():
+                        return
+                    page_count += 1
+                    span.set_attribute('page_count', page_count)
+                    page_queue.put(items)
+        except Exception as err:
+            page_queue.put(err)
+        page_queue.put(None)
+
+    @traced('url_export')
+    def url_export(self, url, destination_directory, output_format='JSON', queue_depth=4,
+                   filter_expression=None, fields=None, push_down_fields=True):
         """
         This method will retrieve the JSON at a URL and will write out a file to the 
         passed in destination directory in the requested output format.
+
+        Pages are fetched on a background thread while the previously fetched pages are
+        wrapped and written so network latency overlaps with serialization and only
+        queue_depth pages are held in memory at a time.
         
         Parameters:
         
         url -- The URL to request the data
         destination_directory -- The destination directory to write the data to
-        output_format - enum (JSON | CSV | YAML)
+        output_format - enum (JSON | CSV | YAML | YAML_STREAM | NDJSON)
+        queue_depth -- The maximum number of fetched pages waiting to be written
+        filter_expression -- Optional FTD filter expression passed through to the device
+        fields -- Optional list of fields (dotted paths for nested fields) to keep in each object,
+                  the other fields are dropped before the objects are written
+        push_down_fields -- If True the fields are also sent to the device as a query parameter
         
-        The path to the directory will be returned for the JSON and the path for the file returned for CSV and YAML
+        The path to the directory will be returned for the JSON and CSV and the path for the file returned for YAML and NDJSON
         """
-        object_list = self.client.do_get_multi_page(url)
-        parse_json.decorate_dict_list_for_bulk(object_list)
-    
-        return_path = None
-        if output_format == 'JSON':
-            logging.info('Exporting in JSON format')
-            file_path = f'{destination_directory}/export.json'
-            file_path = os.path.normpath(file_path)
-            print_string_to_file(file_path, json.dumps(
-                object_list, indent=3, sort_keys=True))
-            return_path = destination_directory
-            logging.info(f'JSON export can be found in: {file_path}')
-    
-        elif output_format == 'CSV':
-            logging.info('Exporting in CSV format')
-            parse_json.dict_list_to_csv(object_list, destination_directory)
-            return_path = destination_directory
-            logging.info(f'CSV files can be found in: {destination_directory}')
-    
-        elif output_format == 'YAML':
-            logging.info('Exporting in YAML format')
-            yaml_file = destination_directory+'/export.yaml'
-            yaml_file = os.path.normpath(yaml_file)
-            write_dict_to_yaml_file(yaml_file, object_list)
-            return_path = yaml_file
-            logging.info(f'YAML files can be found in: {yaml_file}')
-        return return_path
+        logging.info(f'Exporting in {output_format} format')
+        writer, file_path = self._open_stream_writer(destination_directory, output_format)
+        page_queue = queue.Queue(maxsize=queue_depth)
+        stop_event = threading.Event()
+        fetch_thread = threading.Thread(target=self._fetch_pages_into_queue,
+                                        args=(url, page_queue, stop_event, self.tracer.current_span(),
+                                              {'filter_expression': filter_expression,
+                                               'fields': fields,
+                                               'push_down_fields': push_down_fields}),
+                                        daemon=True)
+        fetch_thread.start()
+        try:
+            with writer:
+                while True:
+                    items = page_queue.get()
+                    if items is None:
+                        break
+                    if isinstance(items, Exception):
+                        raise items
+                    parse_json.decorate_dict_list_for_bulk(items)
+                    for record in items:
+                        writer.write(record)
+        finally:
+            # Make sure the producer isn't left blocked on a full queue
+            stop_event.set()
+            while fetch_thread.is_alive():
+                try:
+                    page_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+        logging.info(f'{output_format} export of {writer.count} objects can be found in: {file_path}')
+        self.tracer.current_span().set_attribute('object_count', writer.count)
+
+        if output_format in ('JSON', 'CSV'):
+            return destination_directory
+        return file_path
     
-    def bulk_export(self, destination_directory, pending_changes=False, type_list=None, id_list=None, name_list=None, output_format='JSON') :
+    def store_export(self, export_store, export_zip_file, device_name=None, export_type=None):
+        """
+        This method loads the objects of an export zip file into an ExportStore, the stored objects
+        of the device missing from a FULL_EXPORT are removed from the store
+
+        Parameters:
+
+        export_store -- ExportStore to upsert the objects into
+        export_zip_file -- This is the fully qualified path to the export zip file
+        device_name -- Name the objects are stored under, defaults to the address of the device
+        export_type -- Optional specifies the type of export being done (FULL_EXPORT, PENDING_CHANGE_EXPORT or PARTIAL_EXPORT)
+        """
+        if device_name is None:
+            device_name = self.client.get_address()
+        object_list = self._read_config_from_export(export_zip_file, export_type=export_type)
+        with self.tracer.span('store_export', object_count=len(object_list)):
+            return export_store.upsert_records(device_name, object_list, export_type=export_type,
+                                               prune=(export_type == 'FULL_EXPORT'))
+
+    @traced('bulk_export')
+    def bulk_export(self, destination_directory, pending_changes=False, type_list=None, id_list=None, name_list=None, output_format='JSON', incremental=False,
+                    export_store=None, device_name=None, compact=False, schema_types=False) :
         """
         This method will handle FULL_EXPORT, PENDING_CHANGE_EXPORT and PARTIAL_EXPORT however
         it will not handle URL export that will have its own special method.  PENDING_CHANGE_EXPORT
@@ -502,10 +974,18 @@ class BulkTool:
         type_list -- Python list of type names
         id_list -- Python list of id strings
         name_list -- Python list of names 
-        output_format -- enum JSON, CSV, YAML
+        output_format -- enum JSON, CSV, YAML, YAML_STREAM, NDJSON
+        incremental -- Boolean if True only the per-type files of types that changed since the previous
+                       incremental export into the same destination_directory are rewritten, only
+                       valid for FULL_EXPORT
+        export_store -- Optional ExportStore the exported objects are also upserted into
+        device_name -- Name the objects are stored under in the export_store, defaults to the device address
+        compact -- If True the export is loaded in the compact form (see CompactLoader) for the CSV conversion
+        schema_types -- If True CSV column types are taken from the OpenAPI model definitions instead of
+                        inspecting every value (exact types for floats and enums)
         
         This will return the directory or file path if there is only a single file output
-        (directory for CSV, file for JSON/YAML)
+        (directory for CSV and incremental exports, file for JSON/YAML)
         """
         # Base Case
         mode = 'FULL_EXPORT'
@@ -520,6 +1000,9 @@ class BulkTool:
             # when pending is not flagged but there is a filter 
             if type_list is not None or id_list is not None or name_list is not None:
                 mode = 'PARTIAL_EXPORT'
+        if incremental and mode != 'FULL_EXPORT':
+            # Everything outside of a partial or pending change export would be seen as removed
+            raise Exception(f'Incremental exports are only supported for FULL_EXPORT not {mode}')
 
         location_export_zip = os.path.normpath(destination_directory + '/myexport.zip')
 
@@ -533,10 +1016,20 @@ class BulkTool:
         )
 
         result_path = None
-        if output_format == 'CSV':
+        conversion_start_time = time.time()
+        if incremental:
+            logging.info(f'Exporting incrementally in {output_format} format')
+            self._incremental_export(
+                location_export_zip, destination_directory, export_type=mode, output_format=output_format,
+                schema_types=schema_types)
+            result_path = destination_directory
+            logging.info('Changed files can be found in: '+str(destination_directory))
+
+        elif output_format == 'CSV':
             logging.info('Exporting in CSV format')
             self._convert_export_file_to_csv(
-                location_export_zip, destination_directory, export_type=mode)
+                location_export_zip, destination_directory, export_type=mode, compact=compact,
+                schema_types=schema_types)
             result_path = destination_directory
             logging.info('CSV files can be found in: '+str(destination_directory))
             
@@ -544,7 +1037,8 @@ class BulkTool:
             logging.info('Exporting in JSON format')
             json_file = self._extract_config_file_from_export(
                 location_export_zip, destination_directory, export_type=mode)
-            pretty_print_json_file(json_file)
+            with self.tracer.span('pretty_print_json_file'):
+                pretty_print_json_file(json_file)
             result_path = json_file
             logging.info('JSON files can be found in: '+str(json_file))
             
@@ -554,10 +1048,43 @@ class BulkTool:
                 location_export_zip, destination_directory, export_type=mode)
             object_list = json.loads(read_string_from_file(json_file))
             yaml_file = destination_directory+'/export.yaml'
-            write_dict_to_yaml_file(yaml_file, object_list)
+            with self.tracer.span('write_yaml', object_count=len(object_list)):
+                write_dict_to_yaml_file(yaml_file, object_list)
             result_path = yaml_file
             logging.info('YAML file can be found in: '+str(yaml_file))
-            
+
+        elif output_format == 'YAML_STREAM':
+            logging.info('Exporting in multi-document YAML format')
+            json_file = self._extract_config_file_from_export(
+                location_export_zip, destination_directory, export_type=mode)
+            yaml_file = destination_directory+'/export.yaml'
+            # The records are written one document at a time as they are read from the config file
+            with self.tracer.span('write_yaml_stream') as span, \
+                    YamlStreamWriter(yaml_file, multi_document=True) as writer:
+                for record in self._iter_config_records(json_file):
+                    writer.write(record)
+                span.set_attribute('object_count', writer.count)
+            result_path = yaml_file
+            logging.info('YAML file can be found in: '+str(yaml_file))
+
+        elif output_format == 'NDJSON':
+            logging.info('Exporting in NDJSON format')
+            ndjson_file = os.path.normpath(destination_directory+'/export.ndjson')
+            # The config file is extracted to a temporary directory and its records are written
+            # one line at a time as they are read, the whole export is never loaded
+            with tempfile.TemporaryDirectory() as temp_directory:
+                json_file = self._extract_config_file_from_export(
+                    location_export_zip, temp_directory, export_type=mode)
+                with self.tracer.span('write_ndjson') as span, NdjsonStreamWriter(ndjson_file) as writer:
+                    for record in self._iter_config_records(json_file):
+                        writer.write(record)
+                    span.set_attribute('object_count', writer.count)
+            result_path = ndjson_file
+            logging.info('NDJSON file can be found in: '+str(ndjson_file))
+
+        self.client.metrics.record_phase('export_conversion', time.time() - conversion_start_time)
+        if export_store is not None:
+            self.store_export(export_store, location_export_zip, device_name=device_name, export_type=mode)
         return result_path
     
     def _get_object_body_from_import_record(self, obj):
@@ -642,43 +1169,74 @@ class BulkTool:
         If the field isn't present that object will not be excluded.
         
         """
-        removal_list = []
         logging.debug(f'Total objects to import: {len(object_list)}')
-        for obj in object_list:
-            # Get correct part of object to apply the filter
-            lookup_record = self._get_object_body_from_import_record(obj)
-            if id_list is not None and 'id' in lookup_record and lookup_record['id'] in id_list:
-                self._debug_object_info(lookup_record)
-                removal_list.append(obj)
-                continue
-            if name_list is not None and 'name' in lookup_record and lookup_record['name'] in name_list:
-                self._debug_object_info(lookup_record)
-                removal_list.append(obj)
-                continue
-            if type_list is not None and 'type' in lookup_record and lookup_record['type'] in type_list:
-                self._debug_object_info(lookup_record)
-                removal_list.append(obj)
+        removal_list = ConfigIndex(object_list).find(id_list=id_list, type_list=type_list, name_list=name_list)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for obj in removal_list:
+                self._debug_object_info(self._get_object_body_from_import_record(obj))
 
         logging.debug(f'Total objects being removed: {len(removal_list)}')
         if removal_list:
-            # Prune out removed items if any exist
-            return [x for x in object_list if x not in removal_list]
+            # Prune out removed items if any exist, compared by identity so this stays linear
+            removal_ids = set(id(x) for x in removal_list)
+            return [x for x in object_list if id(x) not in removal_ids]
         else:
             return object_list
 
+    def _get_delta_import_list(self, object_list):
+        """
+        This method will export the current state of the types referenced by the import list
+        from the device and will reduce the import list to the records that change something.
+        See config_diff.compute_import_delta for the comparison rules.
+
+        Parameters:
+
+        object_list -- The list of import records
+
+        Return is the reduced list of import records
+        """
+        import_type_list = sorted(set(x['data']['type'] for x in object_list
+                                      if 'data' in x and isinstance(x['data'], dict) and 'type' in x['data']))
+        if not import_type_list:
+            return []
+        with tempfile.TemporaryDirectory() as temp_directory:
+            export_zip_file = os.path.normpath(temp_directory + '/delta_export.zip')
+            self._do_download_export_file(export_file_name=export_zip_file,
+                                          type_list=import_type_list,
+                                          export_type='PARTIAL_EXPORT')
+            current_list = self._read_config_from_export(export_zip_file, export_type='PARTIAL_EXPORT')
+        delta_list = config_diff.compute_import_delta(object_list, current_list)
+        logging.info(f'Delta import will send {len(delta_list)} of {len(object_list)} records')
+        return delta_list
+
+    @traced('bulk_import')
     def bulk_import(self, file_list, input_format='JSON', 
-                    id_list=None, type_list=None, name_list=None, filter_local=False):
+                    id_list=None, type_list=None, name_list=None, filter_local=False, delta=False,
+                    load_workers=None, chunk_size=None, compact=False, resolve_references=False,
+                    reference_cache_file=None, reference_push_down_fields=True):
         """
         This method will import a list of files in the given format
         
         Parameters:
         
         file_list -- A Python list of files to import
-        input_format -- enum (JSON | CSV | YAML)
+        input_format -- enum (JSON | CSV | YAML | YAML_STREAM | NDJSON)
         id_list -- IDs to exclude from the import package
         type_list -- Types to exclude from the import package
         name_list -- Names to exclude from the import package
         local_filter -- This determines if the name, type, id filters will be applied locally or on the remote side (passed to the server)
+        delta -- If True the current state of the imported types is exported from the device first and only records
+                 that would change something are uploaded
+        load_workers -- Optional number of processes used to parse the files in parallel (files are still
+                        merged in file_list order)
+        chunk_size -- Optional number of records per import job, the records are put in dependency order
+                      (see ReferenceGraph.get_import_plan) and imported one chunk after the other
+        compact -- If True the files are loaded in the compact form (see CompactLoader) to save memory
+        resolve_references -- If True references with a name and type but no id get the id filled in
+                              (see ReferenceResolver)
+        reference_cache_file -- Optional file the name to id maps of resolve_references are cached in
+        reference_push_down_fields -- If False resolve_references lists the types without asking the device
+                                      for the id, name and type fields only
         
         This will return a bool indicating success
         """
@@ -687,38 +1245,73 @@ class BulkTool:
         return_result = False
         entity_filter_list = self._create_entity_filter(id_list=id_list, type_list=type_list, name_list=name_list)
         object_list = []
-        if input_format == 'CSV':
-            logging.info('Importing in CSV mode')
-            # need to loop  through files and convert to JSON and merge into a single list
-            for inputfile in file_list:
-                object_list.extend(
-                    parse_csv.parse_csv_to_dict(inputfile)
-                )
-
-        elif input_format == 'JSON':
-            logging.info('Importing in JSON mode')
-            #JSON case just merge the JSON docs
-            for input_file in file_list:
-                object_list.extend(
-                    json.loads(read_string_from_file(input_file))
-                )
-
-        elif input_format == 'YAML':
-            logging.info('Importing in YAML mode')
-            #JSON case just merge the JSON docs
+        logging.info(f'Importing in {input_format} mode')
+        # need to loop through files and convert to JSON and merge into a single list
+        if load_workers is not None and load_workers > 1 and len(file_list) > 1:
+            # map keeps the results in file_list order so the merge is deterministic
+            with concurrent.futures.ProcessPoolExecutor(max_workers=load_workers) as executor:
+                load_results = executor.map(_load_import_file, [input_format] * len(file_list), file_list,
+                                            [compact] * len(file_list))
+                for input_file, (file_object_list, elapsed) in zip(file_list, load_results):
+                    logging.info(f'Parsed {input_file} ({len(file_object_list)} records) in {elapsed:.3f}s')
+                    self.client.metrics.record_phase('import_file_parse', elapsed)
+                    object_list.extend(file_object_list)
+        else:
             for input_file in file_list:
-                object_list.extend(
-                    read_yaml_to_dict(input_file)
-                )
+                with self.tracer.span('load_import_file', file=input_file) as span:
+                    file_object_list, elapsed = _load_import_file(input_format, input_file, compact=compact)
+                    span.set_attribute('object_count', len(file_object_list))
+                logging.info(f'Parsed {input_file} ({len(file_object_list)} records) in {elapsed:.3f}s')
+                self.client.metrics.record_phase('import_file_parse', elapsed)
+                object_list.extend(file_object_list)
 
         if filter_local:
             # If filter local is set true the objects will be removed client side 
             # instead of server side.  This works around some of the issues with server
             # side filtering.
             object_list = self._filter_object_list(object_list, id_list=id_list, name_list=name_list, type_list=type_list)
-        if self._do_upload_import_dict_list(object_list, entity_filter_list=(entity_filter_list if not filter_local else None)):
-            logging.info(IMPORT_SUCCESS)
-            return_result = True
+        if resolve_references:
+            self.get_reference_resolver(cache_file=reference_cache_file,
+                                        push_down_fields=reference_push_down_fields).resolve(object_list)
+        if delta:
+            object_list = self._get_delta_import_list(object_list)
+            if not object_list:
+                logging.info('Device already matches the import files nothing to import')
+                return True
+        if chunk_size is not None:
+            chunk_list = self._get_import_chunk_list(object_list, chunk_size)
         else:
-            logging.error(IMPORT_FAIL)  
+            chunk_list = [object_list]
+        for chunk_number, chunk in enumerate(chunk_list, 1):
+            if len(chunk_list) > 1:
+                logging.info(f'Importing chunk {chunk_number} of {len(chunk_list)} ({len(chunk)} records)')
+            if not self._do_upload_import_dict_list(chunk, entity_filter_list=(entity_filter_list if not filter_local else None)):
+                logging.error(IMPORT_FAIL)
+                return return_result
+        logging.info(IMPORT_SUCCESS)
+        return_result = True
         return return_result
+
+    def _get_import_chunk_list(self, object_list, chunk_size):
+        """
+        Helper to split an import list into dependency ordered chunks logging the references
+        that cannot be resolved within the import list.  Most of these point at objects that
+        are on the device already (any-ipv4, zones, interfaces...) so only a count per type
+        is logged at INFO.
+        """
+        with self.tracer.span('plan_import', object_count=len(object_list)) as span:
+            graph = ReferenceGraph(object_list)
+            chunk_list = graph.get_import_plan(chunk_size)
+            span.set_attribute('chunk_count', len(chunk_list))
+        count_by_type = {}
+        for dangling in graph.get_dangling_references():
+            reference = dangling['reference']
+            count_by_type[reference.get('type')] = count_by_type.get(reference.get('type'), 0) + 1
+            logging.debug(f"{dangling['source']} references {reference.get('type')} "
+                          f"{reference.get('name', reference.get('id'))} ({dangling['path']}) which is not in the import, "
+                          f"it has to exist on the device")
+        for object_type, count in sorted(count_by_type.items(), key=lambda x: str(x[0])):
+            logging.info(f'{count} references to {object_type} objects not in the import, they have to exist on the device')
+        for cycle in graph.get_cycles():
+            logging.debug(f'Objects referencing each other are imported in the same chunk: {cycle}')
+        return chunk_list
@@ -0,0 +1,221 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+import sys
+import yaml
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from ftd_api.parse_yaml import NoAliasDumper
+from ftd_api.reference_graph import is_reference
+
+DEFAULT_INTERN_MAX_LENGTH = 64
+
+_MISSING = object()
+
+
+class ReferenceDict(dict):
+    """
+    Read only dict used for the {id, type, name, version} references a CompactLoader shares
+    between all the objects containing the same reference.  Changing a shared reference would
+    change it everywhere so the mutating methods raise, replace the reference instead.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('Shared references are read only, replace the reference instead')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    __ior__ = _read_only
+
+    def __reduce__(self):
+        return (ReferenceDict, (dict(self),))
+
+    def copy(self):
+        """
+        Return a plain (mutable) dict copy
+        """
+        return dict(self)
+
+
+class IdentityRecord(MutableMapping):
+    """
+    Slotted stand in for the top level {action, type, data} records of export/import files.
+    It behaves like the dict it replaces, keys other than action, type and data are kept in
+    a dict of their own.
+    """
+    __slots__ = ('action', 'type', 'data', '_extra')
+    _FIELDS = ('action', 'data', 'type')
+
+    def __init__(self, record=None):
+        """
+        Parameters:
+
+        record -- Optional dict (or mapping) to copy the keys from
+        """
+        self.action = self.type = self.data = _MISSING
+        self._extra = None
+        if record is not None:
+            for key, value in record.items():
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in IdentityRecord._FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in IdentityRecord._FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in IdentityRecord._FIELDS and getattr(self, key) is not _MISSING:
+            setattr(self, key, _MISSING)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in IdentityRecord._FIELDS:
+            return getattr(self, key) is not _MISSING
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key in IdentityRecord._FIELDS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'IdentityRecord({self.to_dict()!r})'
+
+    def __reduce__(self):
+        return (IdentityRecord, (self.to_dict(),))
+
+    def to_dict(self):
+        """
+        Return the record as a plain dict
+        """
+        return dict(self.items())
+
+
+def compact_json_default(obj):
+    """
+    default hook for json.dump(s) serializing IdentityRecord (and any other mapping) as an object
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj.items())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _represent_mapping(dumper, data):
+    return dumper.represent_dict(dict(data.items()))
+
+
+yaml.add_representer(IdentityRecord, _represent_mapping, Dumper=NoAliasDumper)
+yaml.add_representer(ReferenceDict, _represent_mapping, Dumper=NoAliasDumper)
+
+
+class CompactLoader:
+    """
+    This class loads export/import records with less memory than plain json.loads: keys and
+    short string values are interned so every copy of the same string is one object, equal
+    references ({id, type, name, version} dicts) are replaced by one shared read only
+    ReferenceDict and the top level {action, type, data} records become slotted IdentityRecords.
+    The result is used like the plain structure, only the shared references cannot be changed
+    in place.  Parsing is somewhat slower as every object goes through a Python hook.
+    """
+
+    def __init__(self, intern_max_length=DEFAULT_INTERN_MAX_LENGTH):
+        """
+        Parameters:
+
+        intern_max_length -- String values up to this length are interned
+        """
+        self.intern_max_length = intern_max_length
+        self._reference_cache = {}
+        self.reference_count = 0
+
+    def _intern_list(self, value_list):
+        """
+        Helper to intern the short strings of a list in place
+        """
+        intern_max_length = self.intern_max_length
+        for position, value in enumerate(value_list):
+            if type(value) is str and len(value) <= intern_max_length:
+                value_list[position] = sys.intern(value)
+
+    def object_pairs_hook(self, pair_list):
+        """
+        object_pairs_hook for json.loads building the compact form of each object, the
+        objects nested in it have been built already
+        """
+        intern_max_length = self.intern_max_length
+        obj = {}
+        for key, value in pair_list:
+            if type(value) is str:
+                if len(value) <= intern_max_length:
+                    value = sys.intern(value)
+            elif type(value) is list:
+                self._intern_list(value)
+            obj[sys.intern(key)] = value
+        if is_reference(obj):
+            self.reference_count += 1
+            try:
+                cache_key = tuple(sorted(obj.items()))
+                shared = self._reference_cache.get(cache_key)
+            except TypeError:
+                # Unhashable value, not a plain reference after all
+                return obj
+            if shared is None:
+                shared = ReferenceDict(obj)
+                self._reference_cache[cache_key] = shared
+            return shared
+        if obj.get('type') == 'identitywrapper' and 'data' in obj:
+            return IdentityRecord(obj)
+        return obj
+
+    def loads(self, json_string):
+        """
+        Parse a JSON document into the compact form
+        """
+        return json.loads(json_string, object_pairs_hook=self.object_pairs_hook)
+
+    def compact(self, obj):
+        """
+        Return the compact form of an already parsed structure (e.g. loaded from YAML or CSV)
+        """
+        if type(obj) is dict:
+            return self.object_pairs_hook([(key, self.compact(value)) for key, value in obj.items()])
+        if type(obj) is list:
+            return [self.compact(x) for x in obj]
+        if type(obj) is str and len(obj) <= self.intern_max_length:
+            return sys.intern(obj)
+        return obj
+
+    def get_stats(self):
+        """
+        Return a dict with the number of references seen and the number of distinct references kept
+        """
+        return {'reference_count': self.reference_count, 'shared_reference_count': len(self._reference_cache)}
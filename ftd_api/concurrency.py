@@ -0,0 +1,161 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import collections
+import contextlib
+import logging
+import threading
+import time
+
+# Status codes the device returns when it is overloaded (423 is a DB lock)
+THROTTLE_STATUS_CODES = (423, 429, 503)
+
+
+class _RequestTracker:
+    """
+    Handed out by AdaptiveConcurrencyLimiter.track() so the caller can record the
+    status code of the request
+    """
+
+    def __init__(self):
+        self.status_code = None
+        self.start_time = time.time()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    This class limits the number of requests in flight against a single device.  The limit
+    grows additively while responses are healthy and is cut multiplicatively when the device
+    answers with 423/429/503, a request fails or latency spikes well above the baseline (AIMD).
+
+    Usage:
+
+    with limiter.track() as tracker:
+        response = requests.get(...)
+        tracker.status_code = response.status_code
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=32, increase_step=1.0,
+                 decrease_factor=0.5, latency_spike_factor=3.0, min_spike_latency=1.0, history_size=100):
+        """
+        Parameters:
+
+        initial_limit -- Number of requests allowed in flight to start with
+        min_limit -- The limit is never cut below this
+        max_limit -- The limit never grows beyond this
+        increase_step -- The limit grows by this much once a full window (limit) of healthy requests completes
+        decrease_factor -- The limit is multiplied by this on overload
+        latency_spike_factor -- A latency this many times the baseline is treated as overload
+        min_spike_latency -- Latencies (seconds) below this are never treated as a spike
+        history_size -- Number of limit changes kept in history
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.min_spike_latency = min_spike_latency
+        self.history = collections.deque(maxlen=history_size)
+        self.baseline_latency = None
+        self.in_flight = 0
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._last_decrease_time = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """
+        The current number of requests allowed in flight
+        """
+        return int(self._limit)
+
+    def get_state(self):
+        """
+        Return a dict with the current limit, requests in flight, the latency baseline and
+        the reason for the most recent limit change
+        """
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self.in_flight,
+                'baseline_latency': self.baseline_latency,
+                'last_change': self.history[-1] if self.history else None
+            }
+
+    def acquire(self):
+        """
+        Block until a request may be sent
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, status_code, latency, start_time):
+        """
+        Record the outcome of a request and free its slot
+
+        Parameters:
+
+        status_code -- The HTTP status code or None if the request raised
+        latency -- The request latency in seconds
+        start_time -- When the request was sent, overload signals from requests sent before
+                      the last decrease are ignored so one burst only cuts the limit once
+        """
+        with self._condition:
+            self.in_flight -= 1
+            reason = None
+            if status_code is None:
+                reason = 'request error'
+            elif status_code in THROTTLE_STATUS_CODES:
+                reason = f'status {status_code}'
+            elif self.baseline_latency is not None and latency > self.min_spike_latency and \
+                    latency > self.baseline_latency * self.latency_spike_factor:
+                reason = f'latency {latency:.3f}s over baseline {self.baseline_latency:.3f}s'
+
+            if reason is not None:
+                if start_time >= self._last_decrease_time:
+                    self._set_limit(max(self.min_limit, self._limit * self.decrease_factor), reason)
+                    self._last_decrease_time = time.time()
+            else:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency = 0.9 * self.baseline_latency + 0.1 * latency
+                self._set_limit(min(self.max_limit, self._limit + self.increase_step / self._limit), 'healthy responses')
+            self._condition.notify_all()
+
+    def _set_limit(self, new_limit, reason):
+        """
+        Helper to change the limit recording the change when the whole number limit moves
+        """
+        old_limit = self.limit
+        self._limit = new_limit
+        if self.limit != old_limit:
+            change = {'time': time.time(), 'old_limit': old_limit, 'new_limit': self.limit, 'reason': reason}
+            self.history.append(change)
+            logging.debug(f'Concurrency limit changed from {old_limit} to {self.limit}: {reason}')
+
+    @contextlib.contextmanager
+    def track(self):
+        """
+        Context manager that acquires a slot and releases it with the recorded status code
+        and measured latency.  If the body raises the request is recorded as an error.
+        """
+        self.acquire()
+        tracker = _RequestTracker()
+        try:
+            yield tracker
+        except Exception:
+            tracker.status_code = None
+            raise
+        finally:
+            self.release(tracker.status_code, time.time() - tracker.start_time, tracker.start_time)
@@ -0,0 +1,174 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+import hashlib
+import os.path
+from ftd_api.file_helper import read_string_from_file
+from ftd_api.file_helper import print_string_to_file
+from ftd_api.config_index import ConfigIndex
+
+# Fields maintained by the device that should not be considered when comparing content
+VOLATILE_FIELDS = ('version', 'links')
+
+
+def _get_record_body(record):
+    """
+    Helper to return the data block of an identitywrapper record or the record itself
+    when there is no data block (metadata records)
+    """
+    if 'data' in record and isinstance(record['data'], dict):
+        return record['data']
+    return record
+
+
+def snapshot_from_object_list(object_list):
+    """
+    This method builds a compact snapshot of an export so the next export can be
+    compared against it without keeping the whole previous export around.
+
+    Parameters:
+
+    object_list -- List of identitywrapper records as found in full_config.txt
+
+    Return is a dict of id -> {'type': ..., 'name': ..., 'version': ...}
+    records without an id (e.g. metadata) are skipped
+    """
+    snapshot = {}
+    for record in object_list:
+        body = _get_record_body(record)
+        if 'id' not in body:
+            continue
+        snapshot[body['id']] = {
+            'type': body.get('type'),
+            'name': body.get('name'),
+            'version': body.get('version')
+        }
+    return snapshot
+
+
+def diff_object_list_against_snapshot(object_list, snapshot):
+    """
+    Compare a freshly exported object list with the snapshot of a prior export.
+    Objects are matched on id and considered changed when the version field differs.
+
+    Parameters:
+
+    object_list -- List of identitywrapper records from the new export
+    snapshot -- Snapshot as returned by snapshot_from_object_list (None means no prior export)
+
+    Return is a dict with the keys:
+    added -- list of records not present in the snapshot
+    changed -- list of records whose version differs from the snapshot
+    removed -- list of snapshot entries (with the id added) no longer present
+    """
+    if snapshot is None:
+        snapshot = {}
+    added = []
+    changed = []
+    seen_ids = set()
+    for record in object_list:
+        body = _get_record_body(record)
+        if 'id' not in body:
+            continue
+        obj_id = body['id']
+        seen_ids.add(obj_id)
+        if obj_id not in snapshot:
+            added.append(record)
+        elif snapshot[obj_id]['version'] != body.get('version'):
+            changed.append(record)
+    removed = [{'id': obj_id, **entry} for obj_id, entry in snapshot.items() if obj_id not in seen_ids]
+    return {'added': added, 'changed': changed, 'removed': removed}
+
+
+def get_affected_types(diff):
+    """
+    Return the set of object types touched by a diff as returned from
+    diff_object_list_against_snapshot
+    """
+    affected_types = set()
+    for record in diff['added'] + diff['changed']:
+        affected_types.add(_get_record_body(record).get('type'))
+    for entry in diff['removed']:
+        affected_types.add(entry['type'])
+    affected_types.discard(None)
+    return affected_types
+
+
+def read_snapshot(snapshot_file):
+    """
+    Load a snapshot file written by write_snapshot, None is returned if the file does
+    not exist yet (first export)
+    """
+    if not os.path.isfile(snapshot_file):
+        return None
+    return json.loads(read_string_from_file(snapshot_file))
+
+
+def write_snapshot(snapshot_file, snapshot):
+    """
+    Persist a snapshot so it can be used for the next incremental export
+    """
+    print_string_to_file(snapshot_file, json.dumps(snapshot, sort_keys=True))
+
+
+def object_content_hash(body, field_list=None):
+    """
+    Compute a stable hash over the content of an object body ignoring the volatile fields
+
+    Parameters:
+
+    body -- The object body (data block of an identitywrapper record)
+    field_list -- Optional list of fields to restrict the hash to, missing fields hash as None
+    """
+    if field_list is None:
+        field_list = body.keys()
+    content = {key: body.get(key) for key in field_list if key not in VOLATILE_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def compute_import_delta(import_list, current_list):
+    """
+    This method will reduce an import list to the records that would actually change
+    something on the device.  Records are matched to the current device state by id and
+    if there is no id by (type, name).  A CREATE/EDIT record is kept when there is no
+    matching object or when the content hash of the fields in the import record differs
+    from the same fields on the device.  A DELETE record is kept only if the object exists.
+
+    Parameters:
+
+    import_list -- The list of import records (identitywrapper records)
+    current_list -- The list of records exported from the device (or a ConfigIndex over them)
+
+    Return is the list of import records that need to be sent to the device, records
+    without a data block (metadata) are dropped
+    """
+    current_index = current_list if isinstance(current_list, ConfigIndex) else ConfigIndex(current_list)
+
+    delta_list = []
+    for record in import_list:
+        if 'data' not in record or not isinstance(record['data'], dict):
+            continue
+        body = record['data']
+        current_record = None
+        if 'id' in body:
+            current_record = current_index.get_by_id(body['id'])
+        if current_record is None:
+            current_record = current_index.get_by_type_name(body.get('type'), body.get('name'))
+        current_body = current_record['data'] if current_record is not None else None
+
+        if record.get('action') == 'DELETE':
+            if current_body is not None:
+                delta_list.append(record)
+        elif current_body is None or \
+                object_content_hash(body) != object_content_hash(current_body, field_list=body.keys()):
+            delta_list.append(record)
+    return delta_list
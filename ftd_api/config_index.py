@@ -0,0 +1,185 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+import sys
+from collections.abc import Mapping
+from ftd_api.file_helper import read_string_from_file
+
+
+def _get_deep_size(obj, seen_ids):
+    """
+    Helper to estimate the memory used by a parsed JSON structure, objects shared between
+    records (e.g. interned strings) are only counted once
+    """
+    if id(obj) in seen_ids:
+        return 0
+    seen_ids.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, Mapping):
+        for key, value in obj.items():
+            size += _get_deep_size(key, seen_ids) + _get_deep_size(value, seen_ids)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            size += _get_deep_size(value, seen_ids)
+    # Slotted objects (e.g. IdentityRecord) keep their values outside of getsizeof
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if slot not in ('__dict__', '__weakref__') and hasattr(obj, slot):
+                size += _get_deep_size(getattr(obj, slot), seen_ids)
+    return size
+
+
+class ConfigIndex:
+    """
+    This class indexes a list of export records (identitywrapper records as found in
+    full_config.txt) once so records can be looked up by id, by (type, name), by name and
+    by type without scanning the list.  The index only holds references to the records,
+    records without a data block (the metadata record) are kept aside in metadata_list.
+    """
+
+    def __init__(self, object_list):
+        """
+        Parameters:
+
+        object_list -- List of export/import records
+        """
+        self.object_list = object_list
+        self.metadata_list = []
+        self._by_id = {}
+        # Further records sharing an id with the record in _by_id (e.g. an import file with a
+        # DELETE and a CREATE of the same object), only needed to find all of them
+        self._duplicate_id_records = {}
+        self._by_type_name = {}
+        self._by_name = {}
+        self._by_type = {}
+        for record in object_list:
+            body = record.get('data')
+            if not isinstance(body, dict):
+                self.metadata_list.append(record)
+                continue
+            object_type = body.get('type')
+            name = body.get('name')
+            if 'id' in body:
+                if body['id'] in self._by_id:
+                    self._duplicate_id_records.setdefault(body['id'], []).append(record)
+                else:
+                    self._by_id[body['id']] = record
+            if name is not None:
+                self._by_type_name.setdefault((object_type, name), record)
+                self._by_name.setdefault(name, []).append(record)
+            if object_type is not None:
+                self._by_type.setdefault(object_type, []).append(record)
+
+    @classmethod
+    def from_file(cls, json_file):
+        """
+        Build an index from a JSON export file (e.g. full_config.txt)
+        """
+        return cls(json.loads(read_string_from_file(json_file)))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __contains__(self, object_id):
+        return object_id in self._by_id
+
+    def get_by_id(self, object_id):
+        """
+        Return the record with the id or None
+        """
+        return self._by_id.get(object_id)
+
+    def get_by_type_name(self, object_type, name):
+        """
+        Return the record of the type with the name or None
+        """
+        return self._by_type_name.get((object_type, name))
+
+    def get_records_by_name(self, name):
+        """
+        Return the list of records (of any type) with the name
+        """
+        return self._by_name.get(name, [])
+
+    def get_records_by_type(self, object_type):
+        """
+        Return the list of records of the type in export order
+        """
+        return self._by_type.get(object_type, [])
+
+    def get_type_list(self):
+        """
+        Return the sorted list of types present
+        """
+        return sorted(self._by_type)
+
+    def iter_types(self):
+        """
+        Generator yielding (type, list of records) in export order of the first record of each type
+        """
+        for object_type, record_list in self._by_type.items():
+            yield object_type, record_list
+
+    def find(self, id_list=None, type_list=None, name_list=None):
+        """
+        Return the records matching any of the criteria, metadata records are matched on
+        their own fields
+
+        Parameters:
+
+        id_list -- Ids to match
+        type_list -- Types to match
+        name_list -- Names to match
+
+        Return is a list of matching records in export order without duplicates
+        """
+        match_ids = set()
+        for object_id in id_list or []:
+            if object_id in self._by_id:
+                match_ids.add(id(self._by_id[object_id]))
+                match_ids.update(id(x) for x in self._duplicate_id_records.get(object_id, []))
+        for name in name_list or []:
+            match_ids.update(id(x) for x in self.get_records_by_name(name))
+        for object_type in type_list or []:
+            match_ids.update(id(x) for x in self.get_records_by_type(object_type))
+        for record in self.metadata_list:
+            if (id_list and record.get('id') in id_list) or \
+                    (name_list and record.get('name') in name_list) or \
+                    (type_list and record.get('type') in type_list):
+                match_ids.add(id(record))
+        if not match_ids:
+            return []
+        return [x for x in self.object_list if id(x) in match_ids]
+
+    def get_memory_report(self, deep=False):
+        """
+        Return a dict describing the size of the index
+
+        Parameters:
+
+        deep -- If True also estimate the memory of the records themselves (walks every record)
+        """
+        index_bytes = sum(sys.getsizeof(x) for x in (self._by_id, self._by_type_name, self._by_name, self._by_type))
+        index_bytes += sum(sys.getsizeof(x) for x in self._by_type.values())
+        index_bytes += sum(sys.getsizeof(x) for x in self._by_name.values())
+        report = {
+            'record_count': len(self.object_list),
+            'metadata_count': len(self.metadata_list),
+            'type_count': len(self._by_type),
+            'id_count': len(self._by_id),
+            'type_name_count': len(self._by_type_name),
+            'index_bytes': index_bytes,
+            'type_record_counts': {object_type: len(x) for object_type, x in sorted(self._by_type.items())}
+        }
+        if deep:
+            report['record_bytes'] = _get_deep_size(self.object_list, set())
+        return report
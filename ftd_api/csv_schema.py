@@ -0,0 +1,93 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import threading
+
+# OpenAPI primitive types with a CSV type hint, everything else (including enums) is a string
+OPENAPI_TYPE_TO_CSV_TYPE = {
+    'integer': 'int',
+    'boolean': 'bool',
+    'number': 'float'
+}
+
+
+def build_column_type_table(openapi_dict, model_name, prefix='data.'):
+    """
+    This method walks an OpenAPI model definition (following $refs) and returns the CSV
+    type of every field path of the model.  List positions in the paths are written as []
+    e.g. data.ports[].port so one entry covers all positions.
+
+    Parameters:
+
+    openapi_dict -- Parsed OpenAPI spec
+    model_name -- Name of the definition (e.g. NetworkObject)
+    prefix -- Path of the model in the flattened records, data. for export records
+
+    Return is a dict of field path to int, bool, float or str
+    """
+    definitions = openapi_dict.get('definitions', {})
+    table = {}
+    # (path, schema, names of the models on the way down to stop at recursive models), the
+    # model itself has no path of its own
+    stack = [(None, definitions.get(model_name, {}), (model_name,))]
+    while stack:
+        path, schema, model_chain = stack.pop()
+        if '$ref' in schema:
+            ref_name = schema['$ref'].split('/')[-1]
+            if ref_name in model_chain:
+                continue
+            stack.append((path, definitions.get(ref_name, {}), model_chain + (ref_name,)))
+        elif 'properties' in schema:
+            for property_name, property_schema in schema['properties'].items():
+                property_path = prefix + property_name if path is None else f'{path}.{property_name}'
+                stack.append((property_path, property_schema, model_chain))
+        elif path is None:
+            continue
+        elif schema.get('type') == 'array':
+            stack.append((path + '[]', schema.get('items', {}), model_chain))
+        elif 'enum' in schema:
+            table[path] = 'str'
+        elif 'type' in schema:
+            table[path] = OPENAPI_TYPE_TO_CSV_TYPE.get(schema['type'], 'str')
+    return table
+
+
+class ColumnTypeIndex:
+    """
+    This class keeps the CSV column type tables of the object types of an OpenAPI spec, each
+    table is built on first use and reused for every later CSV file of the type.
+    """
+
+    def __init__(self, openapi_dict, prefix='data.'):
+        """
+        Parameters:
+
+        openapi_dict -- Parsed OpenAPI spec
+        prefix -- Path of the objects in the flattened records, data. for export records
+        """
+        self.openapi_dict = openapi_dict
+        self.prefix = prefix
+        self._model_names = {x.lower(): x for x in openapi_dict.get('definitions', {})}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get_table(self, object_type):
+        """
+        Return the column type table of an object type (see build_column_type_table) or None
+        if the spec has no model for the type
+        """
+        object_type = object_type.lower()
+        with self._lock:
+            if object_type not in self._tables:
+                model_name = self._model_names.get(object_type)
+                self._tables[object_type] = None if model_name is None else \
+                    build_column_type_table(self.openapi_dict, model_name, prefix=self.prefix)
+            return self._tables[object_type]
@@ -0,0 +1,159 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import itertools
+import json
+import logging
+import os
+import os.path
+import re
+import threading
+from ftd_api.metrics import normalize_endpoint
+
+# Default number of characters of a payload rendered into the debug log
+DEFAULT_MAX_SIZE = 4096
+
+
+def _get_content_type(headers):
+    """
+    Helper to fetch the Content-Type of a header dict ('' if missing)
+    """
+    if headers is None:
+        return ''
+    return headers.get('Content-Type', '')
+
+
+class _LazyPayload:
+    """
+    Wraps a request or response body so it is only rendered if the log record is actually
+    emitted.  JSON bodies within the size cap are pretty printed as before, larger bodies are
+    truncated without being parsed and non-JSON bodies (e.g. multipart uploads) are only
+    summarized.
+    """
+
+    def __init__(self, body, content_type, max_size):
+        self.body = body
+        self.content_type = content_type
+        self.max_size = max_size
+
+    def __str__(self):
+        body = self.body
+        if body is None:
+            return '<empty>'
+        size = len(body)
+        if self.content_type.find('json') == -1:
+            return f'<{size} bytes {self.content_type or "unknown content type"} not rendered>'
+        if self.max_size and size > self.max_size:
+            prefix = body[:self.max_size]
+            if isinstance(prefix, bytes):
+                prefix = prefix.decode('utf-8', errors='replace')
+            return f'{prefix}... [truncated {size - self.max_size} of {size} bytes]'
+        try:
+            return json.dumps(json.loads(body), indent=3, sort_keys=True)
+        except ValueError:
+            return body.decode('utf-8', errors='replace') if isinstance(body, bytes) else body
+
+
+class PayloadDebugger:
+    """
+    This class logs request and response payloads at debug level as cheaply as possible so
+    debug logging can be left on for large runs.  Payloads are rendered lazily, capped at
+    max_size characters, only a sample of the requests have their payloads logged and the
+    complete payloads can be written to files in a dump directory instead of the log.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, sample_rate=1.0, dump_directory=None):
+        """
+        Parameters:
+
+        max_size -- Maximum number of characters of a payload written to the log (0 for no limit)
+        sample_rate -- Fraction (0.0 - 1.0) of the requests whose payloads are logged/dumped
+        dump_directory -- Optional directory the complete payloads of the sampled requests are written to
+        """
+        self.max_size = max_size
+        self.sample_rate = sample_rate
+        self.dump_directory = dump_directory
+        if dump_directory is not None:
+            os.makedirs(dump_directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sample_credit = 0.0
+        self._sequence = itertools.count(1)
+
+    @property
+    def enabled(self):
+        """
+        True if payloads need to be looked at for this request at all
+        """
+        return self.dump_directory is not None or logging.getLogger().isEnabledFor(logging.DEBUG)
+
+    def should_sample(self):
+        """
+        Decide if the payloads of the next request are logged.  The rate is applied
+        deterministically (e.g. 0.25 logs every 4th request) so runs are reproducible.
+        """
+        with self._lock:
+            self._sample_credit += self.sample_rate
+            if self._sample_credit >= 1.0:
+                self._sample_credit -= 1.0
+                return True
+            return False
+
+    def log_request(self, method, url, headers, body):
+        """
+        Log the URL of a request and, if sampled, its body
+
+        Return is the sequence number of the request if its payloads are sampled otherwise None
+        """
+        if not self.enabled:
+            return None
+        logging.debug(f'{method} URL: {url}')
+        if not self.should_sample():
+            return None
+        sequence = next(self._sequence)
+        if body is not None:
+            content_type = _get_content_type(headers)
+            logging.debug('%s body: %s', method, _LazyPayload(body, content_type, self.max_size))
+            self._dump(sequence, method, url, 'request', content_type, body)
+        return sequence
+
+    def log_response(self, sequence, method, url, response, streamed=False):
+        """
+        Log the body of the response to a sampled request
+
+        Parameters:
+
+        sequence -- The value returned by log_request, nothing is logged if it is None
+        method -- HTTP method
+        url -- The request URL
+        response -- The response object
+        streamed -- True if the body is streamed, it is left for the caller to consume
+        """
+        if sequence is None:
+            return
+        content_type = _get_content_type(response.headers)
+        if streamed:
+            logging.debug(f'Response Payload: <streamed {content_type} response not rendered>')
+            return
+        body = response.content
+        logging.debug('Response Payload: %s', _LazyPayload(body, content_type, self.max_size))
+        self._dump(sequence, method, url, 'response', content_type, body)
+
+    def _dump(self, sequence, method, url, direction, content_type, body):
+        """
+        Helper to write a complete payload to the dump directory
+        """
+        if self.dump_directory is None:
+            return
+        endpoint = re.sub(r'[^\w.-]', '_', normalize_endpoint(url).strip('/'))
+        extension = '.json' if content_type.find('json') != -1 else '.txt'
+        file_name = os.path.join(self.dump_directory, f'{sequence:06d}_{method}_{endpoint}_{direction}{extension}')
+        with open(file_name, 'wb') as file_handle:
+            file_handle.write(body.encode('utf-8') if isinstance(body, str) else body)
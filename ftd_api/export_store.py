@@ -0,0 +1,296 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import hashlib
+import ipaddress
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS objects (
+           device TEXT NOT NULL,
+           id TEXT NOT NULL,
+           type TEXT,
+           name TEXT,
+           version TEXT,
+           export_time REAL NOT NULL,
+           content_hash TEXT NOT NULL,
+           body TEXT NOT NULL,
+           PRIMARY KEY (device, id))''',
+    'CREATE INDEX IF NOT EXISTS objects_type_name ON objects (type, name)',
+    'CREATE INDEX IF NOT EXISTS objects_name ON objects (name)',
+    'CREATE INDEX IF NOT EXISTS objects_id ON objects (id)',
+    '''CREATE TABLE IF NOT EXISTS exports (
+           device TEXT NOT NULL,
+           export_time REAL NOT NULL,
+           export_type TEXT,
+           object_count INTEGER,
+           inserted INTEGER,
+           updated INTEGER,
+           unchanged INTEGER,
+           removed INTEGER)''',
+    'CREATE INDEX IF NOT EXISTS exports_device ON exports (device, export_time)'
+]
+
+_OBJECT_COLUMNS = 'device, id, type, name, version, export_time, body'
+
+
+def _get_store_key(body):
+    """
+    Helper to return the key a record is stored under, the id or type:name if there is no id
+    """
+    if body.get('id') is not None:
+        return str(body['id'])
+    return f"{body.get('type')}:{body.get('name')}"
+
+
+def _row_to_dict(row):
+    """
+    Helper to convert a row of the objects table to a result dict
+    """
+    return {
+        'device': row[0],
+        'id': row[1],
+        'type': row[2],
+        'name': row[3],
+        'version': row[4],
+        'export_time': row[5],
+        'data': json.loads(row[6])
+    }
+
+
+def network_object_in_subnet(body, subnet):
+    """
+    This method checks if the address (HOST), network (NETWORK) or both ends of the range
+    (RANGE) of a network object lie within the subnet, FQDN objects never do.
+
+    Parameters:
+
+    body -- The network object
+    subnet -- ipaddress network object
+    """
+    value = body.get('value')
+    if not isinstance(value, str):
+        return False
+    try:
+        if body.get('subType') == 'RANGE' or ('-' in value and '/' not in value):
+            address_list = [ipaddress.ip_address(x.strip()) for x in value.split('-', 1)]
+            return all(x.version == subnet.version and x in subnet for x in address_list)
+        network = ipaddress.ip_network(value, strict=False)
+    except ValueError:
+        return False
+    # subnet_of needs Python 3.7
+    return network.version == subnet.version and network.network_address in subnet and \
+        network.broadcast_address in subnet
+
+
+class ExportStore:
+    """
+    This class keeps the objects of device exports in a local SQLite database so they can
+    be queried across devices and exports without re-parsing the export files.  Objects are
+    stored per device under their id with the type, name, version and the time of the
+    export the stored version came from as indexed columns and the object itself as JSON.
+
+    Every export is upserted in one transaction: objects that did not change are not
+    rewritten and after a full export the objects that are gone from the device are removed.
+    The store can be shared by threads, writes are serialized.
+    """
+
+    def __init__(self, db_file):
+        """
+        Parameters:
+
+        db_file -- The SQLite database file, created if it does not exist
+        """
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        # WAL lets queries run while an export is being stored
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Close the database
+        """
+        with self._lock:
+            self._connection.close()
+
+    def upsert_records(self, device, object_list, export_time=None, export_type=None, prune=False, batch_size=1000):
+        """
+        Store the objects of an export of a device
+
+        Parameters:
+
+        device -- Name of the device the export came from
+        object_list -- List of export records (identitywrapper records or plain objects), records
+                       without a type (the metadata record) are skipped
+        export_time -- Time (seconds since the epoch) of the export, defaults to now
+        export_type -- Optional export type recorded in the export history (e.g. FULL_EXPORT)
+        prune -- If True remove the stored objects of the device that are not in the export,
+                 only use this with complete exports
+        batch_size -- Number of rows sent to SQLite per statement
+
+        Return is a dict with the counts of inserted, updated, unchanged and removed objects
+        """
+        if export_time is None:
+            export_time = time.time()
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        with self._lock, self._connection:
+            stored_hashes = dict(self._connection.execute(
+                'SELECT id, content_hash FROM objects WHERE device = ?', (device,)))
+            seen_keys = set()
+            row_list = []
+            for record in object_list:
+                if 'data' in record:
+                    body = record['data']
+                elif 'action' not in record:
+                    body = record
+                else:
+                    continue
+                if not isinstance(body, dict) or 'type' not in body or body['type'] == 'metadata':
+                    continue
+                key = _get_store_key(body)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                body_json = json.dumps(body, sort_keys=True)
+                content_hash = hashlib.sha1(body_json.encode('utf-8')).hexdigest()
+                stored_hash = stored_hashes.get(key)
+                if stored_hash == content_hash:
+                    counts['unchanged'] += 1
+                    continue
+                counts['inserted' if stored_hash is None else 'updated'] += 1
+                row_list.append((device, key, body.get('type'), body.get('name'), body.get('version'),
+                                 export_time, content_hash, body_json))
+                if len(row_list) >= batch_size:
+                    self._write_rows(row_list)
+                    row_list = []
+            if row_list:
+                self._write_rows(row_list)
+            if prune:
+                removal_list = [(device, x) for x in stored_hashes if x not in seen_keys]
+                self._connection.executemany('DELETE FROM objects WHERE device = ? AND id = ?', removal_list)
+                counts['removed'] = len(removal_list)
+            self._connection.execute(
+                'INSERT INTO exports VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (device, export_time, export_type, len(seen_keys), counts['inserted'],
+                 counts['updated'], counts['unchanged'], counts['removed']))
+        logging.info(f"Stored export of {device}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                     f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+        return counts
+
+    def _write_rows(self, row_list):
+        """
+        Helper to insert or replace a batch of object rows (called inside the transaction)
+        """
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO objects (device, id, type, name, version, export_time, content_hash, body) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            row_list)
+
+    def _select(self, sql, params):
+        """
+        Helper to run a query under the lock returning all rows
+        """
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def query(self, device=None, object_type=None, name=None, object_id=None, name_like=None, limit=None):
+        """
+        Return the stored objects matching all of the criteria given, device, object_type, name
+        and object_id can also be lists in which case any of the values matches
+
+        Parameters:
+
+        device -- Device name
+        object_type -- Object type (e.g. networkobject)
+        name -- Exact object name
+        object_id -- Object id
+        name_like -- SQL LIKE pattern for the name (e.g. web%)
+        limit -- Maximum number of objects to return
+
+        Return is a list of dicts with device, id, type, name, version, export_time and data
+        (the object) ordered by device, type and name
+        """
+        condition_list = []
+        params = []
+        for column, value in (('device', device), ('type', object_type), ('name', name), ('id', object_id)):
+            if isinstance(value, (list, tuple, set)):
+                condition_list.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            elif value is not None:
+                condition_list.append(f'{column} = ?')
+                params.append(value)
+        if name_like is not None:
+            condition_list.append('name LIKE ?')
+            params.append(name_like)
+        sql = f'SELECT {_OBJECT_COLUMNS} FROM objects'
+        if condition_list:
+            sql += ' WHERE ' + ' AND '.join(condition_list)
+        sql += ' ORDER BY device, type, name, id'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [_row_to_dict(x) for x in self._select(sql, params)]
+
+    def query_subnet(self, subnet, device=None):
+        """
+        Return the network objects whose address, network or range lies within the subnet
+
+        Parameters:
+
+        subnet -- Network in CIDR notation (e.g. 10.0.0.0/8)
+        device -- Optional device name to restrict the search to
+        """
+        network = ipaddress.ip_network(subnet, strict=False)
+        return [x for x in self.query(device=device, object_type='networkobject')
+                if network_object_in_subnet(x['data'], network)]
+
+    def get_devices_with_object(self, object_id=None, object_type=None, name=None):
+        """
+        Return the sorted list of devices that have the object with the id or the type and name
+        """
+        if object_id is None and name is None:
+            raise Exception('An object id or name is required')
+        return sorted(set(x['device'] for x in self.query(object_type=object_type, name=name, object_id=object_id)))
+
+    def get_device_list(self):
+        """
+        Return the sorted list of devices in the store
+        """
+        return [x[0] for x in self._select('SELECT DISTINCT device FROM objects ORDER BY device', [])]
+
+    def get_export_history(self, device=None):
+        """
+        Return the exports stored (newest first) as dicts with device, export_time, export_type,
+        object_count, inserted, updated, unchanged and removed
+        """
+        sql = 'SELECT * FROM exports'
+        params = []
+        if device is not None:
+            sql += ' WHERE device = ?'
+            params.append(device)
+        column_list = ('device', 'export_time', 'export_type', 'object_count',
+                       'inserted', 'updated', 'unchanged', 'removed')
+        return [dict(zip(column_list, x)) for x in self._select(sql + ' ORDER BY export_time DESC', params)]
@@ -0,0 +1,227 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import concurrent.futures
+import json
+import logging
+import os
+import os.path
+import re
+import time
+import ftd_api.parse_properties as parse_properties
+from ftd_api.bulk_tool import BulkTool
+from ftd_api.ftd_client import FTDClient
+from ftd_api.paging import AdaptivePageSizer
+from ftd_api.file_helper import print_string_to_file
+
+# File the per-device summaries of a fleet export are written to in the base directory
+FLEET_SUMMARY_FILE = 'fleet_summary.json'
+
+
+def read_inventory(inventory_file):
+    """
+    This method reads a fleet inventory file.  The inventory lists one device properties
+    file per line (the same key=value format used with the -c option, address, port,
+    username, password and an optional name).  '#' comments and blank lines are skipped
+    and relative paths are resolved against the directory of the inventory file.
+
+    Parameters:
+
+    inventory_file -- Path to the inventory file
+
+    Returns:
+
+    List of device property dictionaries
+    """
+    inventory_directory = os.path.dirname(os.path.abspath(inventory_file))
+    device_list = []
+    with open(inventory_file, 'r') as file_handle:
+        for line in file_handle:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            properties_file = os.path.join(inventory_directory, line)
+            device = parse_properties.file_to_dict(properties_file)
+            if 'address' not in device:
+                raise Exception(f'No address found in device properties file: {properties_file}')
+            device['properties_file'] = properties_file
+            device_list.append(device)
+    return device_list
+
+
+def get_device_name(device):
+    """
+    Return a file system safe name for a device, the name property is used if present
+    otherwise the address (and port if it is not 443)
+    """
+    if 'name' in device:
+        name = device['name']
+    elif str(device.get('port', '443')) != '443':
+        name = f"{device['address']}_{device['port']}"
+    else:
+        name = device['address']
+    return re.sub(r'[^\w.-]', '_', name)
+
+
+class FleetExecutor:
+    """
+    This class runs a bulk operation against a list of devices concurrently.  Each device
+    gets its own client session and failures on one device do not stop the others.
+    """
+
+    def __init__(self, device_list, max_workers=8, metrics=None, tracer=None, payload_debugger=None, token_cache=None,
+                 adaptive_paging=False):
+        """
+        Parameters:
+
+        device_list -- List of device property dictionaries (see read_inventory)
+        max_workers -- Maximum number of devices worked on at the same time
+        metrics -- Optional MetricsRegistry shared by the clients of all devices
+        tracer -- Optional Tracer shared by the clients of all devices
+        payload_debugger -- Optional PayloadDebugger shared by the clients of all devices
+        token_cache -- Optional TokenCache, cached tokens are reused and devices are not logged out
+                       at the end so the tokens stay valid for the next run
+        adaptive_paging -- If True each device client tunes its page sizes with its own AdaptivePageSizer
+        """
+        self.device_list = device_list
+        self.max_workers = max_workers
+        self.metrics = metrics
+        self.tracer = tracer
+        self.payload_debugger = payload_debugger
+        self.token_cache = token_cache
+        self.adaptive_paging = adaptive_paging
+
+    def _create_bulk_tool(self, device):
+        """
+        Helper to create a logged in BulkTool for a device
+        """
+        client = FTDClient(address=device['address'],
+                           port=device.get('port', 443),
+                           username=device.get('username', 'admin'),
+                           password=device.get('password', 'Admin123'),
+                           metrics=self.metrics,
+                           tracer=self.tracer,
+                           payload_debugger=self.payload_debugger,
+                           token_cache=self.token_cache,
+                           page_sizer=AdaptivePageSizer() if self.adaptive_paging else None)
+        client.login()
+        return BulkTool(client)
+
+    def _run_device(self, device, operation):
+        """
+        Run the operation against a single device returning the summary record for the device
+        """
+        device_name = get_device_name(device)
+        summary = {
+            'device': device_name,
+            'address': device['address'],
+            'status': 'SUCCESS',
+            'elapsed': None,
+            'result': None,
+            'error': None
+        }
+        start_time = time.time()
+        bulk_tool = None
+        try:
+            bulk_tool = self._create_bulk_tool(device)
+            with bulk_tool.tracer.span('device', device=device_name):
+                summary['result'] = operation(bulk_tool, device_name)
+        except Exception as err:
+            logging.error(f'[{device_name}] failed: {err}')
+            summary['status'] = 'FAILED'
+            summary['error'] = str(err)
+        finally:
+            if bulk_tool is not None and self.token_cache is None:
+                try:
+                    bulk_tool.client.logout()
+                except Exception as err:
+                    logging.warning(f'[{device_name}] logout failed: {err}')
+            if bulk_tool is not None:
+                bulk_tool.client.close()
+        summary['elapsed'] = round(time.time() - start_time, 3)
+        logging.info(f"[{device_name}] {summary['status']} in {summary['elapsed']}s")
+        return summary
+
+    def run(self, operation):
+        """
+        Run an operation against every device
+
+        Parameters:
+
+        operation -- Callable taking (bulk_tool, device_name) whose return value is kept in the summary
+
+        Return is the list of per-device summaries in inventory order
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_device, device, operation) for device in self.device_list]
+            return [future.result() for future in futures]
+
+    def bulk_export(self, destination_directory, url=None, export_store=None, **export_args):
+        """
+        Run BulkTool.bulk_export (or BulkTool.url_export) against every device writing into a
+        directory per device under destination_directory.  The per-device summaries are
+        written to fleet_summary.json in destination_directory.
+
+        Parameters:
+
+        destination_directory -- The base directory for the per-device directories
+        url -- Optional URL to run a URL export of instead of an export job
+        export_store -- Optional ExportStore the objects are stored in under the device name,
+                        not used with url
+        export_args -- Keyword arguments passed through to BulkTool.bulk_export or BulkTool.url_export
+
+        Return is the list of per-device summaries
+        """
+        def export_device(bulk_tool, device_name):
+            device_directory = os.path.normpath(destination_directory + '/' + device_name)
+            os.makedirs(device_directory, exist_ok=True)
+            if url is not None:
+                return bulk_tool.url_export(url, device_directory, **export_args)
+            return bulk_tool.bulk_export(device_directory, export_store=export_store, device_name=device_name,
+                                         **export_args)
+        summary_list = self.run(export_device)
+        write_summary(os.path.normpath(destination_directory + '/' + FLEET_SUMMARY_FILE), summary_list)
+        return summary_list
+
+    def bulk_import(self, file_list, **import_args):
+        """
+        Run BulkTool.bulk_import of the same files against every device
+
+        Parameters:
+
+        file_list -- A Python list of files to import
+        import_args -- Keyword arguments passed through to BulkTool.bulk_import
+
+        Return is the list of per-device summaries
+        """
+        def import_device(bulk_tool, device_name):
+            return bulk_tool.bulk_import(file_list, **import_args)
+        return self.run(import_device)
+
+
+def log_summary(summary_list):
+    """
+    Log a one line result per device and a total
+    """
+    failed = [x for x in summary_list if x['status'] != 'SUCCESS']
+    for summary in summary_list:
+        message = f"  {summary['device']}: {summary['status']} ({summary['elapsed']}s)"
+        if summary['error']:
+            message += f" {summary['error']}"
+        logging.info(message)
+    logging.info(f'Fleet run complete: {len(summary_list) - len(failed)} succeeded, {len(failed)} failed')
+
+
+def write_summary(summary_file, summary_list):
+    """
+    Write the per-device summaries as a JSON document
+    """
+    print_string_to_file(summary_file, json.dumps(summary_list, indent=3, sort_keys=True))
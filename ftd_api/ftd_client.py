@@ -11,17 +11,31 @@ updated
 '''
 import requests
 import json
+import threading
 import warnings
 import logging
 import time
-from ftd_api.parse_json import pretty_print_json_string
+from urllib.parse import urlencode
+from ftd_api.parse_json import compile_field_list
+from ftd_api.parse_json import project_dict
+from ftd_api.concurrency import AdaptiveConcurrencyLimiter
+from ftd_api.debug_payload import PayloadDebugger
+from ftd_api.metrics import MetricsRegistry
+from ftd_api.metrics import normalize_endpoint
+from ftd_api.token_cache import get_token_key
+from ftd_api.tracing import Tracer
+from ftd_api.tracing import traced
 
 class FTDClient:
     '''
     This is a basic FTD REST client that will assist in generating a login token
+
+    A single client can be shared by many threads.  Each thread sends its requests over its
+    own pooled connection (requests.Session), the tokens are swapped under a lock and when a
+    rejected token is replaced only one thread logs in again.
     '''
 
-    # Default headers
+    # Default headers (copied per instance, never modified)
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json"
@@ -54,8 +68,122 @@ class FTDClient:
         """
         Helper to fetch base URL
         """
-        return 'https://'+self.get_address_and_port_string()
+        return self.scheme+'://'+self.get_address_and_port_string()
+
+    def _get_token_url(self):
+        """
+        Helper to fetch the URL of the token (login/logout) calls
+        """
+        return f'{self._get_base_url()}/api/fdm/{self.version}/fdm/token'
+
+    def _get_session(self):
+        """
+        Helper to fetch the requests session of the current thread.  A session keeps its
+        connections open between requests but is not safe to share between threads.
+        """
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.verify = False
+            self._thread_local.session = session
+            with self._session_lock:
+                self._session_list.append(session)
+        return session
+
+    def close(self):
+        """
+        Close the pooled connections of all threads
+        """
+        with self._session_lock:
+            for session in self._session_list:
+                session.close()
+            self._session_list = []
+        self._thread_local = threading.local()
     
+    def _send_request(self, method, url, headers, body=None, extra_request_opts=None):
+        """
+        Helper that sends a request through the concurrency limiter, records the request
+        metrics and logs the payloads in debug mode.  All REST calls other than the token
+        calls go through here.
+
+        Parameters:
+
+        method -- HTTP method
+        url -- The full URL
+        headers -- The complete set of headers
+        body -- Optional body to send
+        extra_request_opts -- These are extra key value args to be passed into the requests call
+
+        This method will return the HTTP response object
+        """
+        if extra_request_opts is None:
+            extra_request_opts = {}
+        response_payload = None
+        if isinstance(body, str):
+            # Encode once so the size recorded is the number of bytes sent
+            body = body.encode('utf-8')
+        bytes_sent = len(body) if body is not None else 0
+        sequence = self.payload_debugger.log_request(method, url, headers, body)
+        start_time = time.time()
+        with self.tracer.span(f'{method} {normalize_endpoint(url)}', bytes_sent=bytes_sent) as span:
+            try:
+                with self.concurrency_limiter.track() as tracker:
+                    response_payload = self._get_session().request(method, url, headers=headers, verify=False, data=body, **extra_request_opts)
+                    tracker.status_code = response_payload.status_code
+                self.payload_debugger.log_response(sequence, method, url, response_payload,
+                                                   streamed=extra_request_opts.get('stream', False))
+                return response_payload
+            finally:
+                bytes_received = 0
+                if response_payload is not None:
+                    if extra_request_opts.get('stream'):
+                        # Don't read a streamed body here rely on the header
+                        bytes_received = int(response_payload.headers.get('Content-Length', 0))
+                    else:
+                        bytes_received = len(response_payload.content)
+                status_code = response_payload.status_code if response_payload is not None else None
+                span.set_attribute('status_code', status_code)
+                span.set_attribute('bytes_received', bytes_received)
+                self.metrics.record_request(method,
+                                            url,
+                                            status_code,
+                                            bytes_sent,
+                                            bytes_received,
+                                            time.time() - start_time)
+
+    def _send_authorized_request(self, method, additional_url, body=None, additional_headers=None, extra_request_opts=None):
+        """
+        Helper that adds the authorization headers and sends the request.  A token may expire
+        during a long run, be revoked or a cached token may be lost by a device restart, if the
+        device rejects the token (401) of a client that logged in itself it is dropped from the
+        cache and the request is retried once with a fresh login.  If several threads see the same token rejected only the first
+        one logs in, the others retry with the token it obtained.
+
+        Parameters:
+
+        method -- HTTP method
+        additional_url -- The URL after the ip and port
+        body -- Optional body to send
+        additional_headers -- Other headers to append
+        extra_request_opts -- These are extra key value args to be passed into the requests call
+
+        This method will return the HTTP response object
+        """
+        url = self._get_base_url() + additional_url
+        all_headers = self._create_auth_headers()
+        if additional_headers is not None:
+            all_headers.update(additional_headers)
+        response_payload = self._send_request(method, url, all_headers, body=body, extra_request_opts=extra_request_opts)
+        if response_payload.status_code == 401 and self._token_kind is not None:
+            response_payload.close()
+            with self._token_lock:
+                if all_headers['Authorization'] == 'Bearer ' + str(self.get_access_token()):
+                    logging.info('Access token was rejected logging in again')
+                    self._replace_rejected_token()
+                all_headers['Authorization'] = 'Bearer ' + self.get_access_token()
+            response_payload = self._send_request(method, url, all_headers, body=body, extra_request_opts=extra_request_opts)
+        return response_payload
+
     def do_post_raw(self, additional_url, body, additional_headers=None, extra_request_opts=None):
         """
         This method will do a post request and will return the response object
@@ -69,24 +197,11 @@ class FTDClient:
         
         This method will return the HTTP response object
         """
-        all_headers = self._create_auth_headers()
-        if additional_headers is not None:
-            all_headers.update(additional_headers)
-
-        url = self._get_base_url() + additional_url
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-            logging.debug(f'POST URL: {url}')
-            if 'Content-Type' in all_headers and all_headers['Content-Type'].find('json') != -1:
-                # Only log this for JSON document types
-                logging.debug(f'POST body: {pretty_print_json_string(body)}')
-        if extra_request_opts:
-            response_payload = requests.post(url, headers=all_headers, verify=False, data=body, **extra_request_opts)
-        else:
-            response_payload = requests.post(url, headers=all_headers, verify=False, data=body)
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-            if 'Content-Type' in response_payload.headers and response_payload.headers['Content-Type'].find('application/json') != -1:
-                logging.debug(f'Response Payload: {str(pretty_print_json_string(response_payload.text))}')
-        return response_payload
+        return self._send_authorized_request('POST',
+                                             additional_url,
+                                             body=body,
+                                             additional_headers=additional_headers,
+                                             extra_request_opts=extra_request_opts)
         
     def do_post_raw_with_base_url(self, additional_url, body, additional_headers=None, extra_request_opts=None):
         """
@@ -106,6 +221,76 @@ class FTDClient:
                                 additional_headers=additional_headers, 
                                 extra_request_opts=extra_request_opts)
         
+    def do_put_raw(self, additional_url, body, additional_headers=None, extra_request_opts=None):
+        """
+        This method will do a put request and will return the response object
+
+        Parameters:
+
+        additional_url -- The URL after the ip and port
+        body -- The body to put
+        additional_headers -- Other headers to append
+        extra_request_opts -- These are extra key value args to be passed into the requests put call
+
+        This method will return the HTTP response object
+        """
+        return self._send_authorized_request('PUT',
+                                             additional_url,
+                                             body=body,
+                                             additional_headers=additional_headers,
+                                             extra_request_opts=extra_request_opts)
+
+    def do_put_raw_with_base_url(self, additional_url, body, additional_headers=None, extra_request_opts=None):
+        """
+        This method will do a put request and will return the response object
+
+        Parameters:
+
+        additional_url -- The URL after the base FTD-API url /api/fdm/latest/
+        body -- The body to put
+        additional_headers -- Other headers to append
+        extra_request_opts -- These are extra key value args to be passed into the requests put call
+
+        This method will return the HTTP response object
+        """
+        return self.do_put_raw(f'/api/fdm/{self.version}{additional_url}',
+                               body,
+                               additional_headers=additional_headers,
+                               extra_request_opts=extra_request_opts)
+
+    def do_delete_raw(self, additional_url, additional_headers=None, extra_request_opts=None):
+        """
+        This method will do a delete request and will return the response object
+
+        Parameters:
+
+        additional_url -- The URL after the ip and port
+        additional_headers -- Other headers to append
+        extra_request_opts -- These are extra key value args to be passed into the requests delete call
+
+        This method will return the HTTP response object
+        """
+        return self._send_authorized_request('DELETE',
+                                             additional_url,
+                                             additional_headers=additional_headers,
+                                             extra_request_opts=extra_request_opts)
+
+    def do_delete_raw_with_base_url(self, additional_url, additional_headers=None, extra_request_opts=None):
+        """
+        This method will do a delete request and will return the response object
+
+        Parameters:
+
+        additional_url -- The URL after the base FTD-API url /api/fdm/latest/
+        additional_headers -- Other headers to append
+        extra_request_opts -- These are extra key value args to be passed into the requests delete call
+
+        This method will return the HTTP response object
+        """
+        return self.do_delete_raw(f'/api/fdm/{self.version}{additional_url}',
+                                  additional_headers=additional_headers,
+                                  extra_request_opts=extra_request_opts)
+
     def do_get_raw(self, additional_url, additional_headers=None, extra_request_opts=None):
         """
         This method does a generic get and takes the entire URI as an argument
@@ -118,20 +303,10 @@ class FTDClient:
         
         This method will return a raw response object (not JSON)
         """
-        all_headers = self._create_auth_headers()
-        url = self._get_base_url() + additional_url
-        if additional_headers is not None:
-            all_headers.update(additional_headers)
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-            logging.debug(f'GET URL: {url}')
-        if extra_request_opts is not None:
-            response_payload = requests.get(url, headers=all_headers, verify=False, **extra_request_opts)
-        else:
-            response_payload = requests.get(url, headers=all_headers, verify=False)
-        if logging.getLogger().isEnabledFor(logging.DEBUG):
-            if 'Content-Type' in response_payload.headers and response_payload.headers['Content-Type'].find('application/json') != -1:
-                logging.debug(f'Response Payload: {str(pretty_print_json_string(response_payload.text))}')
-        return response_payload
+        return self._send_authorized_request('GET',
+                                             additional_url,
+                                             additional_headers=additional_headers,
+                                             extra_request_opts=extra_request_opts)
     
     def do_get_raw_with_base_url(self, additional_url, additional_headers=None, extra_request_opts=None):
         """
@@ -148,7 +323,7 @@ class FTDClient:
         """
         return self.do_get_raw(f'/api/fdm/{self.version}{additional_url}', additional_headers=additional_headers, extra_request_opts=extra_request_opts)
        
-    def do_get_single_page(self, additional_url, additional_headers=None, limit=None, offset=None):
+    def do_get_single_page(self, additional_url, additional_headers=None, limit=None, offset=None, query_params=None):
         """
         This method will do a GET and assumes the response is a paged JSON document
         
@@ -158,51 +333,112 @@ class FTDClient:
         additional_headers -- Additional headers to append
         limit -- The number of records to fetch
         offset -- The offset to start fetching items from the list
+        query_params -- Optional dict of further query parameters (e.g. filter), None values are skipped
 
         The return value is a parsed JSON document
         """
-        append_ampersand = False
-        if limit is not None or offset is not None:
-            additional_url += '?'
-        if limit is not None:
-            additional_url += f'limit={str(limit)}'
-            append_ampersand = True
-        if offset is not None:
-            if append_ampersand:
-                additional_url += '&'
-            additional_url += f'offset={str(offset)}'
-        return self.do_get_raw_with_base_url(additional_url, additional_headers).json()
+        return self._get_single_page_response(additional_url, additional_headers, limit, offset, query_params).json()
+
+    def _get_single_page_response(self, additional_url, additional_headers=None, limit=None, offset=None, query_params=None):
+        """
+        Helper that requests a page returning the response object (see do_get_single_page)
+        """
+        query = {'limit': limit, 'offset': offset}
+        if query_params is not None:
+            query.update(query_params)
+        query = {key: value for key, value in query.items() if value is not None}
+        if query:
+            separator = '&' if '?' in additional_url else '?'
+            additional_url += separator + urlencode(query)
+        return self.do_get_raw_with_base_url(additional_url, additional_headers)
     
-    def do_get_multi_page(self, additional_url, additional_headers=None, limit=None, filter_system_defined=True):
+    def iter_multi_page(self, additional_url, additional_headers=None, limit=None, filter_system_defined=True,
+                        filter_expression=None, fields=None, push_down_fields=True):
         """
-        This method will read in all pages of data and return that as a list of 
-        parsed JSON documents.
+        This is a generator that will read in all pages of data yielding the list of
+        items of each page as soon as it arrives.
 
         Parameters:
 
         url -- The URL to GET
-        limit -- The optional limit of records per page
-
-        Return value is the list of items retrieved.  The assumption is that
-        whatever is returned has a paging wrapper and an "items" list of results.
+        limit -- The optional limit of records per page, if not passed and the client has a
+                 page sizer the sizer picks the limit of each page
+        filter_system_defined -- If True system defined objects are removed from each page
+        filter_expression -- Optional FTD filter expression passed as the filter query parameter (e.g. name:outside)
+        fields -- Optional list of fields (dotted paths for nested fields) to keep in each item, the
+                  other fields are dropped locally as the pages arrive
+        push_down_fields -- If True the fields are also requested with the fields query parameter so
+                            the device can leave the other fields out of the response
+
+        The assumption is that whatever is returned has a paging wrapper and an "items" list of results.
         """
+        query_params = {'filter': filter_expression}
+        field_tree = None
+        if fields:
+            field_tree = compile_field_list(fields)
+            if push_down_fields:
+                # The system defined flag is needed to filter even if it is not kept
+                server_fields = list(fields) + (['isSystemDefined'] if filter_system_defined else [])
+                query_params['fields'] = ','.join(dict.fromkeys(server_fields))
+        page_sizer = self.page_sizer if limit is None else None
         offset = 0
         item_count = 0
-        result_list = []
         while True:
-            result = self.do_get_single_page(additional_url,
-                                    additional_headers=additional_headers, 
-                                    limit=limit, 
-                                    offset=offset)
+            page_limit = page_sizer.get_limit(additional_url) if page_sizer is not None else limit
+            start_time = time.time()
+            response = self._get_single_page_response(additional_url,
+                                                      additional_headers=additional_headers,
+                                                      limit=page_limit,
+                                                      offset=offset,
+                                                      query_params=query_params)
+            result = response.json()
             paging = result['paging']
             items = result['items']
             item_count += len(items)
             offset += len(items)
-            result_list.extend(items)
-            if item_count == paging['count'] or len(items) == 0:
+            if page_sizer is not None:
+                page_sizer.record_page(additional_url,
+                                       page_limit,
+                                       len(items),
+                                       time.time() - start_time,
+                                       len(response.content),
+                                       last_page=item_count >= paging['count'])
+            if filter_system_defined:
+                items = [x for x in items if 'isSystemDefined' not in x or x['isSystemDefined'] == False]
+            if field_tree is not None:
+                items = [project_dict(x, field_tree) for x in items]
+            yield items
+            if item_count == paging['count'] or len(result['items']) == 0:
                 break
-        if filter_system_defined:
-            result_list = [x for x in result_list if 'isSystemDefined' not in x or x['isSystemDefined'] == False]
+
+    @traced('do_get_multi_page')
+    def do_get_multi_page(self, additional_url, additional_headers=None, limit=None, filter_system_defined=True,
+                          filter_expression=None, fields=None, push_down_fields=True):
+        """
+        This method will read in all pages of data and return that as a list of 
+        parsed JSON documents.
+
+        Parameters:
+
+        url -- The URL to GET
+        limit -- The optional limit of records per page
+        filter_expression, fields, push_down_fields -- See iter_multi_page
+
+        Return value is the list of items retrieved.  The assumption is that
+        whatever is returned has a paging wrapper and an "items" list of results.
+        """
+        result_list = []
+        for items in self.iter_multi_page(additional_url,
+                                          additional_headers=additional_headers,
+                                          limit=limit,
+                                          filter_system_defined=filter_system_defined,
+                                          filter_expression=filter_expression,
+                                          fields=fields,
+                                          push_down_fields=push_down_fields):
+            result_list.extend(items)
+        span = self.tracer.current_span()
+        span.set_attribute('url', additional_url)
+        span.set_attribute('object_count', len(result_list))
         return result_list
 
     def get_openapi_spec(self):
@@ -217,7 +453,17 @@ class FTDClient:
         else:
             logging.error('Unable to retrieve OpenAPI spec')
 
-    def __init__(self, address='192.168.1.1', port=443, username="admin", password="Admin123", version='latest'):
+    def get_concurrency_state(self):
+        """
+        This method returns the current state of the adaptive concurrency limiter, the
+        current limit, requests in flight and the most recent limit change with its reason.
+        The full list of changes is available in concurrency_limiter.history
+        """
+        return self.concurrency_limiter.get_state()
+
+    def __init__(self, address='192.168.1.1', port=443, username="admin", password="Admin123", version='latest',
+                 concurrency_limiter=None, metrics=None, tracer=None, payload_debugger=None, token_cache=None,
+                 scheme='https', page_sizer=None):
         """
         Constructor used to initialize the bravado_client
 
@@ -225,10 +471,22 @@ class FTDClient:
         port: Port number to connect to
         username: username to use (default 'admin')
         password: password to use (default 'Admin123')
+        concurrency_limiter: AdaptiveConcurrencyLimiter bounding the requests in flight against the
+                             device (a default limiter is created if not passed)
+        metrics: MetricsRegistry the request metrics are recorded in (a registry is created if not passed
+                 pass a shared registry to aggregate several clients)
+        tracer: Tracer the request spans are recorded with (tracing is disabled if not passed)
+        payload_debugger: PayloadDebugger controlling how request/response payloads are logged in debug mode
+                          (a debugger with the default size cap is created if not passed)
+        token_cache: Optional TokenCache, login()/login_custom() reuse an unexpired token of the same
+                     device/user/API version from the cache instead of requesting a new one
+        scheme: URL scheme ('https' unless talking to a test server)
+        page_sizer: Optional AdaptivePageSizer, paged GETs without an explicit limit let it tune the page size
         """
         # stash connectivity info for login call
         self.server_address = address
         self.server_port = port
+        self.scheme = scheme
         self.username = username
         self.password = password
 
@@ -240,6 +498,40 @@ class FTDClient:
         # original_custom_token is where we store the custom token
         self.original_custom_token = None
 
+        # Instance copy of the default headers so callers changing them don't affect other clients
+        self.headers = dict(FTDClient.headers)
+        # Guards the token attributes so a token swap is seen by other threads as a whole
+        self._token_lock = threading.RLock()
+        # Each thread gets its own session, the list is kept so close() can reach all of them
+        self._thread_local = threading.local()
+        self._session_lock = threading.Lock()
+        self._session_list = []
+
+        self.token_cache = token_cache
+        # Remember how the current token was obtained so a rejected token can be replaced
+        self._token_kind = None
+        self._custom_login_args = None
+
+        # All REST requests go through the limiter so concurrent callers back off when the
+        # device reports it is overloaded
+        if concurrency_limiter is None:
+            concurrency_limiter = AdaptiveConcurrencyLimiter()
+        self.concurrency_limiter = concurrency_limiter
+
+        if metrics is None:
+            metrics = MetricsRegistry()
+        self.metrics = metrics
+
+        if tracer is None:
+            tracer = Tracer()
+        self.tracer = tracer
+
+        if payload_debugger is None:
+            payload_debugger = PayloadDebugger()
+        self.payload_debugger = payload_debugger
+
+        self.page_sizer = page_sizer
+
         # WARNINGS
         requests.packages.urllib3.disable_warnings()
         # swagger doesn't like 'also_return_response' sent from FDM
@@ -252,27 +544,87 @@ class FTDClient:
         else:
             self.version = 'v'+str(version)
 
+    def _get_token_key(self, token_kind):
+        """
+        Helper to fetch the token cache key of this client
+        """
+        return get_token_key(self.server_address, self.server_port, self.username, self.version, token_kind)
+
+    def _get_cached_token(self, token_kind):
+        """
+        Helper to fetch an unexpired token from the token cache (None if there is none or no cache is used)
+        """
+        if self.token_cache is None:
+            return None
+        access_token = self.token_cache.get(self._get_token_key(token_kind))
+        if access_token is not None:
+            logging.debug(f'Reusing cached {token_kind} access token')
+        return access_token
+
+    def _put_cached_token(self, token_kind, token_response):
+        """
+        Helper to store the token of a token call response in the token cache
+        """
+        if self.token_cache is not None:
+            # FDM tokens default to a 30 minute lifetime if the response doesn't say
+            self.token_cache.put(self._get_token_key(token_kind),
+                                 token_response['access_token'],
+                                 token_response.get('expires_in', 1800))
+
+    def _remove_cached_token(self, token_kind):
+        """
+        Helper to drop a revoked or rejected token from the token cache
+        """
+        if self.token_cache is not None:
+            self.token_cache.remove(self._get_token_key(token_kind))
+
+    def _replace_rejected_token(self):
+        """
+        Helper to drop the current token from the cache and obtain a new one the same way
+        """
+        # A custom login starts with a normal login so drop both, if one token was rejected
+        # (e.g. the device was restarted) the other one most likely is no good either
+        self._remove_cached_token('password')
+        self._remove_cached_token('custom')
+        if self._token_kind == 'custom':
+            admin_client, session_length = self._custom_login_args
+            self.login_custom(admin_client=admin_client, session_length=session_length)
+        else:
+            self.login()
+
     def login(self):
         """
         This is the normal login which will give you a ~30 minute session with no refresh.  Should be fine for short lived work.
         Do not use for sessions that need to last longer than 30 minutes.
+
+        If a token cache is used an unexpired token from an earlier login is reused.
         """
+        cached_token = self._get_cached_token('password')
+        if cached_token is not None:
+            with self._token_lock:
+                self._token_kind = 'password'
+                self.access_token = cached_token
+                self.original_access_token = cached_token
+            return
         # create auth payload
         payload = '{{"grant_type": "password", "username": "{}", "password": "{}"}}'.format(
             self.username, self.password)
-        auth_headers = {**FTDClient.headers}
-        r = requests.post("https://{}:{}/api/fdm/{}/fdm/token".format(self.server_address, self.server_port, self.version),
-                          data=payload, verify=False, headers=auth_headers)
+        auth_headers = {**self.get_headers()}
+        r = self._get_session().post(self._get_token_url(), data=payload, verify=False, headers=auth_headers)
         if r.status_code == 400:
             raise Exception("Error logging in: {}".format(r.content))
         try:
-            # This token will act as the
-            self.access_token = r.json()['access_token']
-            # cache the original token in case we do a custom login
-            self.original_access_token = self.access_token
+            access_token = r.json()['access_token']
+            with self._token_lock:
+                self._token_kind = 'password'
+                # This token will act as the
+                self.access_token = access_token
+                # cache the original token in case we do a custom login
+                self.original_access_token = access_token
+            self._put_cached_token('password', r.json())
         except:
             logging.error(
-                f'Unable to log into server: https://{self.server_address}:{self.server_port}')
+                f'Unable to log into server: {self._get_base_url()}')
             raise
 
     def login_custom(self, admin_client=None, session_length=86400):
@@ -282,6 +634,8 @@ class FTDClient:
 
         admin_client: administrative client to take a token from to obtain the custom token
 
+        If a token cache is used an unexpired custom token from an earlier login is reused.
+
         Return value is the JSON return value from the login transaction (can typically be ignored as an exception will be raised if unsuccessful)
 
         '''
@@ -289,6 +643,15 @@ class FTDClient:
         # custom token (this is a normal 30 minute login token)
         admin_access_token = None
 
+        self._custom_login_args = (admin_client, session_length)
+        cached_token = self._get_cached_token('custom')
+        if cached_token is not None:
+            with self._token_lock:
+                self.access_token = cached_token
+                self.original_custom_token = cached_token
+                self._token_kind = 'custom'
+            return
+
         if not admin_client:
             # login with a normal session first
             self.login()
@@ -304,16 +667,19 @@ class FTDClient:
         # Note:  If using this with production code you should probably disable the following log for
         # security reasons.
         logging.debug('Custom payload: %s' % payload)
-        auth_headers = {**FTDClient.headers}
-        r = requests.post("https://{}:{}/api/fdm/{}/fdm/token".format(self.server_address, self.server_port, self.version),
-                          data=payload, verify=False, headers=auth_headers)
+        auth_headers = {**self.get_headers()}
+        r = self._get_session().post(self._get_token_url(), data=payload, verify=False, headers=auth_headers)
 
         if r.status_code == 400:
             raise Exception("Error logging in: {}".format(r.content))
 
         try:
-            self.access_token = r.json()['access_token']
-            self.original_custom_token = self.access_token
+            access_token = r.json()['access_token']
+            with self._token_lock:
+                self.access_token = access_token
+                self.original_custom_token = access_token
+                self._token_kind = 'custom'
+            self._put_cached_token('custom', r.json())
         except:
             logging.error('Unable to find access token in JSON: %s' % r.json())
             raise
@@ -325,13 +691,14 @@ class FTDClient:
         logout_payload = {'grant_type':      'revoke_token',
                           'access_token':    self.original_access_token,
                           'token_to_revoke': self.original_access_token}
-        r = requests.post("https://{}:{}/api/fdm/{}/fdm/token".format(self.server_address, self.server_port, self.version),
-                          data=json.dumps(logout_payload), verify=False, headers=FTDClient.headers)
+        r = self._get_session().post(self._get_token_url(), data=json.dumps(logout_payload), verify=False, headers=self.get_headers())
         if r.status_code != 200:
             raise Exception('Logout failed: '+str(r.json()))
+        self._remove_cached_token('password')
         if not preserve_tokens:
-            self.access_token = None
-            self.original_access_token = None
+            with self._token_lock:
+                self.access_token = None
+                self.original_access_token = None
         logging.info("Performed normal token logout.")
 
     def logout_custom(self, admin_client=None, preserve_tokens=False):
@@ -340,6 +707,8 @@ class FTDClient:
 
         admin_client: Is the client with the administrative token to be used for revoking if not
         in the current client.  If an admin client is not passed the current client will be used.
+        If there is no administrative token (the custom token came from the token cache) the
+        token is not revoked on the device, it is only dropped locally.
         preserve_tokens: This is a flag to leave the tokens and not null them out for negative testing
         """
 
@@ -348,16 +717,21 @@ class FTDClient:
         else:
             admin_token_for_revoke = self.original_access_token
 
-        logout_payload = {'grant_type':      'revoke_token',
-                          'access_token':    admin_token_for_revoke,
-                          'token_to_revoke': self.original_custom_token}
-        r = requests.post("https://{}:{}/api/fdm/{}/fdm/token".format(self.server_address, self.server_port, self.version),
-                          data=json.dumps(logout_payload), verify=False, headers=FTDClient.headers)
-        if r.status_code != 200:
-            raise Exception('Logout failed: '+str(r.json()))
+        if admin_token_for_revoke is None:
+            logging.warning('No admin token to revoke the custom token with, it stays valid on the device '
+                            'until it expires.  Pass an admin_client to revoke it.')
+        else:
+            logout_payload = {'grant_type':      'revoke_token',
+                              'access_token':    admin_token_for_revoke,
+                              'token_to_revoke': self.original_custom_token}
+            r = self._get_session().post(self._get_token_url(), data=json.dumps(logout_payload), verify=False, headers=self.get_headers())
+            if r.status_code != 200:
+                raise Exception('Logout failed: '+str(r.json()))
+        self._remove_cached_token('custom')
         if not preserve_tokens:
-            self.access_token = None
-            self.original_custom_token = None
+            with self._token_lock:
+                self.access_token = None
+                self.original_custom_token = None
         logging.info("Performed custom token logout.")
 
     def __enter__(self):
@@ -372,3 +746,4 @@ class FTDClient:
                                                         exception_value, exception_traceback))
         else:
             self.logout()
+        self.close()
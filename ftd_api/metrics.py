@@ -0,0 +1,252 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import contextlib
+import json
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+from ftd_api.file_helper import print_string_to_file
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Path segments that are object or job identifiers rather than part of the endpoint
+_ID_SEGMENT_REGEX = re.compile(r'^([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|\d+|[0-9a-fA-F]{16,})$')
+_API_PREFIX_REGEX = re.compile(r'^/api/fdm/[^/]+')
+
+
+def normalize_endpoint(url):
+    """
+    Reduce a request URL to the endpoint it hits so requests can be grouped.  The scheme,
+    host, query string and /api/fdm/<version> prefix are removed and identifiers are
+    replaced with {id}, e.g.
+    https://ftd:443/api/fdm/latest/jobs/configimportstatus/5fe0...-...?x=1 -> /jobs/configimportstatus/{id}
+    """
+    path = urlsplit(url).path
+    path = _API_PREFIX_REGEX.sub('', path)
+    segments = ['{id}' if _ID_SEGMENT_REGEX.match(x) else x for x in path.split('/')]
+    return '/'.join(segments) or '/'
+
+
+class _Histogram:
+    """
+    Cumulative histogram with fixed buckets as used by Prometheus
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[index] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'buckets': {str(upper_bound): count for upper_bound, count in zip(self.buckets, self.bucket_counts)}
+        }
+
+
+class JobPhaseTimer:
+    """
+    Helper to split the duration of a polled job into the time spent QUEUED and IN_PROGRESS.
+    Each poll result is passed to observe() and the interval since the previous poll is
+    attributed to the status seen at the previous poll.
+    """
+
+    def __init__(self):
+        self.phase_seconds = {'QUEUED': 0.0, 'IN_PROGRESS': 0.0}
+        self._last_status = 'QUEUED'
+        self._last_time = time.time()
+
+    def observe(self, status):
+        now = time.time()
+        if self._last_status in self.phase_seconds:
+            self.phase_seconds[self._last_status] += now - self._last_time
+        self._last_status = status
+        self._last_time = now
+
+
+class MetricsRegistry:
+    """
+    This class collects request counts, status codes, bytes sent/received and latency
+    histograms per method and normalized endpoint, job durations split into queued and
+    in progress time and the duration of local processing phases.  It can be written out in
+    the Prometheus text format or as JSON.  All methods are thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (method, endpoint) -> stats dict
+        self._requests = {}
+        # (job type, phase) -> _Histogram
+        self._jobs = {}
+        # job type -> status -> count
+        self._job_status = {}
+        # phase name -> _Histogram
+        self._phases = {}
+
+    def record_request(self, method, url, status_code, bytes_sent, bytes_received, latency):
+        """
+        Record a single REST request
+
+        Parameters:
+
+        method -- HTTP method
+        url -- The full request URL (normalized with normalize_endpoint)
+        status_code -- The response status code or None if the request raised
+        bytes_sent -- Size of the request body
+        bytes_received -- Size of the response body
+        latency -- Seconds until the response was received
+        """
+        key = (method, normalize_endpoint(url))
+        status = str(status_code) if status_code is not None else 'error'
+        with self._lock:
+            stats = self._requests.get(key)
+            if stats is None:
+                stats = {'status': {}, 'bytes_sent': 0, 'bytes_received': 0, 'latency': _Histogram()}
+                self._requests[key] = stats
+            stats['status'][status] = stats['status'].get(status, 0) + 1
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+            stats['latency'].observe(latency)
+
+    def record_job(self, job_type, queued_seconds, in_progress_seconds, status):
+        """
+        Record the duration of an import/export job
+
+        Parameters:
+
+        job_type -- e.g. configexport or configimport
+        queued_seconds -- Time the job was QUEUED
+        in_progress_seconds -- Time the job was IN_PROGRESS
+        status -- The terminal job status
+        """
+        with self._lock:
+            for phase, seconds in (('queued', queued_seconds), ('in_progress', in_progress_seconds)):
+                self._jobs.setdefault((job_type, phase), _Histogram()).observe(seconds)
+            job_status = self._job_status.setdefault(job_type, {})
+            job_status[status] = job_status.get(status, 0) + 1
+
+    def record_phase(self, phase, seconds):
+        """
+        Record the duration of a local processing phase (file parsing, format conversion...)
+        """
+        with self._lock:
+            self._phases.setdefault(phase, _Histogram()).observe(seconds)
+
+    @contextlib.contextmanager
+    def time_phase(self, phase):
+        """
+        Context manager recording the time spent in the body as a local processing phase
+        """
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.time() - start_time)
+
+    def to_dict(self):
+        """
+        Return all metrics as a JSON serializable dict
+        """
+        with self._lock:
+            return {
+                'requests': [
+                    {
+                        'method': method,
+                        'endpoint': endpoint,
+                        'status': dict(stats['status']),
+                        'bytes_sent': stats['bytes_sent'],
+                        'bytes_received': stats['bytes_received'],
+                        'latency_seconds': stats['latency'].to_dict()
+                    } for (method, endpoint), stats in sorted(self._requests.items())
+                ],
+                'jobs': [
+                    {
+                        'job': job_type,
+                        'phase': phase,
+                        'duration_seconds': histogram.to_dict()
+                    } for (job_type, phase), histogram in sorted(self._jobs.items())
+                ],
+                'job_status': {job_type: dict(status) for job_type, status in self._job_status.items()},
+                'phases': {phase: histogram.to_dict() for phase, histogram in sorted(self._phases.items())}
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=3, sort_keys=True)
+
+    def to_prometheus(self):
+        """
+        Return all metrics in the Prometheus text exposition format
+        """
+        lines = []
+
+        def add_histogram(name, labels, histogram):
+            for upper_bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                lines.append(f'{name}_bucket{{{labels},le="{upper_bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines.append('# HELP ftd_api_requests_total REST requests sent to the device')
+            lines.append('# TYPE ftd_api_requests_total counter')
+            for (method, endpoint), stats in sorted(self._requests.items()):
+                for status, count in sorted(stats['status'].items()):
+                    lines.append(f'ftd_api_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+            lines.append('# HELP ftd_api_request_bytes_sent_total Request body bytes sent to the device')
+            lines.append('# TYPE ftd_api_request_bytes_sent_total counter')
+            for (method, endpoint), stats in sorted(self._requests.items()):
+                lines.append(f'ftd_api_request_bytes_sent_total{{method="{method}",endpoint="{endpoint}"}} {stats["bytes_sent"]}')
+            lines.append('# HELP ftd_api_request_bytes_received_total Response body bytes received from the device')
+            lines.append('# TYPE ftd_api_request_bytes_received_total counter')
+            for (method, endpoint), stats in sorted(self._requests.items()):
+                lines.append(f'ftd_api_request_bytes_received_total{{method="{method}",endpoint="{endpoint}"}} {stats["bytes_received"]}')
+            lines.append('# HELP ftd_api_request_duration_seconds REST request latency')
+            lines.append('# TYPE ftd_api_request_duration_seconds histogram')
+            for (method, endpoint), stats in sorted(self._requests.items()):
+                add_histogram('ftd_api_request_duration_seconds', f'method="{method}",endpoint="{endpoint}"', stats['latency'])
+            lines.append('# HELP ftd_api_job_duration_seconds Import/export job time per phase')
+            lines.append('# TYPE ftd_api_job_duration_seconds histogram')
+            for (job_type, phase), histogram in sorted(self._jobs.items()):
+                add_histogram('ftd_api_job_duration_seconds', f'job="{job_type}",phase="{phase}"', histogram)
+            lines.append('# HELP ftd_api_jobs_total Import/export jobs by terminal status')
+            lines.append('# TYPE ftd_api_jobs_total counter')
+            for job_type, job_status in sorted(self._job_status.items()):
+                for status, count in sorted(job_status.items()):
+                    lines.append(f'ftd_api_jobs_total{{job="{job_type}",status="{status}"}} {count}')
+            lines.append('# HELP ftd_api_phase_duration_seconds Local processing time per phase')
+            lines.append('# TYPE ftd_api_phase_duration_seconds histogram')
+            for phase, histogram in sorted(self._phases.items()):
+                add_histogram('ftd_api_phase_duration_seconds', f'phase="{phase}"', histogram)
+        return '\n'.join(lines) + '\n'
+
+    def write_files(self, file_prefix):
+        """
+        Write the metrics to <file_prefix>.prom (Prometheus text format) and <file_prefix>.json
+
+        Return is the tuple of file names written
+        """
+        prometheus_file = file_prefix + '.prom'
+        json_file = file_prefix + '.json'
+        print_string_to_file(prometheus_file, self.to_prometheus())
+        print_string_to_file(json_file, self.to_json())
+        return prometheus_file, json_file
@@ -0,0 +1,224 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import hashlib
+import json
+import logging
+import mmap
+import os
+import os.path
+import re
+from ftd_api.file_helper import read_string_from_file
+
+INDEX_FORMAT_VERSION = 1
+INDEX_FILE_SUFFIX = '.idx.json'
+
+# Strings (skipped whole so brackets inside them do not count) and the structural brackets
+_TOKEN_PATTERN = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]')
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _get_file_hash(buffer):
+    """
+    Helper to hash the content of a mapped file
+    """
+    file_hash = hashlib.sha1()
+    for offset in range(0, len(buffer), _HASH_BLOCK_SIZE):
+        file_hash.update(buffer[offset:offset + _HASH_BLOCK_SIZE])
+    return file_hash.hexdigest()
+
+
+def scan_array_records(buffer):
+    """
+    Generator yielding (offset, length) of every object in a top level JSON array
+
+    Parameters:
+
+    buffer -- bytes like object (e.g. mmap) with the JSON document
+    """
+    depth = 0
+    start = None
+    for match in _TOKEN_PATTERN.finditer(buffer):
+        token = match.group()
+        if token[0] == 0x22:
+            continue
+        if token in (b'[', b'{'):
+            if depth == 1 and token == b'{':
+                start = match.start()
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 1 and token == b'}':
+                yield start, match.end() - start
+            elif depth < 0:
+                raise Exception(f'Unbalanced bracket at byte {match.start()}')
+    if depth != 0:
+        raise Exception('Truncated JSON document')
+
+
+class OffsetIndex:
+    """
+    This class gives random access to the records of a large JSON export file (a top level
+    array such as full_config.txt).  A sidecar index file holding the byte offset and length
+    of every record by id and by (type, name) is built in one pass and reused by later runs.
+    Records are read from a memory mapped view of the file, only the requested record is parsed.
+
+    The index is rebuilt when the size or modification time of the file no longer match, with
+    verify_hash a file whose time changed but whose content hash still matches keeps its index.
+    """
+
+    def __init__(self, json_file, index_file=None, verify_hash=True):
+        """
+        Parameters:
+
+        json_file -- The JSON array file
+        index_file -- Sidecar index file, defaults to the json_file with .idx.json appended
+        verify_hash -- If True hash the file before rebuilding an index whose time does not match
+        """
+        self.json_file = json_file
+        self.index_file = index_file if index_file is not None else json_file + INDEX_FILE_SUFFIX
+        self.verify_hash = verify_hash
+        self._file_handle = open(json_file, 'rb')
+        if os.fstat(self._file_handle.fileno()).st_size == 0:
+            self._file_handle.close()
+            raise Exception(f'Empty file: {json_file}')
+        self._buffer = mmap.mmap(self._file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.rebuilt = False
+        index = self._load_index()
+        if index is None:
+            index = self._build_index()
+            self.rebuilt = True
+        self.record_list = index['records']
+        self._by_id = {}
+        self._by_type_name = {}
+        for position, (offset, length, object_id, object_type, name) in enumerate(self.record_list):
+            if object_id is not None:
+                self._by_id.setdefault(object_id, position)
+            if name is not None:
+                self._by_type_name.setdefault((object_type, name), position)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Unmap and close the file
+        """
+        self._buffer.close()
+        self._file_handle.close()
+
+    def __len__(self):
+        return len(self.record_list)
+
+    def __contains__(self, object_id):
+        return object_id in self._by_id
+
+    def _get_file_state(self):
+        """
+        Helper to return the size and modification time of the file
+        """
+        stat = os.fstat(self._file_handle.fileno())
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self):
+        """
+        Helper to load the sidecar index, None is returned if it is missing or out of date
+        """
+        if not os.path.isfile(self.index_file):
+            return None
+        try:
+            index = json.loads(read_string_from_file(self.index_file))
+        except ValueError:
+            logging.warning(f'Ignoring unreadable index file: {self.index_file}')
+            return None
+        size, mtime_ns = self._get_file_state()
+        if index.get('format_version') != INDEX_FORMAT_VERSION or index.get('size') != size:
+            return None
+        if index.get('mtime_ns') != mtime_ns:
+            if not self.verify_hash or index.get('hash') != _get_file_hash(self._buffer):
+                return None
+            # Same content (e.g. the file was copied or touched), remember the new time
+            index['mtime_ns'] = mtime_ns
+            self._write_index(index)
+        return index
+
+    def _write_index(self, index):
+        """
+        Helper to persist the index, written to a temporary file first so readers never see
+        a partial index
+        """
+        temp_file = self.index_file + '.tmp'
+        with open(temp_file, 'w') as file_handle:
+            file_handle.write(json.dumps(index))
+        os.replace(temp_file, self.index_file)
+
+    def _build_index(self):
+        """
+        Helper to scan the file once recording the offset, length, id, type and name of every record
+        """
+        logging.info(f'Building offset index of: {self.json_file}')
+        size, mtime_ns = self._get_file_state()
+        record_list = []
+        for offset, length in scan_array_records(self._buffer):
+            record = json.loads(self._buffer[offset:offset + length])
+            body = record.get('data') if isinstance(record.get('data'), dict) else record
+            record_list.append([offset, length, body.get('id'), body.get('type'), body.get('name')])
+        index = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'hash': _get_file_hash(self._buffer),
+            'records': record_list
+        }
+        self._write_index(index)
+        return index
+
+    def _read_record(self, position):
+        """
+        Helper to parse the record at a position of the index
+        """
+        offset, length = self.record_list[position][:2]
+        return json.loads(self._buffer[offset:offset + length])
+
+    def get_by_id(self, object_id):
+        """
+        Return the parsed record with the id or None
+        """
+        position = self._by_id.get(object_id)
+        return self._read_record(position) if position is not None else None
+
+    def get_by_type_name(self, object_type, name):
+        """
+        Return the parsed record of the type with the name or None
+        """
+        position = self._by_type_name.get((object_type, name))
+        return self._read_record(position) if position is not None else None
+
+    def get_records_by_type(self, object_type):
+        """
+        Generator yielding the parsed records of the type in file order
+        """
+        for position, entry in enumerate(self.record_list):
+            if entry[3] == object_type:
+                yield self._read_record(position)
+
+    def get_raw(self, object_id):
+        """
+        Return the unparsed bytes of the record with the id or None
+        """
+        position = self._by_id.get(object_id)
+        if position is None:
+            return None
+        offset, length = self.record_list[position][:2]
+        return self._buffer[offset:offset + length]
@@ -0,0 +1,148 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import logging
+import threading
+from ftd_api.metrics import normalize_endpoint
+
+
+class AdaptivePageSizer:
+    """
+    This class picks the page size (limit) of paged GETs per endpoint.  It starts with a large
+    limit and hill climbs: while a full page delivers more items per second than the best page
+    so far the limit keeps moving the same way (up first, then down), once neither direction
+    improves the limit settles at the best size found.  The chosen size is kept per endpoint
+    for the life of the sizer so later collections of the same endpoint start from it.
+    """
+
+    def __init__(self, initial_limit=1000, min_limit=25, max_limit=10000, step_factor=2.0,
+                 min_improvement=0.1, max_page_bytes=8 * 1024 * 1024):
+        """
+        Parameters:
+
+        initial_limit -- Page size the first request of an endpoint is sent with
+        min_limit -- The limit is never set below this
+        max_limit -- The limit is never set above this
+        step_factor -- The limit is multiplied/divided by this for each step
+        min_improvement -- Fraction a page must beat the best items/second by to count as better
+        max_page_bytes -- The limit is not grown once a page is larger than this
+        """
+        self.initial_limit = max(min_limit, min(initial_limit, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.step_factor = step_factor
+        self.min_improvement = min_improvement
+        self.max_page_bytes = max_page_bytes
+        self._lock = threading.Lock()
+        # endpoint -> tuning state
+        self._endpoints = {}
+
+    def _get_state(self, endpoint):
+        """
+        Helper to fetch (creating if needed) the tuning state of an endpoint
+        """
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = {'limit': self.initial_limit, 'best_limit': None, 'best_rate': None,
+                     'direction': 1, 'reversed': False}
+            self._endpoints[endpoint] = state
+        return state
+
+    def _step(self, limit, direction):
+        """
+        Helper to move the limit one step in the direction keeping it within the bounds
+        """
+        if direction > 0:
+            return min(self.max_limit, int(limit * self.step_factor))
+        return max(self.min_limit, int(limit / self.step_factor))
+
+    def get_limit(self, url):
+        """
+        Return the page size to request for the URL
+        """
+        with self._lock:
+            return self._get_state(normalize_endpoint(url))['limit']
+
+    def record_page(self, url, limit, item_count, latency, page_bytes, last_page=False):
+        """
+        Record the result of a page request and move the limit for the endpoint
+
+        Parameters:
+
+        url -- The request URL
+        limit -- The limit the page was requested with
+        item_count -- Number of items returned
+        latency -- Seconds the request took
+        page_bytes -- Size of the response body
+        last_page -- True if this was the last page of the collection
+        """
+        if latency <= 0 or (last_page and item_count < limit):
+            # A short last page says nothing about the throughput of the limit
+            return
+        endpoint = normalize_endpoint(url)
+        rate = item_count / latency
+        with self._lock:
+            state = self._get_state(endpoint)
+            if 0 < item_count < limit and state['limit'] == limit:
+                # The device caps the page size below what was asked for, no point asking for more
+                logging.debug(f'Page size for {endpoint} capped by the device at {item_count}')
+                state['limit'] = item_count
+                state['best_limit'] = item_count
+                state['best_rate'] = rate
+                state['direction'] = 0
+                return
+            if item_count < limit:
+                return
+            # Settled, or another caller already moved the limit on from this one
+            if state['direction'] == 0 or state['limit'] != limit:
+                return
+            if state['best_rate'] is None or rate > state['best_rate'] * (1 + self.min_improvement):
+                state['best_rate'] = rate
+                state['best_limit'] = limit
+                next_limit = limit
+                if not (state['direction'] > 0 and page_bytes >= self.max_page_bytes):
+                    next_limit = self._step(limit, state['direction'])
+                if next_limit == limit:
+                    self._reverse_or_settle(endpoint, state)
+                else:
+                    state['limit'] = next_limit
+            else:
+                self._reverse_or_settle(endpoint, state)
+
+    def _reverse_or_settle(self, endpoint, state):
+        """
+        Helper to try the other direction from the best limit once, then settle on the best limit
+        """
+        if not state['reversed']:
+            state['reversed'] = True
+            state['direction'] = -state['direction']
+            next_limit = self._step(state['best_limit'], state['direction'])
+            if next_limit != state['best_limit']:
+                state['limit'] = next_limit
+                return
+        state['direction'] = 0
+        state['limit'] = state['best_limit']
+        logging.debug(f"Page size for {endpoint} settled at {state['limit']} ({state['best_rate']:.1f} items/s)")
+
+    def get_state(self):
+        """
+        Return a dict of endpoint to the current limit, the best limit with its items/second
+        and whether the limit has settled
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    'limit': state['limit'],
+                    'best_limit': state['best_limit'],
+                    'best_items_per_second': state['best_rate'],
+                    'settled': state['direction'] == 0
+                } for endpoint, state in self._endpoints.items()
+            }
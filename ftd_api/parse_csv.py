@@ -240,6 +240,34 @@ def bool_helper(bool_string):
         return False
 
 
+# Type hints supported in the CSV header e.g. port(int)
+TYPE_CONVERTERS = {
+    'int': int,
+    'str': str,
+    'bool': bool_helper,
+    'float': float
+}
+
+
+def parse_field_name(field):
+    """
+    This method splits the type hint off a CSV header field e.g. port(int) -> ('port', int)
+
+    Parameters:
+    field -- The header field
+
+    Return is the field name and the converter (None if there is no type hint)
+    """
+    if not field.endswith(')'):
+        return field, None
+    variable, separator, typeconvert = field[:-1].rpartition('(')
+    if not separator:
+        return field, None
+    if typeconvert not in TYPE_CONVERTERS:
+        raise NotImplementedError('Type: '+typeconvert+' is not supported.')
+    return variable, TYPE_CONVERTERS[typeconvert]
+
+
 def parse_csv_to_dict(csv_file):
     """This method will take a CSV file containing:
     - First row has field names
@@ -271,19 +299,9 @@ def parse_csv_to_dict(csv_file):
                 count = 0
                 for field in field_names:
                     # Looking for embedded data type in the field names for proper type conversion
-                    match = re.search(r'(.*)\((.*)\)', field)
-                    if match:
-                        variable = match.group(1)
-                        typeconvert = match.group(2)
-                        if typeconvert == 'int':
-                            type_conversion_dict[variable] = int
-                        elif typeconvert == 'str':
-                            type_conversion_dict[variable] = str
-                        elif typeconvert == 'bool':
-                            type_conversion_dict[variable] = bool_helper
-                        else:
-                            raise NotImplementedError(
-                                'Type: '+typeconvert+' is not supported.')
+                    variable, converter = parse_field_name(field)
+                    if converter is not None:
+                        type_conversion_dict[variable] = converter
                         field_names[count] = variable  # sanitize out the type
                     count += 1
                 first_row = False
@@ -293,14 +311,15 @@ def parse_csv_to_dict(csv_file):
                 for field_name in field_names:
                     try:
                         val = row[index].strip()
-                        if field_name in type_conversion_dict:
-                            val = type_conversion_dict[field_name](val)
                     except IndexError:
                         # sub case where the row is a short row missing some of the values
                         # could be a short row stop processing this row
                         break
-                    if val is not None and val == NONE_CSV_VALUE:
+                    if val == NONE_CSV_VALUE:
+                        # Checked before the type conversion, a missing value is None in a column of any type
                         val = None
+                    elif field_name in type_conversion_dict:
+                        val = type_conversion_dict[field_name](val)
                     if val is not None:
                         # Only set non-null values
                         set_variable_in_dict(object_dict, field_name, val)
@@ -12,6 +12,8 @@ updated
 
 import csv
 import json
+import re
+import tempfile
 import ftd_api.parse_csv as parse_csv
 from ftd_api.file_helper import read_string_from_file
 from ftd_api.file_helper import print_string_to_file
@@ -19,6 +21,11 @@ import os
 
 NONE_CSV_VALUE = '-=NONE/NULL=-'
 
+# Python types written with a type hint in the CSV header, any other value is a string
+VALUE_TYPE_NAMES = {int: 'int', bool: 'bool', float: 'float'}
+
+_LIST_INDEX_PATTERN = re.compile(r'\[\d+\]')
+
 def pretty_print_json_file(json_file):
     """
     This method will take a JSON file and will convert it to pretty logging.info format
@@ -75,7 +82,7 @@ def get_keys_from_dict(my_dict, path_set, current_path=None, path_to_value_dict=
             recursion_path = current_path + key
             _get_keys_from_list(my_dict[key], path_set, current_path=recursion_path, path_to_value_dict=path_to_value_dict)
             # recurse list
-        elif type(my_dict[key]) == dict:
+        elif isinstance(my_dict[key], dict):
             recursion_path = current_path + key + '.'
             get_keys_from_dict(my_dict[key], path_set, current_path=recursion_path, path_to_value_dict=path_to_value_dict)
         else:
@@ -104,7 +111,7 @@ def _get_keys_from_list(my_list, path_set, current_path=None, path_to_value_dict
             recursion_path = current_path + '['+str(count)+']'
             #recurse this will append array index as above
             _get_keys_from_list(item, path_set, current_path=recursion_path, path_to_value_dict=path_to_value_dict)
-        elif type(item) == dict:
+        elif isinstance(item, dict):
             #append separator and recurse
             recursion_path = current_path + '['+str(count)+'].'
             get_keys_from_dict(item, path_set, current_path=recursion_path, path_to_value_dict=path_to_value_dict)
@@ -130,21 +137,55 @@ def _create_fieldname_to_type_map(flat_dict_list):
     """
     fieldname_to_type = {}
     for flat_dict in flat_dict_list:
-        for key, value in flat_dict.items():
+        _update_fieldname_to_type_map(fieldname_to_type, flat_dict)
+
+    return fieldname_to_type
+
+
+def _update_fieldname_to_type_map(fieldname_to_type, flat_dict):
+    """
+    This is a helper for _create_fieldname_to_type_map that will fold the types found in
+    a single flattened dictionary into the map so the map can be built one row at a time
+
+    Parameters:
+
+    fieldname_to_type(in/out) -- Map of full field name to type string
+    flat_dict(in) -- A dictionary that is already flattened into full path:value
+    """
+    for key, value in flat_dict.items():
+        # None is written as NONE_CSV_VALUE which reads back as None in a column of any type
+        if value is None:
+            continue
         # we will only keep a type if all instances are identical
         # otherwise leave it to the default string
-            if key in fieldname_to_type:
-                existing_field_type = fieldname_to_type[key]
-                if existing_field_type != 'BAD' and existing_field_type != type(value): # MARK the mapping BAD
-                    # previously found type doesn't match newly found type mark bad so
-                    # we don't cast it into a value that won't work (leave as a string)
-                    fieldname_to_type[key] == 'BAD' # otherwise it matches
-            elif type(value) == int: #doing it like this in case we add more types later
+        value_type = VALUE_TYPE_NAMES.get(type(value), 'BAD')
+        existing_field_type = fieldname_to_type.get(key)
+        if existing_field_type is None:
             # add a new mapping
-                fieldname_to_type[key] = 'int'
-            elif type(value) == bool:
-                fieldname_to_type[key] = 'bool'
+            fieldname_to_type[key] = value_type
+        elif existing_field_type != value_type:
+            # previously found type doesn't match newly found type mark bad so
+            # we don't cast it into a value that won't work (leave as a string)
+            fieldname_to_type[key] = 'BAD'
+
 
+def _map_keys_to_column_types(key_list, column_type_table):
+    """
+    This method looks up the type of each flattened key in a column type table (see
+    csv_schema.build_column_type_table) instead of inspecting the values
+
+    Parameters:
+
+    key_list(in) -- The list of full field names
+    column_type_table(in) -- Map of field path (list positions written as []) to type string
+
+    Return is the map of full field name to type string for the fields that are not strings
+    """
+    fieldname_to_type = {}
+    for key in key_list:
+        column_type = column_type_table.get(_LIST_INDEX_PATTERN.sub('[]', key) if '[' in key else key)
+        if column_type is not None and column_type != 'str':
+            fieldname_to_type[key] = column_type
     return fieldname_to_type
 
 
@@ -183,6 +224,52 @@ def decorate_dict_list_for_bulk(dict_list):
         dict_list[count] = dict_copy
         count += 1
 
+def compile_field_list(field_list):
+    """
+    This method turns a list of field names into the tree used by project_dict.  Nested
+    fields are given as dotted paths e.g. ['id', 'name', 'networks.name'] results in
+    {'id': None, 'name': None, 'networks': {'name': None}} (None meaning the whole value).
+
+    Parameters:
+
+    field_list -- List of field names or dotted paths
+    """
+    field_tree = {}
+    for field in field_list:
+        node = field_tree
+        parts = field.split('.')
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # A parent path already selects the whole value
+                break
+            node[part] = child
+            node = child
+        else:
+            node[parts[-1]] = None
+    return field_tree
+
+def project_dict(obj, field_tree):
+    """
+    This method returns a copy of obj only containing the fields in field_tree (see
+    compile_field_list).  Lists are projected element by element, fields missing from the
+    object are left out.
+
+    Parameters:
+
+    obj -- The dict (or list of dicts) to project
+    field_tree -- The compiled field list
+    """
+    if isinstance(obj, list):
+        return [project_dict(x, field_tree) for x in obj]
+    if not isinstance(obj, dict):
+        return obj
+    projected = {}
+    for key, subtree in field_tree.items():
+        if key in obj:
+            projected[key] = obj[key] if subtree is None else project_dict(obj[key], subtree)
+    return projected
+
 def fixup_none_value(value):
     if value is None:
         return NONE_CSV_VALUE
@@ -215,7 +302,7 @@ def flatten_dict_list(dict_list, path_set=None):
         flat_dict_list.append(key_value_flat_dict)
     return flat_dict_list
 
-def dict_list_to_csv(dict_list, csv_file_out):
+def dict_list_to_csv(dict_list, csv_file_out, fieldname_to_type=None):
     """
     This method will take a list of python dictionaries and will convert them to a encoded CSV file.
     This will typically make the most sense when a single file has a list of one type of object so the
@@ -225,6 +312,8 @@ def dict_list_to_csv(dict_list, csv_file_out):
 
     dict_list(in) - This is the list of dictionary objects to process
     csv_file_out - This is the name of the file to write the results to
+    fieldname_to_type(in) - Optional column type table (see csv_schema.build_column_type_table) used for
+                            the type hints instead of inspecting every value
     """
     if type(dict_list) == list: #path_set is the set of all full paths to values
         path_set = set()
@@ -242,27 +331,145 @@ def dict_list_to_csv(dict_list, csv_file_out):
             count += 1
 
         # Try to determine data type for each field so we can encode that in the field name in the CSV
-        # we will loop through the flat dict to determine this
-        fieldname_to_type = _create_fieldname_to_type_map(flat_dict_list)
+        # we will loop through the flat dict to determine this unless the types are known from the schema
+        if fieldname_to_type is None:
+            fieldname_to_type = _create_fieldname_to_type_map(flat_dict_list)
+        else:
+            fieldname_to_type = _map_keys_to_column_types(key_list, fieldname_to_type)
         _fixup_key_list_with_types(key_list, fieldname_to_type)
         with open(csv_file_out, 'w') as csvfile:
             csvwriter = csv.writer(csvfile)
             csvwriter.writerow(key_list)
             for object_flat_dict in flat_dict_list:
-                row = []
-                # we need to loop through the key value pairs in the dict
-                for key_value_pairs in object_flat_dict.items():
-                    parse_csv.set_value_at_list_index(row, [key_index_dict[key_value_pairs[0]]], fixup_none_value(key_value_pairs[1]))
-                count = 0
-                # Make sure rows items that aren't included in the dict get marked as None
-                for item in row:
-                    if item is None:
-                        row[count] = fixup_none_value(item)
-                    count += 1
-                csvwriter.writerow(row)
+                csvwriter.writerow(_flat_dict_to_csv_row(object_flat_dict, key_index_dict))
     else:
             raise ValueError('Error: expected a list')
 
+def _flat_dict_to_csv_row(object_flat_dict, key_index_dict):
+    """
+    Helper that converts a flattened dictionary into a CSV row ordered by the key_index_dict
+
+    Parameters:
+
+    object_flat_dict -- Dictionary flattened into full path:value
+    key_index_dict -- Map of full path to the column index in the CSV
+    """
+    row = []
+    # we need to loop through the key value pairs in the dict
+    for key_value_pairs in object_flat_dict.items():
+        parse_csv.set_value_at_list_index(row, [key_index_dict[key_value_pairs[0]]], fixup_none_value(key_value_pairs[1]))
+    count = 0
+    # Make sure rows items that aren't included in the dict get marked as None
+    for item in row:
+        if item is None:
+            row[count] = fixup_none_value(item)
+        count += 1
+    return row
+
+class CsvStreamWriter:
+    """
+    This class writes a list of dictionaries to a CSV file one dictionary at a time.  The
+    columns of a CSV file are only known once every dictionary has been seen so the flattened
+    rows are spooled to a temporary file and the CSV file is produced when the writer is closed.
+    Only the set of columns and their types are kept in memory.
+
+    Usage:
+
+    with CsvStreamWriter('/tmp/export.csv') as writer:
+        for obj in object_iterable:
+            writer.write(obj)
+    """
+
+    def __init__(self, csv_file_out, fieldname_to_type=None):
+        """
+        Parameters:
+
+        csv_file_out -- This is the name of the file to write the results to
+        fieldname_to_type -- Optional column type table (see dict_list_to_csv)
+        """
+        self.csv_file_out = csv_file_out
+        self.path_set = set()
+        self.column_type_table = fieldname_to_type
+        self.fieldname_to_type = {}
+        self.count = 0
+        self._spool = tempfile.TemporaryFile(mode='w+')
+
+    def write(self, object_dict):
+        """
+        Flatten and spool a single dictionary
+        """
+        key_value_flat_dict = {}
+        get_keys_from_dict(object_dict, self.path_set, path_to_value_dict=key_value_flat_dict)
+        if self.column_type_table is None:
+            _update_fieldname_to_type_map(self.fieldname_to_type, key_value_flat_dict)
+        self._spool.write(json.dumps(key_value_flat_dict))
+        self._spool.write('\n')
+        self.count += 1
+
+    def close(self):
+        """
+        Write the CSV file from the spooled rows
+        """
+        key_list = list(self.path_set)
+        key_list.sort()
+        key_index_dict = {key: index for index, key in enumerate(key_list)}
+        if self.column_type_table is not None:
+            self.fieldname_to_type = _map_keys_to_column_types(key_list, self.column_type_table)
+        _fixup_key_list_with_types(key_list, self.fieldname_to_type)
+        self._spool.seek(0)
+        with open(self.csv_file_out, 'w') as csvfile:
+            csvwriter = csv.writer(csvfile)
+            csvwriter.writerow(key_list)
+            for line in self._spool:
+                csvwriter.writerow(_flat_dict_to_csv_row(json.loads(line), key_index_dict))
+        self._spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        if exception_type:
+            self._spool.close()
+        else:
+            self.close()
+
+class JsonArrayStreamWriter:
+    """
+    This class writes a JSON array to a file one element at a time.  The output is identical
+    to json.dumps(object_list, indent=3, sort_keys=True) without holding the list in memory.
+    """
+
+    def __init__(self, json_file_out):
+        """
+        Parameters:
+
+        json_file_out -- This is the name of the file to write the results to
+        """
+        self.count = 0
+        self._file_handle = open(json_file_out, 'w')
+
+    def write(self, object_dict):
+        """
+        Append a single element to the array
+        """
+        element = json.dumps(object_dict, indent=3, sort_keys=True)
+        self._file_handle.write('[\n' if self.count == 0 else ',\n')
+        self._file_handle.write('\n'.join('   ' + line for line in element.split('\n')))
+        self.count += 1
+
+    def close(self):
+        """
+        Terminate the array and close the file
+        """
+        self._file_handle.write('\n]' if self.count > 0 else '[]')
+        self._file_handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
+
 def parse_json_to_csv(json_file_in, csv_file_out):
     """
     This method will take in a JSON file parse it and will generate a CSV file with the
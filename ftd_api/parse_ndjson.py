@@ -0,0 +1,82 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+from ftd_api.compact import compact_json_default
+
+
+class NdjsonStreamWriter:
+    """
+    This class writes objects to a JSON Lines (NDJSON) file one line per object.
+    """
+
+    def __init__(self, ndjson_file, append=False):
+        """
+        Parameters:
+        ndjson_file -- File to write the data to
+        append -- If True the objects are appended to an existing file
+        """
+        self.count = 0
+        self._file_handle = open(ndjson_file, 'a' if append else 'w')
+
+    def write(self, obj):
+        """
+        Append a single object to the file
+        """
+        self._file_handle.write(json.dumps(obj, sort_keys=True, default=compact_json_default))
+        self._file_handle.write('\n')
+        self.count += 1
+
+    def close(self):
+        self._file_handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
+
+
+def write_dict_list_to_ndjson_file(ndjson_file, obj_iterable, append=False):
+    """
+    This method writes out a list of objects in JSON Lines (NDJSON) format with one
+    JSON document per line.  Objects are written one at a time so a generator can be passed.
+
+    Parameters:
+    ndjson_file -- File to write the data to
+    obj_iterable -- List or generator of the objects to write
+    append -- If True the objects are appended to an existing file
+
+    Return is the number of objects written
+    """
+    with NdjsonStreamWriter(ndjson_file, append=append) as writer:
+        for obj in obj_iterable:
+            writer.write(obj)
+    return writer.count
+
+
+def read_ndjson_file(ndjson_file):
+    """
+    This is a generator that yields one parsed object per line of a JSON Lines (NDJSON) file.
+    Blank lines are skipped.
+
+    Parameters:
+    ndjson_file -- This is the file to load
+    """
+    with open(ndjson_file, 'r', encoding='utf-8-sig') as file_handle:
+        for line_number, line in enumerate(file_handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as err:
+                raise ValueError(f'Unable to parse line {line_number} of {ndjson_file}: {err}')
@@ -11,6 +11,25 @@ updated
 '''
 import yaml
 
+# Use the LibYAML backed loader/dumper when PyYAML was built with it, the pure Python
+# versions produce the same documents just a lot slower
+try:
+    from yaml import CDumper as BaseDumper
+    from yaml import CFullLoader as FullLoader
+except ImportError:
+    from yaml import Dumper as BaseDumper
+    from yaml import FullLoader
+
+
+class NoAliasDumper(BaseDumper):
+    """
+    Dumper that does not track aliases, export data has no shared references so
+    this avoids keeping an id for every node written in the document
+    """
+    def ignore_aliases(self, data):
+        return True
+
+
 def write_dict_to_yaml_file(yaml_file, obj_dict):
     """
     This method writes out a python structure in YAML format to a file
@@ -19,7 +38,7 @@ def write_dict_to_yaml_file(yaml_file, obj_dict):
     obj_dict -- the structure to write
     """
     with open(yaml_file, 'w') as file_handle:
-        yaml.dump(obj_dict, file_handle)
+        yaml.dump(obj_dict, file_handle, Dumper=NoAliasDumper)
 
 def read_yaml_to_dict(yaml_file):
     """
@@ -28,4 +47,68 @@ def read_yaml_to_dict(yaml_file):
     yaml_file -- This is the file to load
     """
     with open(yaml_file, 'r') as file_handle:
-        return yaml.load(file_handle, Loader=yaml.FullLoader)
+        return yaml.load(file_handle, Loader=FullLoader)
+
+def write_dict_list_to_yaml_stream(yaml_file, obj_iterable):
+    """
+    This method writes out each object as its own YAML document (separated by ---) so
+    the objects can be written one at a time and the file read back incrementally
+    Parameters:
+    yaml_file -- File to write the data to
+    obj_iterable -- List or generator of the objects to write
+    """
+    with open(yaml_file, 'w') as file_handle:
+        yaml.dump_all(obj_iterable, file_handle, Dumper=NoAliasDumper, explicit_start=True)
+
+def read_yaml_stream(yaml_file):
+    """
+    This is a generator that yields one object per YAML document in a multi-document file
+    as written by write_dict_list_to_yaml_stream
+    Parameters:
+    yaml_file -- This is the file to load
+    """
+    with open(yaml_file, 'r') as file_handle:
+        for obj in yaml.load_all(file_handle, Loader=FullLoader):
+            yield obj
+
+class YamlStreamWriter:
+    """
+    This class writes objects to a YAML file one at a time.  By default the output is a
+    single YAML list identical to write_dict_to_yaml_file, with multi_document=True each
+    object is written as its own document like write_dict_list_to_yaml_stream.
+    """
+
+    def __init__(self, yaml_file, multi_document=False):
+        """
+        Parameters:
+        yaml_file -- File to write the data to
+        multi_document -- If True write one document per object instead of a list
+        """
+        self.multi_document = multi_document
+        self.count = 0
+        self._file_handle = open(yaml_file, 'w')
+
+    def write(self, obj):
+        """
+        Append a single object to the file
+        """
+        if self.multi_document:
+            yaml.dump(obj, self._file_handle, Dumper=NoAliasDumper, explicit_start=True)
+        else:
+            # A block style list is just the concatenation of single element lists
+            yaml.dump([obj], self._file_handle, Dumper=NoAliasDumper)
+        self.count += 1
+
+    def close(self):
+        """
+        Close the file writing an empty list if nothing was written
+        """
+        if self.count == 0 and not self.multi_document:
+            yaml.dump([], self._file_handle, Dumper=NoAliasDumper)
+        self._file_handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        self.close()
@@ -0,0 +1,286 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+from ftd_api.config_index import ConfigIndex
+
+# Keys a reference to another object may carry, a nested dict with any other key is an
+# embedded value (e.g. a port range) rather than a reference
+REFERENCE_KEYS = frozenset(('id', 'type', 'name', 'version'))
+
+
+def is_reference(value):
+    """
+    Return True if the value is a reference to another object ({id, type, name, version})
+    """
+    return isinstance(value, dict) and 'type' in value and ('id' in value or 'name' in value) and \
+        REFERENCE_KEYS.issuperset(value)
+
+
+def extract_references(body):
+    """
+    This method walks an object once collecting the references to other objects nested in it
+
+    Parameters:
+
+    body -- The object (data block of an export record)
+
+    Return is a list of (path, reference) tuples, the path is a dotted string with list
+    positions in brackets (e.g. sourceNetworks.objects[0])
+    """
+    reference_list = []
+    # Explicit stack instead of recursion, exported objects can be deeply nested
+    stack = [(key, value) for key, value in reversed(list(body.items())) if key != 'links']
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            if is_reference(value):
+                reference_list.append((path, value))
+            else:
+                stack.extend((f'{path}.{key}', x) for key, x in reversed(list(value.items())) if key != 'links')
+        elif isinstance(value, list):
+            stack.extend((f'{path}[{position}]', x) for position, x in reversed(list(enumerate(value))))
+    return reference_list
+
+
+def _get_node_key(body):
+    """
+    Helper to return the graph key of an object, the id or (type, name) if there is no id
+    """
+    if 'id' in body:
+        return body['id']
+    return (body.get('type'), body.get('name'))
+
+
+class ReferenceGraph:
+    """
+    This class builds the dependency graph of an export (or import) list in one pass: every
+    reference nested in an object is resolved against the other objects of the list by id
+    and if that fails by (type, name).  An edge points from the referencing object to the
+    object it depends on.  References that resolve to nothing in the list are dangling, the
+    object they point to either has to exist on the device already or the import will fail.
+    """
+
+    def __init__(self, object_list):
+        """
+        Parameters:
+
+        object_list -- List of export/import records, records without a data block
+                       (the metadata record) are not part of the graph
+        """
+        self.config_index = object_list if isinstance(object_list, ConfigIndex) else ConfigIndex(object_list)
+        self.object_list = self.config_index.object_list
+        # key -> record, in list order
+        self.nodes = {}
+        # key -> list of keys depended on / depending on it
+        self.dependencies = {}
+        self.dependents = {}
+        self._dangling_list = []
+        for record in self.object_list:
+            body = record.get('data')
+            if not isinstance(body, dict):
+                continue
+            key = _get_node_key(body)
+            if key in self.nodes:
+                # Duplicate records (e.g. a DELETE and a CREATE) share the node of the first
+                continue
+            self.nodes[key] = record
+            self.dependencies[key] = []
+            self.dependents.setdefault(key, [])
+        for key, record in self.nodes.items():
+            seen_targets = set()
+            for path, reference in extract_references(record['data']):
+                target = self._resolve(reference)
+                if target is None:
+                    self._dangling_list.append({'source': key, 'path': path, 'reference': reference})
+                elif target not in seen_targets:
+                    seen_targets.add(target)
+                    self.dependencies[key].append(target)
+                    self.dependents[target].append(key)
+
+    def _resolve(self, reference):
+        """
+        Helper to return the node key a reference points to or None
+        """
+        target = None
+        if 'id' in reference:
+            target = self.config_index.get_by_id(reference['id'])
+        if target is None and 'name' in reference:
+            target = self.config_index.get_by_type_name(reference['type'], reference['name'])
+        if target is None:
+            return None
+        return _get_node_key(target['data'])
+
+    def get_record(self, key):
+        """
+        Return the record of a node key (object id or (type, name))
+        """
+        return self.nodes.get(key)
+
+    def get_dangling_references(self):
+        """
+        Return the references that do not resolve to an object in the list as dicts with
+        source (key of the referencing object), path and reference
+        """
+        return list(self._dangling_list)
+
+    def get_unused_objects(self, type_list=None):
+        """
+        Return the records no other object references in list order
+
+        Parameters:
+
+        type_list -- Optional list of types to restrict the result to
+        """
+        return [record for key, record in self.nodes.items()
+                if not self.dependents[key] and (type_list is None or record['data'].get('type') in type_list)]
+
+    def get_closure(self, key_list):
+        """
+        Return the records of the keys together with everything they depend on (transitively)
+        in dependency order, a partial import of these records is self contained
+
+        Parameters:
+
+        key_list -- Node keys (object ids or (type, name) tuples), unknown keys are ignored
+        """
+        closure = set()
+        stack = [x for x in key_list if x in self.nodes]
+        while stack:
+            key = stack.pop()
+            if key in closure:
+                continue
+            closure.add(key)
+            stack.extend(self.dependencies[key])
+        return [self.nodes[x] for component in self.get_strongly_connected_components()
+                for x in component if x in closure]
+
+    def get_strongly_connected_components(self):
+        """
+        Return the strongly connected components (lists of node keys) in dependency order:
+        a component only comes after every component it depends on.  Objects referencing each
+        other (directly or through others) end up in the same component.
+
+        This is Tarjan's algorithm run without recursion, linear in nodes plus edges.
+        """
+        index_of = {}
+        low_link = {}
+        on_stack = set()
+        node_stack = []
+        component_list = []
+        next_index = 0
+        for root in self.nodes:
+            if root in index_of:
+                continue
+            index_of[root] = low_link[root] = next_index
+            next_index += 1
+            node_stack.append(root)
+            on_stack.add(root)
+            work_stack = [(root, iter(self.dependencies[root]))]
+            while work_stack:
+                key, dependency_iter = work_stack[-1]
+                descended = False
+                for target in dependency_iter:
+                    if target not in index_of:
+                        index_of[target] = low_link[target] = next_index
+                        next_index += 1
+                        node_stack.append(target)
+                        on_stack.add(target)
+                        work_stack.append((target, iter(self.dependencies[target])))
+                        descended = True
+                        break
+                    if target in on_stack:
+                        low_link[key] = min(low_link[key], index_of[target])
+                if descended:
+                    continue
+                work_stack.pop()
+                if work_stack:
+                    parent = work_stack[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[key])
+                if low_link[key] == index_of[key]:
+                    component = []
+                    while True:
+                        member = node_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == key:
+                            break
+                    component.reverse()
+                    component_list.append(component)
+        return component_list
+
+    def get_cycles(self):
+        """
+        Return the components (lists of node keys) of objects that depend on each other
+        """
+        return [x for x in self.get_strongly_connected_components()
+                if len(x) > 1 or x[0] in self.dependencies[x[0]]]
+
+    def topological_order(self):
+        """
+        Return the records in dependency order (objects in a cycle are kept together)
+        """
+        return [self.nodes[x] for component in self.get_strongly_connected_components() for x in component]
+
+    def get_import_plan(self, chunk_size):
+        """
+        Split the list into chunks that can be imported one after the other.  Objects are
+        ordered so everything an object depends on is in the same or an earlier chunk and
+        objects in a cycle are never split, a chunk grows past chunk_size to hold a cycle.
+        DELETE records come last in reverse dependency order so objects are deleted before
+        the objects they reference.  An object that is deleted and re-created keeps its records
+        in list order and is imported ahead of the objects depending on it.  Records outside of
+        the graph (metadata) lead the first chunk.
+
+        Parameters:
+
+        chunk_size -- Number of records per chunk
+
+        Return is a list of lists of records
+        """
+        if chunk_size < 1:
+            raise Exception('chunk_size must be at least 1')
+        component_list = self.get_strongly_connected_components()
+        lead_list = [x for x in self.object_list if not isinstance(x.get('data'), dict)]
+        # Every record of a key in list order, a DELETE followed by a CREATE of the same object
+        # (a re-create) shares the node of the first
+        records_by_key = {}
+        for record in self.object_list:
+            body = record.get('data')
+            if isinstance(body, dict):
+                records_by_key.setdefault(_get_node_key(body), []).append(record)
+        unit_list = []
+        delete_unit_list = []
+        for component in component_list:
+            unit = []
+            delete_unit = []
+            for key in component:
+                record_list = records_by_key[key]
+                if all(x.get('action') == 'DELETE' for x in record_list):
+                    delete_unit.extend(record_list)
+                else:
+                    # Re-created objects keep their DELETE in front of the CREATE and are
+                    # imported ahead of the objects depending on them
+                    unit.extend(record_list)
+            if unit:
+                unit_list.append(unit)
+            if delete_unit:
+                delete_unit_list.append(delete_unit)
+
+        chunk_list = []
+        chunk = list(lead_list)
+        for unit in unit_list + list(reversed(delete_unit_list)):
+            if chunk and len(chunk) + len(unit) > chunk_size:
+                chunk_list.append(chunk)
+                chunk = []
+            chunk.extend(unit)
+        if chunk:
+            chunk_list.append(chunk)
+        return chunk_list
@@ -0,0 +1,242 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+import logging
+import os
+import os.path
+import threading
+import time
+from ftd_api.config_index import ConfigIndex
+from ftd_api.file_helper import read_string_from_file
+from ftd_api.reference_graph import is_reference
+
+DEFAULT_CACHE_MAX_AGE = 3600
+# Only these fields are needed to resolve names
+RESOLVER_FIELDS = ['id', 'name', 'type']
+
+
+def find_unresolved_references(object_list):
+    """
+    This method walks the records collecting the references that have a name and type but no id
+
+    Parameters:
+
+    object_list -- List of import records
+
+    Return is a list of (container, key, reference) tuples, container[key] is the reference
+    """
+    unresolved_list = []
+    for record in object_list:
+        body = record.get('data')
+        if not isinstance(body, dict):
+            continue
+        # Explicit stack instead of recursion, objects can be deeply nested
+        stack = [body]
+        while stack:
+            container = stack.pop()
+            item_iter = container.items() if isinstance(container, dict) else enumerate(container)
+            for key, value in item_iter:
+                if isinstance(value, dict):
+                    if is_reference(value):
+                        if not value.get('id') and value.get('name'):
+                            unresolved_list.append((container, key, value))
+                    else:
+                        stack.append(value)
+                elif isinstance(value, list):
+                    stack.append(value)
+    return unresolved_list
+
+
+class ReferenceResolver:
+    """
+    This class fills in the ids of references that only carry a name and type, as written in
+    hand authored (e.g. CSV) import files.  References are first resolved against the objects
+    of the import itself, the rest with one paged GET of the collection of each referenced
+    type (only id, name and type are asked for) instead of a request per reference.
+
+    The name to id maps are kept for the life of the resolver and can also be kept in a
+    cache file (per device) that is reused while it is younger than cache_max_age.  A name
+    that is missing from a map read from the cache file causes that type to be fetched again.
+    """
+
+    def __init__(self, bulk_tool, cache_file=None, cache_max_age=DEFAULT_CACHE_MAX_AGE, push_down_fields=True):
+        """
+        Parameters:
+
+        bulk_tool -- BulkTool of the device (used for the OpenAPI type index and the client)
+        cache_file -- Optional JSON file the name to id maps are cached in
+        cache_max_age -- Seconds a map in the cache file is used for
+        push_down_fields -- If False the id/name/type projection is only done locally
+                            (for devices rejecting the fields parameter)
+        """
+        self.bulk_tool = bulk_tool
+        self.cache_file = cache_file
+        self.cache_max_age = cache_max_age
+        self.push_down_fields = push_down_fields
+        self._lock = threading.Lock()
+        # type -> {name: id}
+        self._name_maps = {}
+        # types whose map came from the cache file rather than the device
+        self._cached_types = set()
+        self._device_key = bulk_tool.client.get_address_and_port_string()
+        if cache_file is not None:
+            self._load_cache()
+
+    def _load_cache(self):
+        """
+        Helper to load the unexpired maps of this device from the cache file
+        """
+        if not os.path.isfile(self.cache_file):
+            return
+        try:
+            cache = json.loads(read_string_from_file(self.cache_file))
+        except ValueError:
+            logging.warning(f'Ignoring unreadable reference cache: {self.cache_file}')
+            return
+        now = time.time()
+        for object_type, entry in cache.get(self._device_key, {}).items():
+            if now - entry['time'] < self.cache_max_age:
+                self._name_maps[object_type] = entry['names']
+                self._cached_types.add(object_type)
+
+    def _write_cache(self):
+        """
+        Helper to merge the maps fetched from the device into the cache file
+        """
+        cache = {}
+        if os.path.isfile(self.cache_file):
+            try:
+                cache = json.loads(read_string_from_file(self.cache_file))
+            except ValueError:
+                cache = {}
+        device_cache = cache.setdefault(self._device_key, {})
+        now = time.time()
+        for object_type, name_map in self._name_maps.items():
+            if object_type not in self._cached_types:
+                device_cache[object_type] = {'time': now, 'names': name_map}
+        temp_file = self.cache_file + '.tmp'
+        with open(temp_file, 'w') as file_handle:
+            file_handle.write(json.dumps(cache))
+        os.replace(temp_file, self.cache_file)
+
+    def _get_collection_url(self, object_type):
+        """
+        Helper to return the collection URL of a type or None if it has no top level collection
+        """
+        url_template = self.bulk_tool.get_type_url_index().get(object_type)
+        if url_template is None:
+            return None
+        return url_template.rsplit('/', 1)[0]
+
+    def _fetch_name_map(self, object_type):
+        """
+        Helper to fetch the name to id map of a type with one paged crawl of its collection
+        """
+        collection_url = self._get_collection_url(object_type)
+        if collection_url is None:
+            logging.warning(f'No collection URL for type {object_type}, its references cannot be resolved')
+            return {}
+        with self.bulk_tool.tracer.span('resolve_type', type=object_type) as span:
+            item_list = self.bulk_tool.client.do_get_multi_page(collection_url,
+                                                                filter_system_defined=False,
+                                                                fields=RESOLVER_FIELDS,
+                                                                push_down_fields=self.push_down_fields)
+            span.set_attribute('object_count', len(item_list))
+        name_map = {}
+        for item in item_list:
+            if item.get('name') is not None and 'id' in item:
+                name_map.setdefault(item['name'], item['id'])
+        logging.debug(f'Fetched {len(name_map)} {object_type} names from {collection_url}')
+        return name_map
+
+    def get_name_map(self, object_type, refresh=False):
+        """
+        Return the name to id map of a type fetching it from the device if needed
+
+        Parameters:
+
+        object_type -- The object type (lower case as in the OpenAPI index)
+        refresh -- If True fetch the map again even if it is known
+        """
+        with self._lock:
+            if refresh or object_type not in self._name_maps:
+                self._name_maps[object_type] = self._fetch_name_map(object_type)
+                self._cached_types.discard(object_type)
+            return self._name_maps[object_type]
+
+    def resolve(self, object_list):
+        """
+        Fill in the missing ids of the references in the import records.  References are
+        replaced by a copy with the id rather than changed in place (references may be shared,
+        see CompactLoader), equal references stay shared.
+
+        Parameters:
+
+        object_list -- List of import records, changed in place
+
+        Return is a dict with the counts of resolved and unresolved references and the types fetched
+        """
+        unresolved_list = find_unresolved_references(object_list)
+        stats = {'resolved': 0, 'unresolved': 0, 'fetched_types': []}
+        if not unresolved_list:
+            return stats
+        with self.bulk_tool.tracer.span('resolve_references', reference_count=len(unresolved_list)) as span:
+            config_index = ConfigIndex(object_list)
+            replacement_by_reference = {}
+            pending_list = []
+            # Objects of the import itself win over the device
+            for container, key, reference in unresolved_list:
+                record = config_index.get_by_type_name(reference['type'], reference['name'])
+                if record is not None and record['data'].get('id'):
+                    self._replace(container, key, reference, record['data']['id'], replacement_by_reference)
+                    stats['resolved'] += 1
+                else:
+                    pending_list.append((container, key, reference))
+
+            type_list = sorted(set(x[2]['type'].lower() for x in pending_list))
+            refreshed_types = set()
+            for object_type in type_list:
+                if object_type not in self._name_maps:
+                    stats['fetched_types'].append(object_type)
+                self.get_name_map(object_type)
+            for container, key, reference in pending_list:
+                object_type = reference['type'].lower()
+                object_id = self._name_maps[object_type].get(reference['name'])
+                if object_id is None and object_type in self._cached_types and object_type not in refreshed_types:
+                    # The cached map may predate the object, fetch the type once more
+                    refreshed_types.add(object_type)
+                    stats['fetched_types'].append(object_type)
+                    object_id = self.get_name_map(object_type, refresh=True).get(reference['name'])
+                if object_id is None:
+                    stats['unresolved'] += 1
+                    logging.warning(f"Unable to resolve {reference['type']} reference: {reference['name']}")
+                    continue
+                self._replace(container, key, reference, object_id, replacement_by_reference)
+                stats['resolved'] += 1
+            span.set_attribute('resolved', stats['resolved'])
+            span.set_attribute('unresolved', stats['unresolved'])
+        if self.cache_file is not None and stats['fetched_types']:
+            self._write_cache()
+        logging.info(f"Resolved {stats['resolved']} references ({stats['unresolved']} unresolved, "
+                     f"{len(stats['fetched_types'])} types fetched)")
+        return stats
+
+    def _replace(self, container, key, reference, object_id, replacement_by_reference):
+        """
+        Helper to swap a reference for a copy carrying the id
+        """
+        replacement = replacement_by_reference.get(id(reference))
+        if replacement is None:
+            replacement = dict(reference)
+            replacement['id'] = object_id
+            replacement_by_reference[id(reference)] = replacement
+        container[key] = replacement
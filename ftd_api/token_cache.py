@@ -0,0 +1,119 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import contextlib
+import json
+import logging
+import os
+import os.path
+import stat
+import time
+
+# fcntl is not available on Windows, there the cache works without locking
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Default location of the token cache used by ftd_bulk_tool
+DEFAULT_TOKEN_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.ftd_api_token_cache.json')
+
+
+def get_token_key(address, port, username, version, token_kind):
+    """
+    Return the cache key of a token
+
+    Parameters:
+
+    address -- Device address
+    port -- Device port
+    username -- User the token was issued to
+    version -- API version the token was requested through
+    token_kind -- 'password' for a normal login token or 'custom' for a login_custom token
+    """
+    return f'{address}:{port}|{username}|{version}|{token_kind}'
+
+
+class TokenCache:
+    """
+    This class stores access tokens in a JSON file so separate processes talking to the same
+    device can reuse a token instead of logging in each time.  The file is only readable by
+    its owner (0600) and every access holds an exclusive lock on it.
+    """
+
+    def __init__(self, cache_file=DEFAULT_TOKEN_CACHE_FILE, expiry_margin=60):
+        """
+        Parameters:
+
+        cache_file -- The file tokens are stored in (created if missing)
+        expiry_margin -- Tokens expiring within this many seconds are treated as expired
+        """
+        self.cache_file = cache_file
+        self.expiry_margin = expiry_margin
+
+    @contextlib.contextmanager
+    def _locked_tokens(self):
+        """
+        Helper context manager that yields the token dict with the file locked and writes the
+        dict back (dropping expired tokens) when the body completes
+        """
+        file_descriptor = os.open(self.cache_file, os.O_RDWR | os.O_CREAT, stat.S_IRUSR | stat.S_IWUSR)
+        with os.fdopen(file_descriptor, 'r+') as file_handle:
+            # Tighten the permissions of a file that was created by something else
+            if stat.S_IMODE(os.fstat(file_descriptor).st_mode) != stat.S_IRUSR | stat.S_IWUSR:
+                os.chmod(self.cache_file, stat.S_IRUSR | stat.S_IWUSR)
+            if fcntl is not None:
+                fcntl.flock(file_descriptor, fcntl.LOCK_EX)
+            content = file_handle.read()
+            try:
+                tokens = json.loads(content) if content.strip() else {}
+            except ValueError:
+                logging.warning(f'Ignoring corrupt token cache: {self.cache_file}')
+                tokens = {}
+            original_tokens = dict(tokens)
+            yield tokens
+            now = time.time()
+            tokens = {key: value for key, value in tokens.items() if value['expires_at'] > now}
+            if tokens != original_tokens:
+                file_handle.seek(0)
+                file_handle.truncate()
+                file_handle.write(json.dumps(tokens, indent=3, sort_keys=True))
+                file_handle.flush()
+
+    def get(self, key):
+        """
+        Return the cached access token for the key or None if there is no unexpired token
+        """
+        with self._locked_tokens() as tokens:
+            entry = tokens.get(key)
+            if entry is None or entry['expires_at'] - self.expiry_margin <= time.time():
+                return None
+            return entry['access_token']
+
+    def put(self, key, access_token, expires_in):
+        """
+        Store a token
+
+        Parameters:
+
+        key -- See get_token_key
+        access_token -- The token
+        expires_in -- Number of seconds the token is valid for (as returned by the token call)
+        """
+        with self._locked_tokens() as tokens:
+            tokens[key] = {'access_token': access_token, 'expires_at': time.time() + expires_in}
+
+    def remove(self, key):
+        """
+        Drop a token, used when the device rejected it or it was revoked
+        """
+        with self._locked_tokens() as tokens:
+            tokens.pop(key, None)
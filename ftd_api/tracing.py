@@ -0,0 +1,184 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class Span:
+    """
+    A timed unit of work.  Spans started while another span is active on the same thread
+    are nested under it.
+    """
+
+    def __init__(self, name, span_id, parent_id, attributes):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.start_time = time.time()
+        self.end_time = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        return (self.end_time or time.time()) - self.start_time
+
+
+class _NoopSpan:
+    """
+    Span handed out when tracing is disabled so callers don't need to check
+    """
+
+    def set_attribute(self, key, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    This class creates nested, timed spans and hands each finished span to an exporter.
+    Without an exporter tracing is disabled and spans cost next to nothing.
+
+    Usage:
+
+    with tracer.span('download', export_type='FULL_EXPORT') as span:
+        ...
+        span.set_attribute('bytes', size)
+    """
+
+    def __init__(self, exporter=None):
+        """
+        Parameters:
+
+        exporter -- Object with an export(span) method (e.g. JsonLinesTraceExporter) or None to disable tracing
+        """
+        self.exporter = exporter
+        self._local = threading.local()
+        self._span_ids = itertools.count(1)
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def _get_stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self):
+        """
+        Return the innermost active span of the current thread
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        stack = self._get_stack()
+        return stack[-1] if stack else _NOOP_SPAN
+
+    @contextlib.contextmanager
+    def span(self, name, parent=None, **attributes):
+        """
+        Context manager that times the body as a span nested under the current span
+
+        Parameters:
+
+        name -- Name of the span
+        parent -- Optional span to nest under instead of the current span (used to link
+                  work handed to another thread back to the span that started it)
+        attributes -- Initial attributes of the span
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        stack = self._get_stack()
+        if isinstance(parent, Span):
+            parent_id = parent.span_id
+        else:
+            parent_id = stack[-1].span_id if stack else None
+        span = Span(name, next(self._span_ids), parent_id, attributes)
+        stack.append(span)
+        try:
+            yield span
+        except Exception as err:
+            span.set_attribute('error', str(err))
+            raise
+        finally:
+            span.end_time = time.time()
+            stack.pop()
+            self.exporter.export(span)
+
+
+def traced(span_name):
+    """
+    Decorator that runs a method inside a span of the tracer found on self.tracer
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(span_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class JsonLinesTraceExporter:
+    """
+    Writes spans in the Chrome trace event format (complete 'X' events) one event per line.
+    The file opens with '[' and every event line ends with a comma, close() terminates the
+    array so the file loads in chrome://tracing, Perfetto and other viewers of that format.
+    A file that was not closed (e.g. the process was killed) still loads as those viewers
+    accept a missing closing bracket.
+    """
+
+    def __init__(self, trace_file):
+        """
+        Parameters:
+
+        trace_file -- The file to write the trace to
+        """
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._file_handle = open(trace_file, 'w')
+        self._file_handle.write('[\n')
+
+    def export(self, span):
+        event = {
+            'name': span.name,
+            'cat': 'ftd_api',
+            'ph': 'X',
+            'ts': int(span.start_time * 1000000),
+            'dur': int(span.duration * 1000000),
+            'pid': self._pid,
+            'tid': span.thread_id,
+            'args': {'span_id': span.span_id, 'parent_id': span.parent_id, **span.attributes}
+        }
+        line = json.dumps(event, sort_keys=True, default=str)
+        with self._lock:
+            self._file_handle.write(line + ',\n')
+
+    def close(self):
+        """
+        Terminate the event array with a process name metadata event and close the file
+        """
+        metadata_event = {'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'ftd_api'}}
+        with self._lock:
+            self._file_handle.write(json.dumps(metadata_event, sort_keys=True) + '\n]\n')
+            self._file_handle.close()
@@ -0,0 +1,155 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+updated
+
+'''
+import json
+import logging
+import os
+import os.path
+import threading
+import time
+from ftd_api.config_diff import object_content_hash
+from ftd_api.file_helper import read_string_from_file
+from ftd_api.parse_ndjson import NdjsonStreamWriter
+
+PENDING_CHANGES_URL = '/operational/pendingchanges'
+
+
+def _get_change_key(change):
+    """
+    Helper to fetch the key identifying the entity a pending change is for
+    """
+    entity_id = change.get('entityId') or change.get('id')
+    return f"{change.get('entityType', change.get('type'))}|{entity_id}"
+
+
+class PendingChangeWatcher:
+    """
+    This class polls the pending changes of a device and appends an NDJSON event for every
+    entity whose pending change is new or was modified since the previous poll.  The
+    fingerprints of the pending changes already reported are kept in a cursor file so a
+    restarted watcher carries on where it stopped instead of reporting everything again.
+    Entities that drop out of the pending changes (deployed or reverted) are forgotten.
+
+    The poll interval starts at min_interval, grows by backoff_factor after every poll that
+    found nothing up to max_interval and drops back to min_interval when changes show up.
+    """
+
+    def __init__(self, client, event_file, cursor_file, min_interval=5.0, max_interval=300.0, backoff_factor=2.0):
+        """
+        Parameters:
+
+        client -- Logged in FTDClient
+        event_file -- NDJSON file the events are appended to
+        cursor_file -- JSON file the cursor is persisted in
+        min_interval -- Shortest time in seconds between polls
+        max_interval -- Longest time in seconds between polls
+        backoff_factor -- The interval is multiplied by this after a poll without changes
+        """
+        self.client = client
+        self.event_file = event_file
+        self.cursor_file = cursor_file
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.interval = min_interval
+        self.cursor = self._read_cursor()
+
+    def _read_cursor(self):
+        """
+        Helper to load the persisted cursor, a fresh cursor is returned if there is none
+        """
+        if os.path.isfile(self.cursor_file):
+            return json.loads(read_string_from_file(self.cursor_file))
+        return {'sequence': 0, 'last_poll': None, 'fingerprints': {}}
+
+    def _write_cursor(self):
+        """
+        Helper to persist the cursor, written to a temporary file first so a crash never
+        leaves a truncated cursor behind
+        """
+        temp_file = self.cursor_file + '.tmp'
+        with open(temp_file, 'w') as file_handle:
+            file_handle.write(json.dumps(self.cursor, indent=3, sort_keys=True))
+        os.replace(temp_file, self.cursor_file)
+
+    def poll(self):
+        """
+        Fetch the pending changes once, append the events for new and modified entities and
+        persist the cursor.  The events are written before the cursor so an interrupted poll
+        repeats events rather than losing them.
+
+        Return is the list of events written
+        """
+        change_list = self.client.do_get_multi_page(PENDING_CHANGES_URL, filter_system_defined=False)
+        poll_time = time.time()
+        previous_fingerprints = self.cursor['fingerprints']
+        fingerprints = {}
+        event_list = []
+        for change in change_list:
+            key = _get_change_key(change)
+            fingerprint = object_content_hash(change)
+            fingerprints[key] = fingerprint
+            if previous_fingerprints.get(key) == fingerprint:
+                continue
+            self.cursor['sequence'] += 1
+            event_list.append({
+                'sequence': self.cursor['sequence'],
+                'time': poll_time,
+                'event': 'NEW' if key not in previous_fingerprints else 'MODIFIED',
+                'entity_type': change.get('entityType'),
+                'entity_id': change.get('entityId'),
+                'entity_name': change.get('entityName'),
+                'change': change
+            })
+        if event_list:
+            with NdjsonStreamWriter(self.event_file, append=True) as writer:
+                for event in event_list:
+                    writer.write(event)
+        self.cursor['fingerprints'] = fingerprints
+        self.cursor['last_poll'] = poll_time
+        self._write_cursor()
+        return event_list
+
+    def _next_interval(self, event_count):
+        """
+        Helper to compute the wait before the next poll
+        """
+        if event_count > 0:
+            return self.min_interval
+        return min(self.max_interval, self.interval * self.backoff_factor)
+
+    def run(self, max_polls=None, stop_event=None):
+        """
+        Poll until stopped
+
+        Parameters:
+
+        max_polls -- Optional number of polls after which to return
+        stop_event -- Optional threading.Event, the watcher returns once it is set
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
+        poll_count = 0
+        while not stop_event.is_set():
+            try:
+                event_count = len(self.poll())
+            except Exception as err:
+                # Keep watching through transient device/network errors backing off as if idle
+                logging.warning(f'Pending changes poll failed: {err}')
+                event_count = 0
+            poll_count += 1
+            if event_count:
+                logging.info(f'{event_count} pending change events written to: {self.event_file}')
+            if max_polls is not None and poll_count >= max_polls:
+                break
+            self.interval = self._next_interval(event_count)
+            logging.debug(f'Next pending changes poll in {self.interval} seconds')
+            stop_event.wait(self.interval)
@@ -15,8 +15,13 @@ Created: Jan 3, 2020
 '''
 
 import sys
+import os
 import os.path
+import argparse
+import json
 import ftd_api.parse_properties as parse_properties
+import ftd_api.fleet as fleet
+from ftd_api.watch import PendingChangeWatcher
 from ftd_api.bulk_tool import BulkTool
 from ftd_api.string_helper import split_string_list
 
@@ -24,6 +29,14 @@ from ftd_api.string_helper import split_string_list
 import logging
 from ftd_api.logging import configure_logging, enable_debug, disable_debug
 from ftd_api.ftd_client import FTDClient
+from ftd_api.debug_payload import PayloadDebugger
+from ftd_api.export_store import ExportStore
+from ftd_api.paging import AdaptivePageSizer
+from ftd_api.token_cache import TokenCache
+from ftd_api.token_cache import DEFAULT_TOKEN_CACHE_FILE
+from ftd_api.metrics import MetricsRegistry
+from ftd_api.tracing import Tracer
+from ftd_api.tracing import JsonLinesTraceExporter
 
 
 
@@ -31,8 +44,26 @@ def main():
 
     configure_logging()
     args = get_args()
+    metrics = MetricsRegistry()
+    tracer = Tracer(JsonLinesTraceExporter(args.trace_file) if args.trace_file is not None else None)
+    payload_debugger = PayloadDebugger(max_size=args.debug_payload_max,
+                                       sample_rate=args.debug_payload_sample,
+                                       dump_directory=args.debug_payload_dir)
+    token_cache = TokenCache(args.token_cache) if args.token_cache is not None else None
+    export_store = ExportStore(args.store) if args.store is not None else None
     
     try:
+        # Queries only read the local store no device connection needed
+        if args.mode == 'QUERY':
+            query(args, export_store)
+            logging.info('Done')
+            return
+
+        if args.inventory is not None:
+            fleet_run(args, metrics, tracer, payload_debugger, token_cache, export_store)
+            logging.info('Done')
+            return
+
         # Establish the FTD connection
         logging.info(f'Establishing connection to FTD: https://{args.address}:{args.port}')
         try:
@@ -40,7 +71,12 @@ def main():
             client = FTDClient(address=args.address,
                                port=args.port,
                                username=args.username,
-                               password=args.password)
+                               password=args.password,
+                               metrics=metrics,
+                               tracer=tracer,
+                               payload_debugger=payload_debugger,
+                               token_cache=token_cache,
+                               page_sizer=AdaptivePageSizer() if args.adaptive_paging else None)
             # login to create a session
             client.login()
             bulk_client = BulkTool(client)
@@ -50,12 +86,16 @@ def main():
 
         # Handle Export
         if args.mode == 'EXPORT':
-            bulk_export(args, bulk_client)
+            bulk_export(args, bulk_client, export_store=export_store)
 
         # Handle Import
         elif args.mode == 'IMPORT':
             bulk_import(args, bulk_client)
 
+        # Handle Pending Change Watching
+        elif args.mode == 'WATCH':
+            watch(args, bulk_client)
+
         # Handle Type Listing
         elif args.mode == 'LIST_TYPES':
             type_list = "\n"
@@ -76,10 +116,16 @@ def main():
             else:
                 message = str(ex)
             fatal(message, 1)
+    finally:
+        if export_store is not None:
+            export_store.close()
+        write_metrics(args, metrics)
+        if tracer.enabled:
+            tracer.exporter.close()
+            logging.info(f'Trace can be found in: {args.trace_file}')
     logging.info('Done')
 
 def get_args ():
-    import argparse
 
     # Let's start with the config file if it is specified.
     config_file_parser = argparse.ArgumentParser(
@@ -115,7 +161,7 @@ def get_args ():
     # Required Command
     parser.add_argument(
         'mode',
-        choices=['IMPORT', 'EXPORT', 'LIST_TYPES'],
+        choices=['IMPORT', 'EXPORT', 'LIST_TYPES', 'WATCH', 'QUERY'],
         help='The various different modes in which the tool runs'
     )
 
@@ -152,8 +198,8 @@ def get_args ():
         )
     )
     parser.add_argument(
-        '-f','--format', choices=['CSV', 'JSON', 'YAML'],
-        help="Specify the import or output format. Default: 'JSON'",
+        '-f','--format', choices=['CSV', 'JSON', 'YAML', 'YAML_STREAM', 'NDJSON'],
+        help="Specify the import or output format. YAML_STREAM writes/reads one YAML document per object and NDJSON one JSON record per line. Default: 'JSON'",
         default='JSON'
     )
 
@@ -167,6 +213,11 @@ def get_args ():
         help="Export only pending changes. Only valid for EXPORT mode. Ignored if 'url' is supplied",
         action='store_true'
     )
+    parser.add_argument(
+        '--incremental',
+        help="Compare the export with the snapshot of the previous incremental export in the same location and only rewrite the per-type files that changed. Only valid for full exports in EXPORT mode (no pending or filter options). Ignored if 'url' is supplied",
+        action='store_true'
+    )
     parser.add_argument(
         '-i','--id_list',
         help="Comma separated list of ID values to export. This is essentially a filter by ID on the export. Only valid for EXPORT mode. Ignored if 'url' or 'pending' are supplied"
@@ -184,6 +235,152 @@ def get_args ():
         help="This instructs the import code to filter by the -t -n -i options before sending the data to the server, this can be used as a work around if server side filtering does not work",
         action='store_true'
     )
+    parser.add_argument(
+        '--delta',
+        help="This instructs the import code to export the current state of the imported types from the device first and only upload the objects that would change something. Only valid for IMPORT mode",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--chunk_size',
+        metavar='RECORDS',
+        help="Import in several jobs of about this many records each. The records are ordered so an object is never imported before the objects it references. Only valid for IMPORT mode",
+        type=int
+    )
+    parser.add_argument(
+        '--resolve_references',
+        help="Fill in the ids of references that only have a name and type (e.g. in hand written CSV files) by listing each referenced type on the device once. Only valid for IMPORT mode",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--reference_cache',
+        metavar='FILE_NAME',
+        help="Cache the names and ids listed by --resolve_references in this file and reuse them for an hour"
+    )
+    parser.add_argument(
+        '--compact',
+        help="Load the records with less memory (shared strings and references) for very large IMPORT files and CSV EXPORT conversions",
+        action='store_true'
+    )
+    parser.add_argument(
+        '--load_workers',
+        help="Number of processes used to parse the import files in parallel. Only valid for IMPORT mode. Default: files are parsed serially",
+        type=int
+    )
+
+    parser.add_argument(
+        '--schema_types',
+        help="Take the CSV column types (int, bool, float) from the model definitions of the device's OpenAPI spec instead of inspecting every value. Only valid for EXPORT mode with CSV format",
+        action='store_true'
+    )
+
+    parser.add_argument(
+        '--filter',
+        metavar='FILTER_EXPRESSION',
+        help="FTD filter expression passed to the device with --url export (e.g. name:outside)"
+    )
+    parser.add_argument(
+        '--fields',
+        help="Comma separated list of fields to keep in each object with --url export, nested fields are given as dotted paths (e.g. id,name,type,value,subType)"
+    )
+    parser.add_argument(
+        '--local_projection',
+        help="Only drop the fields not listed with --fields locally instead of also asking the device to leave them out. Also applies to the types listed by --resolve_references",
+        action='store_true'
+    )
+
+    parser.add_argument(
+        '--cursor_file',
+        metavar='FILE_NAME',
+        help="File the WATCH cursor (pending changes already reported) is kept in. Default: the location with .cursor appended"
+    )
+    parser.add_argument(
+        '--watch_min_interval',
+        metavar='SECONDS',
+        help="Shortest time between pending change polls in WATCH mode, used again as soon as changes show up. Default: 5",
+        type=float,
+        default=5.0
+    )
+    parser.add_argument(
+        '--watch_max_interval',
+        metavar='SECONDS',
+        help="Longest time between pending change polls in WATCH mode, the interval doubles up to this while nothing changes. Default: 300",
+        type=float,
+        default=300.0
+    )
+
+    parser.add_argument(
+        '--store',
+        metavar='DB_FILE',
+        help="SQLite database the exported objects are also stored in (EXPORT mode, not with --url) and that QUERY mode searches. Objects are upserted per device so later exports only rewrite what changed"
+    )
+    parser.add_argument(
+        '--device',
+        help="Device the QUERY is restricted to, devices are stored under their address or with --inventory under their device name"
+    )
+    parser.add_argument(
+        '--subnet',
+        metavar='CIDR',
+        help="QUERY for the network objects whose address, network or range lies within the subnet (e.g. 10.0.0.0/8)"
+    )
+
+    parser.add_argument(
+        '--adaptive_paging',
+        help="Tune the page size of paged GETs (URL export, delta import) per endpoint for the best objects per second instead of using the device default page size",
+        action='store_true'
+    )
+
+    parser.add_argument(
+        '--token_cache',
+        metavar='FILE_NAME',
+        nargs='?',
+        const=DEFAULT_TOKEN_CACHE_FILE,
+        help=f"Reuse unexpired access tokens across runs by caching them in this file (readable by the owner only). Default file if no name is given: {DEFAULT_TOKEN_CACHE_FILE}"
+    )
+
+    parser.add_argument(
+        '--debug_payload_max',
+        metavar='CHARACTERS',
+        help="Maximum number of characters of a request/response payload written to the debug log, larger payloads are truncated without being parsed. 0 means no limit. Default: 4096",
+        type=int,
+        default=4096
+    )
+    parser.add_argument(
+        '--debug_payload_sample',
+        metavar='RATE',
+        help="Fraction (0.0 - 1.0) of the requests whose payloads are logged in debug mode (e.g. 0.1 logs every 10th request). URLs are always logged. Default: 1.0",
+        type=float,
+        default=1.0
+    )
+    parser.add_argument(
+        '--debug_payload_dir',
+        metavar='DIRECTORY',
+        help="Write the complete payloads of the sampled requests/responses to files in this directory instead of only logging them"
+    )
+
+    parser.add_argument(
+        '--metrics_file',
+        metavar='FILE_PREFIX',
+        help="Write per-endpoint request, job and processing metrics at the end of the run to FILE_PREFIX.prom (Prometheus text format) and FILE_PREFIX.json"
+    )
+
+    parser.add_argument(
+        '--trace_file',
+        metavar='FILE_NAME',
+        help="Write timed spans of every request and bulk operation phase to this file in the Chrome trace event format (one event per line)"
+    )
+
+    # Fleet Options
+    parser.add_argument(
+        '--inventory',
+        metavar='FILE_NAME',
+        help="Inventory file listing one device properties file per line. EXPORT and IMPORT are run against every device, exports are written to a directory per device under the location"
+    )
+    parser.add_argument(
+        '--max_devices',
+        help="Maximum number of devices worked on concurrently with --inventory. Default: 8",
+        type=int,
+        default=8
+    )
     args = parser.parse_args(remaining_argv)
 
     # Let's do all the up front validation we can based solely on the input
@@ -191,15 +388,39 @@ def get_args ():
         enable_debug()
     else:
         disable_debug()
+    if not 0.0 <= args.debug_payload_sample <= 1.0:
+        parser.error('--debug_payload_sample must be between 0.0 and 1.0')
+    if (args.filter is not None or args.fields is not None) and (args.mode != 'EXPORT' or args.url is None):
+        parser.error('--filter and --fields are only valid for EXPORT with --url')
     if args.mode == 'EXPORT':
         if not os.path.isdir(args.location):
             parser.error(f'Unable to locate provided export directory: {args.location}')
 
         if args.pending and args.url is not None:
             logging.warn("URL Export does not support exporting only pending changes. The 'pending' option will be ignored.")
+        if args.incremental and args.url is not None:
+            logging.warn("URL Export does not support incremental exports. The 'incremental' option will be ignored.")
+        elif args.incremental and (args.pending or args.type_list is not None or args.id_list is not None or args.name_list is not None):
+            parser.error('The incremental option is only supported for full exports, remove the pending option and the filter criteria (id_list, name_list, type_list)')
         if args.pending and (args.type_list is not None or args.id_list is not None or args.name_list is not None):
             parser.error(f'Filter criteria (id_list, name_list, type_list) are not supported with the pending option please remove the filter criteria')
 
+    elif args.mode == 'QUERY':
+        if args.store is None:
+            parser.error('QUERY mode requires --store')
+        if not os.path.isfile(args.store):
+            parser.error(f'Unable to locate the store: {args.store}')
+        if args.subnet is not None and (args.id_list is not None or args.name_list is not None or args.type_list is not None):
+            parser.error('--subnet cannot be combined with --id_list, --name_list or --type_list')
+
+    elif args.mode == 'WATCH':
+        if args.location is None:
+            parser.error('WATCH mode requires the NDJSON event file to append to as the location')
+        if not os.path.isdir(os.path.dirname(os.path.abspath(args.location))):
+            parser.error(f'Unable to locate the directory of the event file: {args.location}')
+        if args.watch_min_interval <= 0 or args.watch_max_interval < args.watch_min_interval:
+            parser.error('--watch_min_interval must be positive and not larger than --watch_max_interval')
+
     elif args.mode == 'IMPORT' and (args.pending or args.url is not None):
         # We do allow type, name, id filters for import they act as exclude filters on the import set
         parser.error('The following options are not valid with the IMPORT command: --url, -e')
@@ -221,9 +442,15 @@ def fatal(message, error_code=42):
     logging.critical(f'FATAL: {message}')
     exit(error_code)
 
-def bulk_export(args, client) :
+def get_export_args(args):
+    # Keyword arguments of BulkTool.url_export (with --url) or BulkTool.bulk_export, shared by
+    # the single device and the fleet export
     if args.url is not None:
-        return client.url_export(args.url, args.location, output_format=args.format)
+        fields = split_string_list(args.fields) if args.fields is not None else None
+        return {'output_format': args.format,
+                'filter_expression': args.filter,
+                'fields': fields,
+                'push_down_fields': not args.local_projection}
             
     # Pre-define lists as none so they are passed down with the proper default
     id_list = None
@@ -243,13 +470,27 @@ def bulk_export(args, client) :
     if args.name_list is not None:
         name_list = split_string_list(args.name_list)
 
-    client.bulk_export(args.location, pending_changes, type_list=type_list, id_list=id_list, name_list=name_list, output_format=args.format)            
-
-def bulk_import(args, client):
-    file_list = split_string_list(args.location)
-
-    if args.format not in ('CSV', 'JSON', 'YAML'):
-        logging.error('Format must be specified as CSV, JSON or YAML')
+    return {'pending_changes': pending_changes,
+            'type_list': type_list,
+            'id_list': id_list,
+            'name_list': name_list,
+            'output_format': args.format,
+            'incremental': args.incremental,
+            'compact': args.compact,
+            'schema_types': args.schema_types}
+
+def bulk_export(args, client, export_store=None) :
+    export_args = get_export_args(args)
+    if args.url is not None:
+        if export_store is not None:
+            logging.warn('URL Export objects are not stored, --store is ignored')
+        return client.url_export(args.url, args.location, **export_args)
+    return client.bulk_export(args.location, export_store=export_store, **export_args)
+
+def get_import_args(args):
+    # Keyword arguments of BulkTool.bulk_import, shared by the single device and the fleet import
+    if args.format not in ('CSV', 'JSON', 'YAML', 'YAML_STREAM', 'NDJSON'):
+        logging.error('Format must be specified as CSV, JSON, YAML, YAML_STREAM or NDJSON')
         fatal(None, 11)
         
     # Pre-define lists as none so they are passed down with the proper default
@@ -265,12 +506,86 @@ def bulk_import(args, client):
     if args.name_list is not None:
         name_list = split_string_list(args.name_list)
 
-    client.bulk_import(file_list, 
-                       input_format=args.format,
-                       type_list=type_list,
-                       id_list=id_list,
-                       name_list=name_list,
-                       filter_local=args.filter_local)
+    return {'input_format': args.format,
+            'type_list': type_list,
+            'id_list': id_list,
+            'name_list': name_list,
+            'filter_local': args.filter_local,
+            'delta': args.delta,
+            'load_workers': args.load_workers,
+            'chunk_size': args.chunk_size,
+            'compact': args.compact,
+            'resolve_references': args.resolve_references,
+            'reference_cache_file': args.reference_cache,
+            'reference_push_down_fields': not args.local_projection}
+
+def bulk_import(args, client):
+    return client.bulk_import(split_string_list(args.location), **get_import_args(args))
+
+def query(args, export_store):
+    if args.subnet is not None:
+        result_list = export_store.query_subnet(args.subnet, device=args.device)
+    else:
+        # Any value of a list matches, the lists and the device all have to match
+        result_list = export_store.query(
+            device=args.device,
+            object_type=split_string_list(args.type_list) if args.type_list is not None else None,
+            name=split_string_list(args.name_list) if args.name_list is not None else None,
+            object_id=split_string_list(args.id_list) if args.id_list is not None else None)
+    logging.info(f'{len(result_list)} objects found on {len(set(x["device"] for x in result_list))} devices')
+    output = json.dumps(result_list, indent=3)
+    if args.location is not None:
+        with open(args.location, 'w') as file_handle:
+            file_handle.write(output)
+        logging.info(f'Query results can be found in: {args.location}')
+    else:
+        print(output)
+
+def watch(args, client):
+    cursor_file = args.cursor_file if args.cursor_file is not None else args.location + '.cursor'
+    watcher = PendingChangeWatcher(client.client,
+                                   args.location,
+                                   cursor_file,
+                                   min_interval=args.watch_min_interval,
+                                   max_interval=args.watch_max_interval)
+    logging.info(f'Watching pending changes, events are appended to: {args.location} (Ctrl-C to stop)')
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logging.info(f'Stopped watching, cursor saved in: {cursor_file}')
+
+def write_metrics(args, metrics):
+    if args.metrics_file is not None:
+        prometheus_file, json_file = metrics.write_files(args.metrics_file)
+        logging.info(f'Metrics can be found in: {prometheus_file} and {json_file}')
+
+def fleet_run(args, metrics, tracer, payload_debugger, token_cache, export_store):
+    if args.mode not in ('EXPORT', 'IMPORT'):
+        fatal(f'Mode {args.mode} is not supported with --inventory', 12)
+
+    device_list = fleet.read_inventory(args.inventory)
+    logging.info(f'Running {args.mode} against {len(device_list)} devices ({args.max_devices} at a time)')
+    executor = fleet.FleetExecutor(device_list,
+                                   max_workers=args.max_devices,
+                                   metrics=metrics,
+                                   tracer=tracer,
+                                   payload_debugger=payload_debugger,
+                                   token_cache=token_cache,
+                                   adaptive_paging=args.adaptive_paging)
+
+    if args.mode == 'EXPORT':
+        if args.url is not None and export_store is not None:
+            logging.warn('URL Export objects are not stored, --store is ignored')
+            export_store = None
+        summary_list = executor.bulk_export(args.location, url=args.url, export_store=export_store, **get_export_args(args))
+    else:
+        summary_list = executor.bulk_import(split_string_list(args.location), **get_import_args(args))
+    fleet.log_summary(summary_list)
+    if args.mode == 'EXPORT':
+        summary_file = os.path.normpath(args.location + '/' + fleet.FLEET_SUMMARY_FILE)
+        logging.info(f'Fleet summary can be found in: {summary_file}')
+    if any(x['status'] != 'SUCCESS' for x in summary_list):
+        fatal('One or more devices failed', 2)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,107 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import threading
+import unittest
+import requests
+from ftd_api.batch import BatchExecutor
+from ftd_api.batch import BatchOperation
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b''
+        self.text = self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeClient:
+    """
+    Records the requests, responses are scripted per URL (the last one is repeated)
+    """
+
+    def __init__(self, scripted_responses):
+        self.scripted_responses = scripted_responses
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def _respond(self, method, url, body=None):
+        with self.lock:
+            self.requests.append((method, url, body))
+            script = self.scripted_responses.get(url, [FakeResponse(200, {'id': 'new'})])
+            response = script.pop(0) if len(script) > 1 else script[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def do_post_raw_with_base_url(self, url, body):
+        return self._respond('POST', url, body)
+
+    def do_put_raw_with_base_url(self, url, body):
+        return self._respond('PUT', url, body)
+
+    def do_delete_raw_with_base_url(self, url):
+        return self._respond('DELETE', url)
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_operation_urls(self):
+        self.assertEqual(BatchOperation('CREATE', '/object/networks', {'name': 'a'}).get_object_url(), '/object/networks')
+        self.assertEqual(BatchOperation('EDIT', '/object/networks', {'id': '1'}).get_object_url(), '/object/networks/1')
+        self.assertEqual(BatchOperation('DELETE', '/object/networks/', object_id='2').get_object_url(), '/object/networks/2')
+        with self.assertRaises(Exception):
+            BatchOperation('DELETE', '/object/networks')
+
+    def test_retries_and_collect_all_errors(self):
+        client = FakeClient({
+            '/object/networks/1': [FakeResponse(423), requests.exceptions.ConnectionError('reset'), FakeResponse(200, {'id': '1'})],
+            '/object/networks/2': [FakeResponse(422, {'error': 'bad value'})],
+            '/object/networks/3': [FakeResponse(204)]
+        })
+        operation_list = [
+            BatchOperation('CREATE', '/object/networks', {'name': 'a'}),
+            BatchOperation('EDIT', '/object/networks', {'id': '1', 'name': 'b'}),
+            BatchOperation('EDIT', '/object/networks', {'id': '2', 'name': 'c'}),
+            BatchOperation('DELETE', '/object/networks', object_id='3')
+        ]
+        result_list = BatchExecutor(client, max_workers=4, retry_delay=0).run(operation_list)
+        self.assertEqual([x['status'] for x in result_list], ['SUCCESS', 'SUCCESS', 'FAILED', 'SUCCESS'])
+        self.assertEqual(result_list[0]['response'], {'id': 'new'})
+        self.assertEqual(result_list[1]['attempts'], 3)
+        self.assertEqual(result_list[2]['attempts'], 1)
+        self.assertIn('bad value', result_list[2]['error'])
+        self.assertIsNone(result_list[3]['response'])
+
+    def test_create_retries(self):
+        client = FakeClient({'/object/networks': [FakeResponse(429), FakeResponse(200, {'id': 'new'})]})
+        result = BatchExecutor(client, retry_delay=0).run([BatchOperation('CREATE', '/object/networks', {'name': 'a'})])[0]
+        self.assertEqual((result['status'], result['attempts']), ('SUCCESS', 2))
+
+        # the POST may have been applied, it is not sent again
+        for response in (requests.exceptions.ConnectionError('reset'), FakeResponse(503)):
+            client = FakeClient({'/object/networks': [response, FakeResponse(200, {'id': 'new'})]})
+            result = BatchExecutor(client, retry_delay=0).run([BatchOperation('CREATE', '/object/networks', {'name': 'a'})])[0]
+            self.assertEqual((result['status'], result['attempts']), ('FAILED', 1))
+            self.assertIn('may or may not have been created', result['error'])
+            self.assertEqual(len(client.requests), 1)
+
+    def test_stop_on_first_error(self):
+        client = FakeClient({'/object/networks/0': [FakeResponse(503)]})
+        operation_list = [BatchOperation('DELETE', '/object/networks', object_id=str(x)) for x in range(5)]
+        result_list = BatchExecutor(client, max_workers=1, retries=1, retry_delay=0, stop_on_first_error=True).run(operation_list)
+        self.assertEqual(result_list[0]['status'], 'FAILED')
+        self.assertEqual(result_list[0]['attempts'], 2)
+        self.assertEqual([x['status'] for x in result_list[1:]], ['SKIPPED'] * 4)
+        self.assertEqual(len(client.requests), 2)
@@ -0,0 +1,312 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import logging
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from ftd_api.bulk_tool import BulkTool
+from ftd_api.bulk_tool import EXPORT_CONFIG_FILE_NAMES
+from ftd_api.bulk_tool import _load_import_file
+from ftd_api.metrics import MetricsRegistry
+from ftd_api.parse_ndjson import read_ndjson_file
+from ftd_api.parse_yaml import read_yaml_stream
+from ftd_api.tracing import Tracer
+from record_fixtures import identity_record
+
+OPENAPI_DICT = {
+    'paths': {
+        '/object/networks': {'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/NetworkObjectList'}}}}},
+        '/object/networks/{objId}': {'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/NetworkObject'}}}},
+                                     'put': {}},
+        '/policy/accesspolicies/{parentId}/accessrules/{objId}': {
+            'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/AccessRule'}}}}},
+        '/object/ports/{objId}': {'delete': {}}
+    }
+}
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.tracer = Tracer()
+        self.metrics = MetricsRegistry()
+        self.requested_urls = []
+        self.lock = threading.Lock()
+
+    def get_openapi_spec(self):
+        return OPENAPI_DICT
+
+    def do_get_raw_with_base_url(self, url):
+        with self.lock:
+            self.requested_urls.append(url)
+        object_id = url.split('/')[-1]
+        if object_id == 'missing':
+            return FakeResponse(404)
+        return FakeResponse(200, {'id': object_id, 'url': url})
+
+
+class PagedClient(FakeClient):
+    """
+    Serves page_list one page at a time from iter_multi_page, an exception in the list is
+    raised when its page is reached
+    """
+
+    def __init__(self, page_list):
+        super().__init__()
+        self.page_list = page_list
+        self.page_args = None
+
+    def iter_multi_page(self, url, **page_args):
+        self.page_args = page_args
+        for page in self.page_list:
+            if isinstance(page, Exception):
+                raise page
+            yield [dict(x) for x in page]
+
+
+class UploadRecordingBulkTool(BulkTool):
+    """
+    Keeps the import lists instead of uploading them and serves export_list as the export
+    zip of every export job
+    """
+
+    def __init__(self, client, export_list=None):
+        super().__init__(client)
+        self.uploaded_lists = []
+        self.export_list = export_list if export_list is not None else []
+        self.export_requests = []
+
+    def _do_upload_import_dict_list(self, object_list, entity_filter_list=None):
+        self.uploaded_lists.append(object_list)
+        return True
+
+    def _do_download_export_file(self, export_file_name='/tmp/export.zip', id_list=None, type_list=None,
+                                 name_list=None, export_type='FULL_EXPORT'):
+        self.export_requests.append({'type_list': type_list, 'export_type': export_type})
+        object_list = [x for x in self.export_list
+                       if type_list is None or x.get('data', {}).get('type') in type_list]
+        with zipfile.ZipFile(export_file_name, 'w') as zip_ref:
+            zip_ref.writestr(EXPORT_CONFIG_FILE_NAMES[export_type], json.dumps(object_list, indent=3))
+
+
+class TestBulkTool(unittest.TestCase):
+
+    def test_type_url_index(self):
+        type_url_index = BulkTool(FakeClient()).get_type_url_index()
+        # accessrules need the id of their access policy as well
+        self.assertEqual(type_url_index, {'networkobject': '/object/networks/{objId}'})
+
+    def test_get_objects_by_id(self):
+        client = FakeClient()
+        bulk_tool = BulkTool(client)
+        object_list = bulk_tool.get_objects_by_id([('NetworkObject', 'b'),
+                                                   {'type': 'networkobject', 'id': 'a', 'name': 'x'},
+                                                   ('networkobject', 'b'),
+                                                   ('networkobject', 'missing')])
+        self.assertEqual([x['id'] if x else None for x in object_list], ['b', 'a', 'b', None])
+        self.assertEqual(object_list[1]['url'], '/object/networks/a')
+        self.assertEqual(sorted(client.requested_urls), ['/object/networks/a', '/object/networks/b', '/object/networks/missing'])
+        self.assertEqual([x['id'] for x in bulk_tool.get_objects_by_id(['c', 'd'], object_type='networkobject')], ['c', 'd'])
+        with self.assertRaises(Exception):
+            bulk_tool.get_objects_by_id([('unknowntype', 'a')])
+        with self.assertRaises(Exception):
+            bulk_tool.get_objects_by_id([('accessrule', 'a')])
+        self.assertFalse(any('{' in x for x in client.requested_urls))
+
+    def test_parallel_load_keeps_file_order(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_list = []
+            for file_number, record_count in enumerate((3, 1, 4)):
+                file_name = os.path.join(temp_dir, f'import{file_number}.json')
+                with open(file_name, 'w') as file_handle:
+                    json.dump([identity_record('networkobject', f'net{file_number}_{x}', subType='HOST', value='10.0.0.1')
+                               for x in range(record_count)], file_handle)
+                file_list.append(file_name)
+
+            uploaded = {}
+            phase_counts = {}
+            for load_workers in (None, 2):
+                client = FakeClient()
+                bulk_tool = UploadRecordingBulkTool(client)
+                self.assertTrue(bulk_tool.bulk_import(file_list, load_workers=load_workers))
+                uploaded[load_workers] = bulk_tool.uploaded_lists
+                phase_counts[load_workers] = client.metrics.to_dict()['phases']['import_file_parse']['count']
+            self.assertEqual(uploaded[2], uploaded[None])
+            self.assertEqual([x['data']['name'] for x in uploaded[2][0]],
+                             ['net0_0', 'net0_1', 'net0_2', 'net1_0', 'net2_0', 'net2_1', 'net2_2', 'net2_3'])
+            # one parse phase per file
+            self.assertEqual(phase_counts, {None: 3, 2: 3})
+
+            with self.assertRaises(Exception):
+                _load_import_file('XML', file_list[0])
+            bulk_tool = UploadRecordingBulkTool(client)
+            with self.assertRaises(Exception):
+                bulk_tool.bulk_import(file_list, input_format='XML', load_workers=2)
+            self.assertEqual(bulk_tool.uploaded_lists, [])
+
+    def test_import_chunk_list_logs_dangling_summary(self):
+        rule = {'action': 'CREATE', 'type': 'identitywrapper', 'data': {
+            'type': 'accessrule', 'name': 'rule1', 'id': 'r1',
+            'sourceZones': [{'type': 'securityzone', 'name': 'inside', 'id': 'z1'}],
+            'sourceNetworks': [{'type': 'networkobject', 'name': 'any-ipv4', 'id': 'n0'},
+                               {'type': 'networkobject', 'name': 'any-ipv6', 'id': 'n1'}]}}
+        with self.assertLogs(level=logging.INFO) as logs:
+            chunk_list = BulkTool(FakeClient())._get_import_chunk_list([rule], 10)
+        self.assertEqual(chunk_list, [[rule]])
+        self.assertEqual(logs.output, [
+            'INFO:root:2 references to networkobject objects not in the import, they have to exist on the device',
+            'INFO:root:1 references to securityzone objects not in the import, they have to exist on the device'
+        ])
+
+    def test_streamed_export_formats(self):
+        export_list = [{'type': 'metadata', 'name': 'export'}] + \
+            [identity_record('networkobject', f'n{x}', value='{"[x]}', version='a') for x in range(5)]
+        bulk_tool = UploadRecordingBulkTool(FakeClient(), export_list=export_list)
+
+        def fail_full_load(*args, **kwargs):
+            raise AssertionError('the export was loaded whole')
+        bulk_tool._read_config_from_export = fail_full_load
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ndjson_file = bulk_tool.bulk_export(temp_dir, output_format='NDJSON')
+            self.assertEqual(list(read_ndjson_file(ndjson_file)), export_list)
+            # the config file is extracted to a temporary directory only
+            self.assertEqual(sorted(os.listdir(temp_dir)), ['export.ndjson', 'myexport.zip'])
+
+            yaml_file = bulk_tool.bulk_export(temp_dir, output_format='YAML_STREAM')
+            self.assertEqual(list(read_yaml_stream(yaml_file)), export_list)
+
+    def test_incremental_export(self):
+        net1 = identity_record('networkobject', 'n1', value='10.0.0.1', version='a')
+        net2 = identity_record('networkobject', 'n2', value='10.0.0.2', version='a')
+        port = identity_record('tcpportobject', 'p1', port='443', version='a')
+        bulk_tool = UploadRecordingBulkTool(FakeClient(), export_list=[{'type': 'metadata'}, net1, net2, port])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            network_file = os.path.join(temp_dir, 'networkobject.json')
+            port_file = os.path.join(temp_dir, 'tcpportobject.json')
+
+            def read(file_name):
+                with open(file_name) as file_handle:
+                    return json.load(file_handle)
+
+            bulk_tool.bulk_export(temp_dir, incremental=True)
+            self.assertEqual(read(network_file), [net1, net2])
+            self.assertEqual(read(port_file), [port])
+            self.assertEqual(len(read(os.path.join(temp_dir, 'export_changes.json'))['added']), 3)
+
+            # only the type with the changed object is rewritten, the port file is kept as is
+            with open(port_file, 'w') as file_handle:
+                json.dump(['kept'], file_handle)
+            net2_changed = identity_record('networkobject', 'n2', value='10.0.0.20', version='b')
+            bulk_tool.export_list = [{'type': 'metadata'}, net1, net2_changed, port]
+            bulk_tool.bulk_export(temp_dir, incremental=True)
+            self.assertEqual(read(network_file), [net1, net2_changed])
+            self.assertEqual(read(port_file), ['kept'])
+            changes = read(os.path.join(temp_dir, 'export_changes.json'))
+            self.assertEqual((changes['added'], changes['changed'], changes['removed']), ([], [net2_changed], []))
+            self.assertEqual(read(os.path.join(temp_dir, 'export_snapshot.json'))['n2']['version'], 'b')
+
+            # the file of a type whose objects are all gone is removed
+            bulk_tool.export_list = [{'type': 'metadata'}, net1, net2_changed]
+            bulk_tool.bulk_export(temp_dir, incremental=True)
+            self.assertFalse(os.path.exists(port_file))
+            self.assertEqual(read(os.path.join(temp_dir, 'export_changes.json'))['removed'],
+                             [{'id': 'p1', 'type': 'tcpportobject', 'name': 'p1', 'version': 'a'}])
+        self.assertEqual([x['export_type'] for x in bulk_tool.export_requests], ['FULL_EXPORT'] * 3)
+
+    def test_delta_import(self):
+        device_list = [identity_record('networkobject', 'n1', value='10.0.0.1', version='a'),
+                       identity_record('networkobject', 'n2', value='10.0.0.2', version='a'),
+                       identity_record('tcpportobject', 'p1', port='443', version='a'),
+                       identity_record('accessrule', 'r1', version='a')]
+        unchanged = identity_record('networkobject', 'n1', value='10.0.0.1', action='EDIT')
+        changed = identity_record('networkobject', 'n2', value='10.0.0.20', action='EDIT')
+        created = identity_record('networkobject', 'n3', value='10.0.0.3')
+        port_unchanged = identity_record('tcpportobject', 'p1', port='443', action='EDIT')
+        delete_missing = identity_record('networkobject', 'n9', action='DELETE')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            import_file = os.path.join(temp_dir, 'import.json')
+            with open(import_file, 'w') as file_handle:
+                json.dump([{'type': 'metadata'}, unchanged, changed, created, port_unchanged, delete_missing], file_handle)
+
+            bulk_tool = UploadRecordingBulkTool(FakeClient(), export_list=device_list)
+            self.assertTrue(bulk_tool.bulk_import([import_file], delta=True))
+            # only the imported types are exported from the device
+            self.assertEqual(bulk_tool.export_requests,
+                             [{'type_list': ['networkobject', 'tcpportobject'], 'export_type': 'PARTIAL_EXPORT'}])
+            self.assertEqual(bulk_tool.uploaded_lists, [[changed, created]])
+
+            # nothing to send no import job
+            with open(import_file, 'w') as file_handle:
+                json.dump([unchanged, port_unchanged], file_handle)
+            bulk_tool = UploadRecordingBulkTool(FakeClient(), export_list=device_list)
+            self.assertTrue(bulk_tool.bulk_import([import_file], delta=True))
+            self.assertEqual(bulk_tool.uploaded_lists, [])
+
+    def _run_with_timeout(self, function, *args, **kwargs):
+        """
+        Run the function on a thread failing the test if it does not finish in time (hangs)
+        """
+        result = {}
+
+        def run():
+            try:
+                result['value'] = function(*args, **kwargs)
+            except Exception as err:
+                result['error'] = err
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive(), 'url_export did not finish')
+        return result
+
+    def test_url_export_pipeline(self):
+        page_list = [[{'id': f'n{page}_{x}', 'type': 'networkobject'} for x in range(3)] for page in range(6)]
+        client = PagedClient(page_list)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # a queue of one page makes the producer wait for the writer
+            result = self._run_with_timeout(BulkTool(client).url_export, '/object/networks', temp_dir,
+                                            output_format='NDJSON', queue_depth=1, fields=['id', 'type'])
+            self.assertNotIn('error', result)
+            record_list = list(read_ndjson_file(result['value']))
+            self.assertEqual([x['data']['id'] for x in record_list], [x['id'] for page in page_list for x in page])
+            self.assertEqual(record_list[0], {'type': 'identitywrapper', 'action': 'EDIT',
+                                              'data': {'id': 'n0_0', 'type': 'networkobject'}})
+            self.assertEqual(client.page_args, {'filter_expression': None, 'fields': ['id', 'type'],
+                                                'push_down_fields': True})
+
+            # a failing fetch is raised to the caller after the pages before it were written
+            client = PagedClient(page_list[:4] + [ConnectionError('connection reset')] + page_list[4:])
+            result = self._run_with_timeout(BulkTool(client).url_export, '/object/networks', temp_dir,
+                                            output_format='NDJSON', queue_depth=1)
+            self.assertIsInstance(result.get('error'), ConnectionError)
+            self.assertEqual(len(list(read_ndjson_file(os.path.join(temp_dir, 'export.ndjson')))), 12)
+
+    def test_incremental_export_requires_full_export(self):
+        client = FakeClient()
+        bulk_tool = BulkTool(client)
+        with self.assertRaises(Exception):
+            bulk_tool.bulk_export('/tmp', type_list=['networkobject'], incremental=True)
+        with self.assertRaises(Exception):
+            bulk_tool.bulk_export('/tmp', pending_changes=True, incremental=True)
+        self.assertEqual(client.requested_urls, [])
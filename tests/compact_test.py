@@ -0,0 +1,102 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os.path
+import pickle
+import tempfile
+import tracemalloc
+import unittest
+from ftd_api.compact import CompactLoader
+from ftd_api.compact import IdentityRecord
+from ftd_api.compact import ReferenceDict
+from ftd_api.compact import compact_json_default
+from ftd_api.config_index import ConfigIndex
+from ftd_api.parse_json import dict_list_to_csv
+from ftd_api.parse_yaml import read_yaml_to_dict
+from ftd_api.parse_yaml import write_dict_to_yaml_file
+
+
+def _make_export(count):
+    object_list = [{'type': 'metadata', 'name': 'export', 'deviceVersion': '6.6.0'}]
+    for number in range(count):
+        object_list.append({'action': 'CREATE', 'type': 'identitywrapper', 'data': {
+            'type': 'accessrule', 'id': f'rule{number}', 'name': f'rule{number}', 'ruleAction': 'PERMIT',
+            'sourceZones': [{'id': 'z1', 'type': 'securityzone', 'name': 'inside'}],
+            'destinationZones': [{'id': 'z2', 'type': 'securityzone', 'name': 'outside'}],
+            'tags': ['web', 'prod']}})
+    return object_list
+
+
+class TestCompactLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.object_list = _make_export(200)
+        self.json_string = json.dumps(self.object_list)
+
+    def test_loads(self):
+        loader = CompactLoader()
+        compact_list = loader.loads(self.json_string)
+        self.assertEqual(compact_list, self.object_list)
+        self.assertIsInstance(compact_list[1], IdentityRecord)
+        self.assertNotIsInstance(compact_list[0], IdentityRecord)
+        self.assertIs(compact_list[1]['data']['sourceZones'][0], compact_list[2]['data']['sourceZones'][0])
+        self.assertIsInstance(compact_list[1]['data']['sourceZones'][0], ReferenceDict)
+        self.assertEqual(loader.get_stats(), {'reference_count': 400, 'shared_reference_count': 2})
+        self.assertEqual(json.loads(json.dumps(compact_list, default=compact_json_default)), self.object_list)
+
+        # the deep size counts what is held in the slots of the IdentityRecords
+        plain_bytes = ConfigIndex(json.loads(self.json_string)).get_memory_report(deep=True)['record_bytes']
+        compact_bytes = ConfigIndex(compact_list).get_memory_report(deep=True)['record_bytes']
+        self.assertGreater(compact_bytes, 200 * 500)
+        self.assertLess(compact_bytes, plain_bytes * 0.5)
+
+        traced_bytes = []
+        for loads in (json.loads, CompactLoader().loads):
+            tracemalloc.start()
+            loaded_list = loads(self.json_string)
+            traced_bytes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del loaded_list
+        self.assertLess(traced_bytes[1], traced_bytes[0] * 0.5)
+
+    def test_compact(self):
+        compact_list = CompactLoader().compact(self.object_list)
+        self.assertEqual(compact_list, self.object_list)
+        self.assertIs(compact_list[3]['data']['destinationZones'][0], compact_list[4]['data']['destinationZones'][0])
+
+    def test_records(self):
+        record = CompactLoader().loads(self.json_string)[1]
+        with self.assertRaises(TypeError):
+            record['data']['sourceZones'][0]['name'] = 'changed'
+        record['data']['sourceZones'][0] = {'id': 'z3', 'type': 'securityzone', 'name': 'dmz'}
+        record['extra'] = 1
+        self.assertEqual(list(record), ['action', 'data', 'type', 'extra'])
+        del record['action']
+        self.assertNotIn('action', record)
+        self.assertEqual(len(record), 3)
+        self.assertEqual(record.get('action', 'missing'), 'missing')
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+    def test_writers(self):
+        compact_list = CompactLoader().loads(self.json_string)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yaml_file = os.path.join(temp_dir, 'export.yaml')
+            write_dict_to_yaml_file(yaml_file, compact_list)
+            self.assertEqual(read_yaml_to_dict(yaml_file), self.object_list)
+            plain_csv = os.path.join(temp_dir, 'plain.csv')
+            compact_csv = os.path.join(temp_dir, 'compact.csv')
+            dict_list_to_csv(self.object_list[1:], plain_csv)
+            dict_list_to_csv(compact_list[1:], compact_csv)
+            with open(plain_csv) as plain_handle, open(compact_csv) as compact_handle:
+                self.assertEqual(plain_handle.read(), compact_handle.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import threading
+import time
+import unittest
+from ftd_api.concurrency import AdaptiveConcurrencyLimiter
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def _complete(self, limiter, status_code, latency=0.01):
+        limiter.acquire()
+        limiter.release(status_code, latency, time.time())
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=8)
+        for _ in range(20):
+            self._complete(limiter, 200)
+        self.assertGreater(limiter.limit, 2)
+        grown_limit = limiter.limit
+
+        self._complete(limiter, 503)
+        self.assertEqual(limiter.limit, grown_limit // 2)
+        self.assertEqual(limiter.get_state()['last_change']['reason'], 'status 503')
+
+        # A request sent before the decrease does not cut the limit again
+        limiter.acquire()
+        limiter.release(423, 0.01, 0.0)
+        self.assertEqual(limiter.limit, grown_limit // 2)
+
+    def test_latency_spike_and_bounds(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, min_spike_latency=0.5)
+        self._complete(limiter, 200, latency=0.2)
+        self._complete(limiter, 200, latency=5.0)
+        self.assertEqual(limiter.limit, 2)
+        self.assertIn('latency', limiter.history[-1]['reason'])
+        time.sleep(0.01)
+        self._complete(limiter, 429)
+        self.assertEqual(limiter.limit, 2)
+
+    def test_in_flight_never_exceeds_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=3, max_limit=3)
+        max_seen = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(10):
+                with limiter.track() as tracker:
+                    with lock:
+                        max_seen.append(limiter.in_flight)
+                    time.sleep(0.001)
+                    tracker.status_code = 200
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(max(max_seen), 3)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import unittest
+import ftd_api.config_diff as config_diff
+from record_fixtures import identity_record
+
+
+class TestConfigDiff(unittest.TestCase):
+
+    def test_diff_against_snapshot(self):
+        old_list = [{'type': 'metadata', 'apiVersion': 'v4'},
+                    identity_record('networkobject', '1', action='EDIT', version='a'),
+                    identity_record('networkobject', '2', action='EDIT', version='a'),
+                    identity_record('portobject', '3', action='EDIT', version='a')]
+        new_list = [{'type': 'metadata', 'apiVersion': 'v4'},
+                    identity_record('networkobject', '1', action='EDIT', version='a'),
+                    identity_record('networkobject', '2', action='EDIT', version='b'),
+                    identity_record('accessrule', '4', action='EDIT', version='a')]
+        snapshot = config_diff.snapshot_from_object_list(old_list)
+        self.assertEqual(set(snapshot), {'1', '2', '3'})
+
+        diff = config_diff.diff_object_list_against_snapshot(new_list, snapshot)
+        self.assertEqual([x['data']['id'] for x in diff['added']], ['4'])
+        self.assertEqual([x['data']['id'] for x in diff['changed']], ['2'])
+        self.assertEqual([x['id'] for x in diff['removed']], ['3'])
+        self.assertEqual(config_diff.get_affected_types(diff), {'networkobject', 'portobject', 'accessrule'})
+
+    def test_diff_without_snapshot(self):
+        new_list = [identity_record('networkobject', '1', action='EDIT', version='a')]
+        diff = config_diff.diff_object_list_against_snapshot(new_list, None)
+        self.assertEqual(len(diff['added']), 1)
+        self.assertEqual(diff['changed'], [])
+        self.assertEqual(diff['removed'], [])
+
+    def test_compute_import_delta(self):
+        current_list = [identity_record('networkobject', '1', name='host1', action='EDIT', version='a'),
+                        identity_record('networkobject', '2', name='host2', action='EDIT', version='a')]
+        current_list[0]['data']['value'] = '10.0.0.1'
+        current_list[1]['data']['value'] = '10.0.0.2'
+
+        unchanged = {'action': 'EDIT', 'type': 'identitywrapper',
+                     'data': {'id': '1', 'type': 'networkobject', 'name': 'host1', 'value': '10.0.0.1'}}
+        changed = {'action': 'EDIT', 'type': 'identitywrapper',
+                   'data': {'type': 'networkobject', 'name': 'host2', 'value': '10.0.0.22'}}
+        created = {'action': 'CREATE', 'type': 'identitywrapper',
+                   'data': {'type': 'networkobject', 'name': 'host3', 'value': '10.0.0.3'}}
+        delete_missing = {'action': 'DELETE', 'type': 'identitywrapper',
+                          'data': {'id': '9', 'type': 'networkobject', 'name': 'host9'}}
+        delta = config_diff.compute_import_delta(
+            [{'type': 'metadata'}, unchanged, changed, created, delete_missing], current_list)
+        self.assertEqual(delta, [changed, created])
+
+
+if __name__ == '__main__':
+    unittest.main()
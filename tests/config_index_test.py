@@ -0,0 +1,68 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import unittest
+from ftd_api.bulk_tool import BulkTool
+from ftd_api.config_index import ConfigIndex
+from record_fixtures import identity_record
+
+
+class TestConfigIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.metadata = {'type': 'metadata', 'name': 'export', 'version': '1'}
+        self.object_list = [
+            self.metadata,
+            identity_record('networkobject', 'n1', 'net1'),
+            identity_record('networkobject', 'n2', 'net2'),
+            identity_record('tcpportobject', 'p1', 'net1'),
+            identity_record('networkobject', 'n3', 'net3')
+        ]
+
+    def test_lookups(self):
+        index = ConfigIndex(self.object_list)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.metadata_list, [self.metadata])
+        self.assertIs(index.get_by_id('n2'), self.object_list[2])
+        self.assertIsNone(index.get_by_id('missing'))
+        self.assertIn('p1', index)
+        self.assertIs(index.get_by_type_name('tcpportobject', 'net1'), self.object_list[3])
+        self.assertEqual(len(index.get_records_by_name('net1')), 2)
+        self.assertEqual(index.get_type_list(), ['networkobject', 'tcpportobject'])
+        self.assertEqual([x['data']['id'] for x in index.get_records_by_type('networkobject')], ['n1', 'n2', 'n3'])
+        self.assertEqual([x[0] for x in index.iter_types()], ['networkobject', 'tcpportobject'])
+
+    def test_find(self):
+        index = ConfigIndex(self.object_list)
+        found = index.find(id_list=['n3', 'n1'], name_list=['net1'], type_list=['metadata'])
+        self.assertEqual(found, [self.metadata, self.object_list[1], self.object_list[3], self.object_list[4]])
+        self.assertEqual(index.find(), [])
+
+    def test_find_duplicate_ids(self):
+        object_list = [identity_record('networkobject', 'n1', 'net1', action='DELETE'), identity_record('networkobject', 'n1', 'net1')]
+        self.assertEqual(ConfigIndex(object_list).find(id_list=['n1']), object_list)
+
+    def test_memory_report(self):
+        report = ConfigIndex(self.object_list).get_memory_report(deep=True)
+        self.assertEqual(report['record_count'], 5)
+        self.assertEqual(report['metadata_count'], 1)
+        self.assertEqual(report['type_record_counts'], {'networkobject': 3, 'tcpportobject': 1})
+        self.assertGreater(report['index_bytes'], 0)
+        self.assertGreater(report['record_bytes'], report['index_bytes'] // 10)
+
+    def test_bulk_tool_filter(self):
+        bulk_tool = BulkTool(None)
+        result = bulk_tool._filter_object_list(self.object_list, ['n2'], ['tcpportobject'], None)
+        self.assertEqual(result, [self.metadata, self.object_list[1], self.object_list[4]])
+        grouped = bulk_tool._group_object_list_by_type(self.object_list)
+        self.assertEqual(sorted(grouped), ['networkobject', 'tcpportobject'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import unittest
+from ftd_api.bulk_tool import BulkTool
+from ftd_api.csv_schema import build_column_type_table
+
+OPENAPI_DICT = {
+    'paths': {},
+    'definitions': {
+        'PhysicalInterface': {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'string'},
+                'mtu': {'type': 'integer', 'format': 'int32'},
+                'enabled': {'type': 'boolean'},
+                'mode': {'type': 'string', 'enum': ['ROUTED', 'PASSIVE']},
+                'ipv4': {'$ref': '#/definitions/InterfaceIPv4'},
+                'subInterfaces': {'type': 'array', 'items': {'$ref': '#/definitions/PhysicalInterface'}},
+                'tags': {'type': 'array', 'items': {'type': 'string'}}
+            }
+        },
+        'InterfaceIPv4': {
+            'type': 'object',
+            'properties': {
+                'weight': {'type': 'number'},
+                'addresses': {'type': 'array', 'items': {'$ref': '#/definitions/HaIPv4Address'}}
+            }
+        },
+        'HaIPv4Address': {
+            'type': 'object',
+            'properties': {'netmask': {'type': 'string'}, 'prefix': {'type': 'integer'}}
+        }
+    }
+}
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.spec_requests = 0
+
+    def get_openapi_spec(self):
+        self.spec_requests += 1
+        return OPENAPI_DICT
+
+
+class TestCsvSchema(unittest.TestCase):
+
+    def test_build_column_type_table(self):
+        table = build_column_type_table(OPENAPI_DICT, 'PhysicalInterface')
+        self.assertEqual(table, {
+            'data.id': 'str',
+            'data.mtu': 'int',
+            'data.enabled': 'bool',
+            'data.mode': 'str',
+            'data.ipv4.weight': 'float',
+            'data.ipv4.addresses[].netmask': 'str',
+            'data.ipv4.addresses[].prefix': 'int',
+            'data.tags[]': 'str'
+        })
+
+    def test_bulk_tool_column_types(self):
+        client = FakeClient()
+        bulk_tool = BulkTool(client)
+        self.assertEqual(bulk_tool.get_csv_column_types('physicalinterface')['data.mtu'], 'int')
+        self.assertIs(bulk_tool.get_csv_column_types('PhysicalInterface'), bulk_tool.get_csv_column_types('physicalinterface'))
+        self.assertIsNone(bulk_tool.get_csv_column_types('unknowntype'))
+        self.assertEqual(client.spec_requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
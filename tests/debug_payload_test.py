@@ -0,0 +1,60 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import logging
+import os
+import tempfile
+import unittest
+from ftd_api.debug_payload import PayloadDebugger
+from ftd_api.debug_payload import _LazyPayload
+
+
+class FakeResponse:
+
+    def __init__(self, content, content_type='application/json'):
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+
+
+class TestDebugPayload(unittest.TestCase):
+
+    def test_lazy_payload_rendering(self):
+        small = json.dumps({'b': 1, 'a': 2})
+        self.assertEqual(str(_LazyPayload(small, 'application/json', 100)),
+                         json.dumps({'a': 2, 'b': 1}, indent=3, sort_keys=True))
+        large = json.dumps({'items': ['x' * 10] * 100})
+        rendered = str(_LazyPayload(large, 'application/json', 50))
+        self.assertTrue(rendered.startswith(large[:50]))
+        self.assertIn(f'[truncated {len(large) - 50} of {len(large)} bytes]', rendered)
+        # No cap renders the whole document
+        self.assertIn('"items"', str(_LazyPayload(large, 'application/json', 0)))
+        self.assertEqual(str(_LazyPayload('--boundary\r\n...', 'multipart/form-data; boundary=x', 50)),
+                         '<15 bytes multipart/form-data; boundary=x not rendered>')
+        self.assertEqual(str(_LazyPayload(b'not json', 'application/json', 50)), 'not json')
+
+    def test_sampling(self):
+        debugger = PayloadDebugger(sample_rate=0.25)
+        samples = [debugger.should_sample() for _ in range(8)]
+        self.assertEqual(samples, [False, False, False, True] * 2)
+        self.assertFalse(any(PayloadDebugger(sample_rate=0.0).should_sample() for _ in range(10)))
+
+    def test_dump_directory(self):
+        with tempfile.TemporaryDirectory() as dump_directory:
+            debugger = PayloadDebugger(max_size=10, dump_directory=dump_directory)
+            body = json.dumps({'name': 'x' * 100})
+            url = 'https://ftd:443/api/fdm/latest/object/networks'
+            with self.assertLogs(level=logging.DEBUG) as logs:
+                sequence = debugger.log_request('POST', url, {'Content-Type': 'application/json'}, body)
+                debugger.log_response(sequence, 'POST', url, FakeResponse(body.encode()))
+            self.assertIn('[truncated', logs.output[1])
+            self.assertEqual(sorted(os.listdir(dump_directory)),
+                             ['000001_POST_object_networks_request.json', '000001_POST_object_networks_response.json'])
+            with open(os.path.join(dump_directory, '000001_POST_object_networks_response.json')) as file_handle:
+                self.assertEqual(file_handle.read(), body)
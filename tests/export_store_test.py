@@ -0,0 +1,70 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import os.path
+import tempfile
+import unittest
+from ftd_api.export_store import ExportStore
+from record_fixtures import identity_record
+
+
+def _network(object_id, name, value, sub_type='NETWORK', version='v1'):
+    return identity_record('networkobject', object_id, name, value=value, subType=sub_type, version=version)
+
+
+class TestExportStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store = ExportStore(os.path.join(self.temp_dir.name, 'store.db'))
+        self.object_list = [
+            {'type': 'metadata', 'name': 'export'},
+            _network('n1', 'inside', '10.1.0.0/16'),
+            _network('n2', 'host', '10.2.3.4', sub_type='HOST'),
+            _network('n3', 'outside', '192.168.1.0/24'),
+            _network('n4', 'range', '10.0.0.1-10.0.0.9', sub_type='RANGE'),
+            _network('n5', 'v6', '2001:db8::/32')
+        ]
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_upsert(self):
+        counts = self.store.upsert_records('ftd1', self.object_list, export_type='FULL_EXPORT')
+        self.assertEqual(counts, {'inserted': 5, 'updated': 0, 'unchanged': 0, 'removed': 0})
+
+        object_list = self.object_list[:3] + [_network('n3', 'outside', '192.168.2.0/24', version='v2')]
+        counts = self.store.upsert_records('ftd1', object_list, prune=True)
+        self.assertEqual(counts, {'inserted': 0, 'updated': 1, 'unchanged': 2, 'removed': 2})
+        result = self.store.query(device='ftd1', name='outside')
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['version'], 'v2')
+        self.assertEqual(result[0]['data']['value'], '192.168.2.0/24')
+        self.assertEqual(len(self.store.get_export_history('ftd1')), 2)
+
+    def test_query(self):
+        self.store.upsert_records('ftd1', self.object_list)
+        self.store.upsert_records('ftd2', self.object_list[:2])
+        self.assertEqual(self.store.get_device_list(), ['ftd1', 'ftd2'])
+        self.assertEqual(self.store.get_devices_with_object(object_id='n1'), ['ftd1', 'ftd2'])
+        self.assertEqual(self.store.get_devices_with_object(object_type='networkobject', name='host'), ['ftd1'])
+        self.assertEqual([x['id'] for x in self.store.query(device='ftd1', name=['inside', 'range'])], ['n1', 'n4'])
+        self.assertEqual([x['name'] for x in self.store.query(name_like='ins%')], ['inside', 'inside'])
+        self.assertEqual(len(self.store.query(limit=2)), 2)
+
+    def test_query_subnet(self):
+        self.store.upsert_records('ftd1', self.object_list)
+        result = self.store.query_subnet('10.0.0.0/8')
+        self.assertEqual(sorted(x['id'] for x in result), ['n1', 'n2', 'n4'])
+        self.assertEqual([x['id'] for x in self.store.query_subnet('2001:db8::/16')], ['n5'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os
+import tempfile
+import unittest
+import ftd_api.fleet as fleet
+from ftd_api.tracing import Tracer
+
+
+class FakeClient:
+
+    def logout(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeBulkTool:
+
+    def __init__(self, device):
+        self.client = FakeClient()
+        self.tracer = Tracer()
+        self.device = device
+
+    def bulk_export(self, destination_directory, export_store=None, device_name=None, **export_args):
+        if self.device['address'] == 'bad.example.com':
+            raise Exception('Unable to connect')
+        return {'directory': destination_directory, 'export_store': export_store, 'device_name': device_name}
+
+    def url_export(self, url, destination_directory, **export_args):
+        return {'url': url, 'directory': destination_directory, 'output_format': export_args['output_format']}
+
+
+class FakeFleetExecutor(fleet.FleetExecutor):
+
+    def _create_bulk_tool(self, device):
+        return FakeBulkTool(device)
+
+
+class TestFleet(unittest.TestCase):
+
+    def test_read_inventory_and_export(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            with open(f'{temp_directory}/ftd1.prop', 'w') as file_handle:
+                file_handle.write('address=ftd1.example.com\nusername=admin\n')
+            with open(f'{temp_directory}/bad.prop', 'w') as file_handle:
+                file_handle.write('address=bad.example.com\nport=8443\n')
+            with open(f'{temp_directory}/inventory.txt', 'w') as file_handle:
+                file_handle.write('# lab devices\nftd1.prop\n\nbad.prop\n')
+
+            device_list = fleet.read_inventory(f'{temp_directory}/inventory.txt')
+            self.assertEqual([fleet.get_device_name(x) for x in device_list],
+                             ['ftd1.example.com', 'bad.example.com_8443'])
+
+            summary_list = FakeFleetExecutor(device_list, max_workers=2).bulk_export(temp_directory, export_store='store')
+            self.assertEqual([x['status'] for x in summary_list], ['SUCCESS', 'FAILED'])
+            self.assertEqual(summary_list[0]['result'], {'directory': os.path.normpath(f'{temp_directory}/ftd1.example.com'),
+                                                         'export_store': 'store', 'device_name': 'ftd1.example.com'})
+            self.assertTrue(os.path.isdir(summary_list[0]['result']['directory']))
+            self.assertEqual(summary_list[1]['error'], 'Unable to connect')
+            with open(f'{temp_directory}/{fleet.FLEET_SUMMARY_FILE}') as file_handle:
+                self.assertEqual(json.load(file_handle), summary_list)
+
+            summary_list = FakeFleetExecutor(device_list[:1]).bulk_export(temp_directory, url='/object/networks',
+                                                                          output_format='CSV')
+            self.assertEqual(summary_list[0]['result'], {'url': '/object/networks', 'output_format': 'CSV',
+                                                         'directory': os.path.normpath(f'{temp_directory}/ftd1.example.com')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import concurrent.futures
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+from ftd_api.concurrency import AdaptiveConcurrencyLimiter
+from ftd_api.ftd_client import FTDClient
+from ftd_api.token_cache import TokenCache
+
+OBJECT_COUNT = 250
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    http.server.ThreadingHTTPServer needs Python 3.7
+    """
+    daemon_threads = True
+
+
+class StubFTDHandler(BaseHTTPRequestHandler):
+    """
+    Minimal FDM stand in serving the token call and a paged object list
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status_code, body):
+        content = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self):
+        content = self.rfile.read(int(self.headers['Content-Length']))
+        if not self.path.endswith('/fdm/token'):
+            self._send_json(200, {'received': len(content), 'name': json.loads(content.decode('utf-8'))['name']})
+            return
+        request = json.loads(content)
+        if request['grant_type'] == 'password':
+            with self.server.lock:
+                self.server.login_count += 1
+                self.server.valid_token = f'token{self.server.login_count}'
+            self._send_json(200, {'access_token': self.server.valid_token, 'expires_in': 1800})
+        else:
+            self._send_json(200, {})
+
+    def do_GET(self):
+        if self.headers['Authorization'] != f'Bearer {self.server.valid_token}':
+            self._send_json(401, {'error': 'invalid token'})
+            return
+        with self.server.lock:
+            self.server.get_paths.append(self.path)
+        query = parse_qs(urlsplit(self.path).query)
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['100'])[0])
+        items = [{'id': str(x), 'type': 'networkobject'} for x in range(offset, min(offset + limit, OBJECT_COUNT))]
+        self._send_json(200, {'items': items, 'paging': {'count': OBJECT_COUNT}})
+
+
+class TestFTDClientThreadSafety(unittest.TestCase):
+
+    def setUp(self):
+        self.server = _ThreadingHTTPServer(('127.0.0.1', 0), StubFTDHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.login_count = 0
+        self.server.valid_token = None
+        self.server.get_paths = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_bytes_sent(self):
+        client = FTDClient(address='127.0.0.1', port=self.server.server_address[1], scheme='http')
+        client.login()
+        body = json.dumps({'name': 'réseau ✓'}, ensure_ascii=False)
+        response = client.do_post_raw_with_base_url('/object/networks', body)
+        client.close()
+        self.assertEqual(response.json(), {'received': len(body.encode('utf-8')), 'name': 'réseau ✓'})
+        request_stats = [x for x in client.metrics.to_dict()['requests'] if x['method'] == 'POST']
+        self.assertEqual(request_stats[0]['bytes_sent'], len(body.encode('utf-8')))
+
+    def test_multi_page_query(self):
+        client = FTDClient(address='127.0.0.1', port=self.server.server_address[1], scheme='http')
+        client.login()
+        fetch_list = [
+            ({}, 'limit=250&offset=0'),
+            ({'filter_expression': 'name:out side'}, 'limit=250&offset=0&filter=name%3Aout+side'),
+            ({'fields': ['id', 'name', 'id']}, 'limit=250&offset=0&fields=id%2Cname%2CisSystemDefined'),
+            ({'fields': ['id'], 'filter_system_defined': False}, 'limit=250&offset=0&fields=id'),
+            ({'fields': ['id'], 'push_down_fields': False}, 'limit=250&offset=0'),
+            ({'filter_expression': 'name:a', 'fields': ['id']},
+             'limit=250&offset=0&filter=name%3Aa&fields=id%2CisSystemDefined')
+        ]
+        for kwargs, expected_query in fetch_list:
+            client.do_get_multi_page('/object/networks', limit=OBJECT_COUNT, **kwargs)
+        # query parameters already in the URL are kept
+        client.do_get_multi_page('/object/networks?sort=name', limit=OBJECT_COUNT, fields=['id'])
+        client.close()
+        self.assertTrue(all(urlsplit(x).path.endswith('/object/networks') for x in self.server.get_paths))
+        self.assertEqual([urlsplit(x).query for x in self.server.get_paths],
+                         [x[1] for x in fetch_list] + ['sort=name&limit=250&offset=0&fields=id%2CisSystemDefined'])
+
+    def test_shared_client_stress(self):
+        client = FTDClient(address='127.0.0.1',
+                           port=self.server.server_address[1],
+                           scheme='http',
+                           token_cache=TokenCache(os.path.join(self.directory.name, 'tokens.json')),
+                           concurrency_limiter=AdaptiveConcurrencyLimiter(initial_limit=16, max_limit=16))
+        client.login()
+        client.headers['X-Test'] = 'instance only'
+        self.assertNotIn('X-Test', FTDClient.headers)
+        # The device forgets the token, every thread sees its first request rejected
+        self.server.valid_token = 'restarted'
+
+        def fetch_all(_):
+            return [x['id'] for x in client.do_get_multi_page('/object/networks', limit=40)]
+
+        thread_count = 16
+        with concurrent.futures.ThreadPoolExecutor(max_workers=thread_count) as executor:
+            results = list(executor.map(fetch_all, range(thread_count * 5)))
+        client.close()
+
+        expected_ids = [str(x) for x in range(OBJECT_COUNT)]
+        self.assertTrue(all(x == expected_ids for x in results))
+        # Only one thread logged in again to replace the rejected token
+        self.assertEqual(self.server.login_count, 2)
+        self.assertEqual(client.get_access_token(), 'token2')
+        self.assertLessEqual(client.metrics.to_dict()['requests'][0]['status']['401'], thread_count)
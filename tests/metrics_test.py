@@ -0,0 +1,49 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import unittest
+from ftd_api.metrics import MetricsRegistry
+from ftd_api.metrics import normalize_endpoint
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_normalize_endpoint(self):
+        self.assertEqual(normalize_endpoint('https://ftd:443/api/fdm/latest/object/networks?limit=10&offset=20'),
+                         '/object/networks')
+        self.assertEqual(normalize_endpoint('https://ftd:443/api/fdm/v4/jobs/configimportstatus/5fe01234-6ebe-11ea-b045-eb1040fc6650'),
+                         '/jobs/configimportstatus/{id}')
+        self.assertEqual(normalize_endpoint('https://ftd:443/apispec/ngfw.json'), '/apispec/ngfw.json')
+
+    def test_registry_output(self):
+        registry = MetricsRegistry()
+        registry.record_request('GET', 'https://ftd/api/fdm/latest/object/networks?offset=0', 200, 0, 1000, 0.2)
+        registry.record_request('GET', 'https://ftd/api/fdm/latest/object/networks?offset=100', 423, 0, 50, 3.0)
+        registry.record_job('configexport', 1.5, 10.0, 'SUCCESS')
+        registry.record_phase('export_conversion', 0.5)
+
+        metrics_dict = json.loads(registry.to_json())
+        request_metrics = metrics_dict['requests'][0]
+        self.assertEqual(request_metrics['endpoint'], '/object/networks')
+        self.assertEqual(request_metrics['status'], {'200': 1, '423': 1})
+        self.assertEqual(request_metrics['bytes_received'], 1050)
+        self.assertEqual(request_metrics['latency_seconds']['count'], 2)
+        self.assertEqual(request_metrics['latency_seconds']['buckets']['0.25'], 1)
+        self.assertEqual(metrics_dict['job_status'], {'configexport': {'SUCCESS': 1}})
+
+        prometheus_text = registry.to_prometheus()
+        self.assertIn('ftd_api_requests_total{method="GET",endpoint="/object/networks",status="423"} 1', prometheus_text)
+        self.assertIn('ftd_api_request_duration_seconds_bucket{method="GET",endpoint="/object/networks",le="+Inf"} 2', prometheus_text)
+        self.assertIn('ftd_api_job_duration_seconds_sum{job="configexport",phase="in_progress"} 10.0', prometheus_text)
+        self.assertIn('ftd_api_phase_duration_seconds_count{phase="export_conversion"} 1', prometheus_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
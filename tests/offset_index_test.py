@@ -0,0 +1,74 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os
+import os.path
+import tempfile
+import unittest
+from ftd_api.offset_index import OffsetIndex
+from ftd_api.offset_index import scan_array_records
+
+
+class TestOffsetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.temp_dir.name, 'full_config.txt')
+        self.object_list = [{'type': 'metadata', 'name': 'export'}]
+        for number in range(50):
+            self.object_list.append({'action': 'CREATE', 'type': 'identitywrapper', 'data': {
+                'type': 'networkobject', 'id': f'id{number}', 'name': f'net "{number}" [x]{{',
+                'value': f'10.0.{number}.0/24', 'tags': [{'a': '}'}]}})
+        self._write(self.object_list)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, object_list):
+        with open(self.json_file, 'w') as file_handle:
+            file_handle.write(json.dumps(object_list, indent=3))
+
+    def test_scan(self):
+        data = b' [ {"a": "}\\"{"}, [1, {"b": 2}], {"c": {"d": []}} ] '
+        record_list = [json.loads(data[offset:offset + length]) for offset, length in scan_array_records(data)]
+        self.assertEqual(record_list, [{'a': '}"{'}, {'c': {'d': []}}])
+
+    def test_lookup(self):
+        with OffsetIndex(self.json_file) as index:
+            self.assertTrue(index.rebuilt)
+            self.assertEqual(len(index), 51)
+            self.assertIn('id7', index)
+            self.assertEqual(index.get_by_id('id7'), self.object_list[8])
+            self.assertEqual(index.get_by_type_name('networkobject', 'net "3" [x]{'), self.object_list[4])
+            self.assertIsNone(index.get_by_id('missing'))
+            self.assertEqual(len(list(index.get_records_by_type('networkobject'))), 50)
+            self.assertEqual(json.loads(index.get_raw('id0')), self.object_list[1])
+        self.assertTrue(os.path.isfile(self.json_file + '.idx.json'))
+
+        with OffsetIndex(self.json_file) as index:
+            self.assertFalse(index.rebuilt)
+            self.assertEqual(index.get_by_id('id49'), self.object_list[50])
+
+    def test_invalidation(self):
+        OffsetIndex(self.json_file).close()
+        # Touched but unchanged keeps the index
+        os.utime(self.json_file, ns=(1, 1))
+        with OffsetIndex(self.json_file) as index:
+            self.assertFalse(index.rebuilt)
+
+        self.object_list[5]['data']['value'] = '192.168.0.0/16'
+        self._write(self.object_list)
+        with OffsetIndex(self.json_file) as index:
+            self.assertTrue(index.rebuilt)
+            self.assertEqual(index.get_by_id('id4')['data']['value'], '192.168.0.0/16')
+
+
+if __name__ == '__main__':
+    unittest.main()
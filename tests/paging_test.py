@@ -0,0 +1,58 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import unittest
+from ftd_api.paging import AdaptivePageSizer
+
+URL = '/object/networks'
+
+
+def simulate(sizer, seconds_for_limit, page_count=20):
+    """
+    Request full pages where the latency of a page is given by seconds_for_limit(limit)
+    """
+    for _ in range(page_count):
+        limit = sizer.get_limit(URL)
+        sizer.record_page(URL, limit, limit, seconds_for_limit(limit), limit * 100)
+    return sizer.get_state()['/object/networks']
+
+
+class TestAdaptivePageSizer(unittest.TestCase):
+
+    def test_grows_to_best_rate(self):
+        # Fixed per request overhead, throughput peaks at 4000 then the device slows down
+        state = simulate(AdaptivePageSizer(initial_limit=1000, max_limit=16000),
+                         lambda limit: 0.5 + limit * 0.0001 + (max(0, limit - 4000) * 0.001))
+        self.assertTrue(state['settled'])
+        self.assertEqual(state['limit'], 4000)
+
+    def test_shrinks_when_large_pages_are_slow(self):
+        # Cost grows faster than linear so smaller pages are better down to the minimum
+        state = simulate(AdaptivePageSizer(initial_limit=1000, min_limit=100),
+                         lambda limit: (limit / 100.0) ** 2)
+        self.assertTrue(state['settled'])
+        self.assertEqual(state['limit'], 100)
+
+    def test_device_cap_and_last_page(self):
+        sizer = AdaptivePageSizer(initial_limit=1000)
+        # Short last page is ignored
+        sizer.record_page(URL, 1000, 10, 0.1, 1000, last_page=True)
+        self.assertEqual(sizer.get_limit(URL), 1000)
+        # Short page in the middle of the collection means the device caps the page size
+        sizer.record_page(URL, 1000, 500, 0.1, 1000)
+        self.assertEqual(sizer.get_limit(URL), 500)
+        self.assertTrue(sizer.get_state()['/object/networks']['settled'])
+        # Other endpoints are tuned separately
+        self.assertEqual(sizer.get_limit('/object/ports'), 1000)
+
+    def test_page_bytes_bound(self):
+        sizer = AdaptivePageSizer(initial_limit=1000, max_page_bytes=50000)
+        sizer.record_page(URL, 1000, 1000, 1.0, 100000)
+        # Not grown, tries smaller pages instead
+        self.assertEqual(sizer.get_limit(URL), 500)
@@ -122,6 +122,13 @@ class TestParseMethods(unittest.TestCase):
         self.assertTrue(type(parsed_list[2]['number']) == int)
         self.assertTrue(type(parsed_list[2]['string']) == str)
 
+    def test_parse_field_name(self):
+        self.assertEqual(parse_csv.parse_field_name('data.ports[0].port(int)'), ('data.ports[0].port', int))
+        self.assertEqual(parse_csv.parse_field_name('ratio(float)'), ('ratio', float))
+        self.assertEqual(parse_csv.parse_field_name('name'), ('name', None))
+        with self.assertRaises(NotImplementedError):
+            parse_csv.parse_field_name('name(date)')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,6 +9,7 @@ Created: Dec 18, 2019
 '''
 import json
 import os.path
+import tempfile
 import unittest
 import ftd_api.parse_csv as parse_csv
 import ftd_api.parse_json as parse_json
@@ -74,6 +75,62 @@ class TestParseMethods(unittest.TestCase):
             f'{self.dirpath}/outputfile.csv')
         self.assertEqual(parsed_object_list, parsed_csv_list)
 
+    def test_stream_writers_match_batch_output(self):
+        with open(f'{self.dirpath}/sample_json.json', encoding='utf-8-sig') as jsonfile:
+            parsed_object_list = json.load(jsonfile)
+        with tempfile.TemporaryDirectory() as temp_directory:
+            with parse_json.JsonArrayStreamWriter(f'{temp_directory}/stream.json') as writer:
+                for obj in parsed_object_list:
+                    writer.write(obj)
+            with open(f'{temp_directory}/stream.json') as file_handle:
+                self.assertEqual(file_handle.read(), json.dumps(parsed_object_list, indent=3, sort_keys=True))
+
+            parse_json.dict_list_to_csv(parsed_object_list, f'{temp_directory}/batch.csv')
+            with parse_json.CsvStreamWriter(f'{temp_directory}/stream.csv') as writer:
+                for obj in parsed_object_list:
+                    writer.write(obj)
+            with open(f'{temp_directory}/batch.csv') as batch_handle, open(f'{temp_directory}/stream.csv') as stream_handle:
+                self.assertEqual(stream_handle.read(), batch_handle.read())
+
+    def test_project_dict(self):
+        field_tree = parse_json.compile_field_list(['id', 'name', 'networks.name', 'meta', 'meta.x'])
+        self.assertEqual(field_tree, {'id': None, 'name': None, 'networks': {'name': None}, 'meta': None})
+        obj = {
+            'id': '1',
+            'name': 'group',
+            'description': 'dropped',
+            'networks': [{'id': '2', 'name': 'a', 'type': 'networkobject'}, {'id': '3', 'name': 'b'}],
+            'meta': {'x': 1, 'y': 2}
+        }
+        self.assertEqual(parse_json.project_dict(obj, field_tree), {
+            'id': '1',
+            'name': 'group',
+            'networks': [{'name': 'a'}, {'name': 'b'}],
+            'meta': {'x': 1, 'y': 2}
+        })
+        self.assertEqual(parse_json.project_dict({'id': '1'}, field_tree), {'id': '1'})
+
+    def test_csv_column_types(self):
+        dict_list = [{'mixed': 1, 'port': 80, 'ratio': 0.5, 'enabled': True, 'name': 'a', 'optional': 3},
+                     {'mixed': 'x', 'port': 443, 'ratio': 2.0, 'enabled': False, 'name': 'b', 'optional': None}]
+        csv_file = os.path.join(tempfile.mkdtemp(), 'types.csv')
+        parse_json.dict_list_to_csv(dict_list, csv_file)
+        with open(csv_file) as file_handle:
+            header = file_handle.readline().strip()
+        self.assertEqual(header, 'enabled(bool),mixed,name,optional(int),port(int),ratio(float)')
+        parsed_list = parse_csv.parse_csv_to_dict(csv_file)
+        # A column with values of different types is written as a string column
+        self.assertEqual(parsed_list[0], dict(dict_list[0], mixed='1'))
+        self.assertEqual(parsed_list[1], {'mixed': 'x', 'port': 443, 'ratio': 2.0, 'enabled': False, 'name': 'b'})
+
+        # Types taken from a column type table, list positions written as []
+        dict_list = [{'data': {'ports': [{'port': 1}, {'port': 2}], 'mtu': '1500', 'mode': 'ROUTED'}}]
+        parse_json.dict_list_to_csv(dict_list, csv_file, fieldname_to_type={
+            'data.ports[].port': 'int', 'data.mtu': 'int', 'data.mode': 'str'})
+        with open(csv_file) as file_handle:
+            header = file_handle.readline().strip()
+        self.assertEqual(header, 'data.mode,data.mtu(int),data.ports[0].port(int),data.ports[1].port(int)')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,42 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os.path
+import tempfile
+import unittest
+import ftd_api.parse_ndjson as parse_ndjson
+
+
+class TestParseNdjson(unittest.TestCase):
+
+    dirpath = os.path.dirname(os.path.realpath(__file__))
+
+    def test_ndjson_round_trip_and_append(self):
+        with open(f'{self.dirpath}/sample_json.json', encoding='utf-8-sig') as jsonfile:
+            object_list = json.load(jsonfile)
+        with tempfile.TemporaryDirectory() as temp_directory:
+            ndjson_file = f'{temp_directory}/export.ndjson'
+            self.assertEqual(parse_ndjson.write_dict_list_to_ndjson_file(ndjson_file, iter(object_list)), len(object_list))
+            parse_ndjson.write_dict_list_to_ndjson_file(ndjson_file, object_list[:1], append=True)
+            with open(ndjson_file) as file_handle:
+                self.assertEqual(len(file_handle.readlines()), len(object_list) + 1)
+            self.assertEqual(list(parse_ndjson.read_ndjson_file(ndjson_file)), object_list + object_list[:1])
+
+    def test_ndjson_bad_line(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            ndjson_file = f'{temp_directory}/bad.ndjson'
+            with open(ndjson_file, 'w') as file_handle:
+                file_handle.write('{"a": 1}\n\n{"a": \n')
+            with self.assertRaises(ValueError):
+                list(parse_ndjson.read_ndjson_file(ndjson_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os.path
+import tempfile
+import unittest
+import ftd_api.parse_yaml as parse_yaml
+
+
+class TestParseYaml(unittest.TestCase):
+
+    dirpath = os.path.dirname(os.path.realpath(__file__))
+
+    def _load_sample(self):
+        with open(f'{self.dirpath}/sample_json.json', encoding='utf-8-sig') as jsonfile:
+            return json.load(jsonfile)
+
+    def test_yaml_round_trip_without_aliases(self):
+        shared = {'id': 'abc', 'type': 'networkobject'}
+        object_list = self._load_sample() + [{'ref1': shared, 'ref2': shared}]
+        with tempfile.TemporaryDirectory() as temp_directory:
+            yaml_file = f'{temp_directory}/export.yaml'
+            parse_yaml.write_dict_to_yaml_file(yaml_file, object_list)
+            with open(yaml_file) as file_handle:
+                self.assertNotIn('&id', file_handle.read())
+            self.assertEqual(parse_yaml.read_yaml_to_dict(yaml_file), object_list)
+
+    def test_yaml_stream_round_trip(self):
+        object_list = self._load_sample()
+        with tempfile.TemporaryDirectory() as temp_directory:
+            yaml_file = f'{temp_directory}/export.yaml'
+            parse_yaml.write_dict_list_to_yaml_stream(yaml_file, iter(object_list))
+            with open(yaml_file) as file_handle:
+                self.assertEqual(file_handle.read().count('---'), len(object_list))
+            self.assertEqual(list(parse_yaml.read_yaml_stream(yaml_file)), object_list)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+
+
+def identity_record(object_type, object_id, name=None, action='CREATE', **fields):
+    """
+    Return an identitywrapper export/import record, the name defaults to the id and any
+    further keyword arguments are added to the data block
+    """
+    data = {'type': object_type, 'id': object_id, 'name': name if name is not None else object_id}
+    data.update(fields)
+    return {'action': action, 'type': 'identitywrapper', 'data': data}
+
+
+def reference_to(record):
+    """
+    Return an {id, type, name} reference to the object of a record
+    """
+    return {'id': record['data']['id'], 'type': record['data']['type'], 'name': record['data']['name']}
@@ -0,0 +1,83 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import unittest
+from ftd_api.reference_graph import ReferenceGraph
+from ftd_api.reference_graph import extract_references
+from record_fixtures import identity_record
+from record_fixtures import reference_to
+
+
+class TestReferenceGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.metadata = {'type': 'metadata', 'name': 'export'}
+        self.net1 = identity_record('networkobject', 'n1', 'net1', value='10.0.0.0/8')
+        self.net2 = identity_record('networkobject', 'n2', 'net2', value='10.1.0.0/16')
+        self.unused = identity_record('networkobject', 'n3', 'unused', value='10.2.0.0/16')
+        self.group = identity_record('networkobjectgroup', 'g1', 'group', objects=[reference_to(self.net1), reference_to(self.net2)])
+        # references the group by name only and a port object that is not in the list
+        self.rule = identity_record('accessrule', 'r1', 'rule',
+                            sourceNetworks=[{'type': 'networkobjectgroup', 'name': 'group'}],
+                            destinationPorts=[{'id': 'p9', 'type': 'tcpportobject', 'name': 'https'}],
+                            ruleAction='PERMIT', logging={'type': 'embedded', 'value': 'x', 'extra': 1})
+        # two groups referencing each other
+        self.cycle_a = identity_record('networkobjectgroup', 'ca', 'cycle_a', objects=[{'id': 'cb', 'type': 'networkobjectgroup'}])
+        self.cycle_b = identity_record('networkobjectgroup', 'cb', 'cycle_b', objects=[{'id': 'ca', 'type': 'networkobjectgroup'}])
+        self.object_list = [self.metadata, self.rule, self.group, self.cycle_a, self.net1, self.cycle_b,
+                            self.net2, self.unused]
+
+    def test_extract_references(self):
+        reference_list = extract_references(self.rule['data'])
+        self.assertEqual([x[0] for x in reference_list], ['sourceNetworks[0]', 'destinationPorts[0]'])
+
+    def test_dangling_and_unused(self):
+        graph = ReferenceGraph(self.object_list)
+        dangling = graph.get_dangling_references()
+        self.assertEqual(len(dangling), 1)
+        self.assertEqual(dangling[0]['source'], 'r1')
+        self.assertEqual(dangling[0]['reference']['id'], 'p9')
+        self.assertEqual(graph.dependencies['r1'], ['g1'])
+        self.assertEqual(graph.get_unused_objects(), [self.rule, self.unused])
+        self.assertEqual(graph.get_unused_objects(type_list=['networkobject']), [self.unused])
+
+    def test_topological_order(self):
+        graph = ReferenceGraph(self.object_list)
+        order = [x['data']['id'] for x in graph.topological_order()]
+        for dependent, dependency in (('r1', 'g1'), ('g1', 'n1'), ('g1', 'n2')):
+            self.assertLess(order.index(dependency), order.index(dependent))
+        self.assertEqual(graph.get_cycles(), [['ca', 'cb']])
+        self.assertEqual([x['data']['id'] for x in graph.get_closure(['r1'])], ['n1', 'n2', 'g1', 'r1'])
+
+    def test_import_plan(self):
+        delete = identity_record('networkobject', 'n1', 'net1', action='DELETE')
+        graph = ReferenceGraph(self.object_list + [delete])
+        chunk_list = graph.get_import_plan(2)
+        self.assertIs(chunk_list[0][0], self.metadata)
+        flat = [x for chunk in chunk_list for x in chunk]
+        self.assertEqual(len(flat), len(self.object_list) + 1)
+        self.assertIs(flat[flat.index(self.net1) + 1], delete)
+        # the cycle is never split over chunks
+        self.assertTrue(any(self.cycle_a in x and self.cycle_b in x for x in chunk_list))
+        position = {id(x): index for index, chunk in enumerate(chunk_list) for x in chunk}
+        self.assertLessEqual(position[id(self.group)], position[id(self.rule)])
+        self.assertLessEqual(position[id(self.net1)], position[id(self.group)])
+
+    def test_import_plan_recreate(self):
+        delete = identity_record('networkobject', 'n1', 'net1', action='DELETE')
+        create = identity_record('networkobject', 'n1', 'net1')
+        group = identity_record('networkobjectgroup', 'g1', 'group', objects=[reference_to(create)])
+        delete_only = identity_record('networkobject', 'n2', 'net2', action='DELETE')
+        graph = ReferenceGraph([delete, create, group, delete_only])
+        self.assertEqual(graph.get_import_plan(1), [[delete, create], [group], [delete_only]])
+        self.assertEqual(graph.get_import_plan(10), [[delete, create, group, delete_only]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import os.path
+import tempfile
+import unittest
+from ftd_api.bulk_tool import BulkTool
+from ftd_api.compact import CompactLoader
+from ftd_api.reference_resolver import find_unresolved_references
+from ftd_api.tracing import Tracer
+
+OPENAPI_DICT = {
+    'paths': {
+        '/object/networks/{objId}': {'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/NetworkObject'}}}}},
+        '/object/securityzones/{objId}': {'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/SecurityZone'}}}}},
+        '/policy/accesspolicies/{parentId}/accessrules/{objId}': {
+            'get': {'responses': {'200': {'schema': {'$ref': '#/definitions/AccessRule'}}}}}
+    }
+}
+
+
+class FakeClient:
+
+    def __init__(self, collections):
+        self.tracer = Tracer()
+        self.collections = collections
+        self.requested_urls = []
+        self.push_down_fields = []
+
+    def get_address_and_port_string(self):
+        return 'ftd1:443'
+
+    def get_openapi_spec(self):
+        return OPENAPI_DICT
+
+    def do_get_multi_page(self, url, filter_system_defined=True, fields=None, push_down_fields=True):
+        self.requested_urls.append(url)
+        self.push_down_fields.append(push_down_fields)
+        return [{key: x[key] for key in fields} for x in self.collections.get(url, [])]
+
+
+def _rule(name, zone_name, network_name):
+    return {'action': 'CREATE', 'type': 'identitywrapper', 'data': {
+        'type': 'accessrule', 'name': name,
+        'sourceZones': [{'type': 'securityzone', 'name': zone_name, 'id': ''}],
+        'sourceNetworks': [{'type': 'networkobject', 'name': network_name}],
+        'destinationNetworks': [{'type': 'networkobject', 'name': 'known', 'id': 'n0'}]}}
+
+
+class TestReferenceResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.collections = {
+            '/object/securityzones': [{'id': 'z1', 'name': 'inside', 'type': 'securityzone', 'interfaces': []}],
+            '/object/networks': [{'id': 'n1', 'name': 'net1', 'type': 'networkobject', 'value': '10.0.0.0/8'}]
+        }
+        self.client = FakeClient(self.collections)
+        self.bulk_tool = BulkTool(self.client)
+
+    def _get_object_list(self):
+        return [_rule('rule1', 'inside', 'net1'),
+                _rule('rule2', 'inside', 'new_net'),
+                _rule('rule3', 'missing', 'net1'),
+                {'action': 'CREATE', 'type': 'identitywrapper',
+                 'data': {'type': 'networkobject', 'name': 'new_net', 'id': 'n2', 'value': '10.1.0.0/16'}}]
+
+    def test_resolve(self):
+        object_list = self._get_object_list()
+        self.assertEqual(len(find_unresolved_references(object_list)), 6)
+        stats = self.bulk_tool.get_reference_resolver().resolve(object_list)
+        self.assertEqual(stats, {'resolved': 5, 'unresolved': 1, 'fetched_types': ['networkobject', 'securityzone']})
+        self.assertEqual(object_list[0]['data']['sourceZones'][0]['id'], 'z1')
+        self.assertEqual(object_list[0]['data']['sourceNetworks'][0]['id'], 'n1')
+        # resolved from the import itself
+        self.assertEqual(object_list[1]['data']['sourceNetworks'][0]['id'], 'n2')
+        self.assertEqual(object_list[2]['data']['sourceZones'][0]['id'], '')
+        self.assertEqual(sorted(self.client.requested_urls), ['/object/networks', '/object/securityzones'])
+
+        # the session keeps the maps
+        self.bulk_tool.get_reference_resolver().resolve(self._get_object_list())
+        self.assertEqual(len(self.client.requested_urls), 2)
+
+    def test_local_projection(self):
+        resolver = self.bulk_tool.get_reference_resolver(push_down_fields=False)
+        resolver.resolve([_rule('rule1', 'inside', 'net1')])
+        self.assertEqual(self.client.push_down_fields, [False, False])
+        self.assertIs(self.bulk_tool.get_reference_resolver(push_down_fields=False), resolver)
+        self.assertIsNot(self.bulk_tool.get_reference_resolver(), resolver)
+
+    def test_compact_shared_references(self):
+        object_list = CompactLoader().loads(json.dumps([_rule('rule1', 'inside', 'net1'), _rule('rule2', 'inside', 'net1')]))
+        self.bulk_tool.get_reference_resolver().resolve(object_list)
+        zone_list = [x['data']['sourceZones'][0] for x in object_list]
+        self.assertEqual(zone_list[0]['id'], 'z1')
+        self.assertIs(zone_list[0], zone_list[1])
+
+    def test_cache_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = os.path.join(temp_dir, 'references.json')
+            BulkTool(self.client).get_reference_resolver(cache_file=cache_file).resolve(self._get_object_list())
+            self.assertEqual(len(self.client.requested_urls), 2)
+
+            client = FakeClient(self.collections)
+            BulkTool(client).get_reference_resolver(cache_file=cache_file).resolve([_rule('rule1', 'inside', 'net1')])
+            self.assertEqual(client.requested_urls, [])
+
+            # a name missing from the cached map fetches the type again
+            self.collections['/object/networks'].append({'id': 'n3', 'name': 'net3', 'type': 'networkobject'})
+            object_list = [_rule('rule1', 'inside', 'net3')]
+            BulkTool(client).get_reference_resolver(cache_file=cache_file).resolve(object_list)
+            self.assertEqual(client.requested_urls, ['/object/networks'])
+            self.assertEqual(object_list[0]['data']['sourceNetworks'][0]['id'], 'n3')
+
+
+if __name__ == '__main__':
+    unittest.main()
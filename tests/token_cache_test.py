@@ -0,0 +1,99 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from ftd_api.ftd_client import FTDClient
+from ftd_api.token_cache import TokenCache
+from ftd_api.token_cache import get_token_key
+
+
+class FakeResponse:
+
+    def __init__(self, status_code, json_body=None):
+        self.status_code = status_code
+        self.json_body = json_body
+        self.headers = {'Content-Type': 'application/json'}
+        self.content = b'{}'
+
+    def json(self):
+        return self.json_body
+
+    def close(self):
+        pass
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.directory.name, 'tokens.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_get_remove(self):
+        cache = TokenCache(self.cache_file, expiry_margin=60)
+        key = get_token_key('ftd', 443, 'admin', 'latest', 'password')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 'token1', 1800)
+        # Another instance (e.g. the next process) sees the token
+        self.assertEqual(TokenCache(self.cache_file).get(key), 'token1')
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache_file).st_mode), 0o600)
+        # Expires within the margin
+        cache.put(key, 'token2', 30)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 'token3', 1800)
+        cache.remove(key)
+        self.assertIsNone(cache.get(key))
+
+    def test_client_reuses_and_replaces_token(self):
+        token_responses = [FakeResponse(200, {'access_token': 'token1', 'expires_in': 1800}),
+                           FakeResponse(200, {'access_token': 'token2', 'expires_in': 1800})]
+        with mock.patch('requests.Session.post', side_effect=token_responses) as post_mock:
+            FTDClient(address='ftd', token_cache=TokenCache(self.cache_file)).login()
+            client = FTDClient(address='ftd', token_cache=TokenCache(self.cache_file))
+            client.login()
+            self.assertEqual(client.access_token, 'token1')
+            self.assertEqual(post_mock.call_count, 1)
+
+            # The device rejects the cached token, the client logs in again and retries
+            request_responses = [FakeResponse(401), FakeResponse(200, {'items': []})]
+            with mock.patch('requests.Session.request', side_effect=request_responses) as request_mock:
+                response = client.do_get_raw_with_base_url('/object/networks')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(post_mock.call_count, 2)
+            self.assertEqual(request_mock.call_args[1]['headers']['Authorization'], 'Bearer token2')
+            self.assertEqual(TokenCache(self.cache_file).get(client._get_token_key('password')), 'token2')
+
+    def test_logout_custom_cached_token(self):
+        token_responses = [FakeResponse(200, {'access_token': 'admin1', 'expires_in': 1800}),
+                           FakeResponse(200, {'access_token': 'custom1', 'expires_in': 86400})]
+        with mock.patch('requests.Session.post', side_effect=token_responses):
+            FTDClient(address='ftd', token_cache=TokenCache(self.cache_file)).login_custom()
+        client = FTDClient(address='ftd', token_cache=TokenCache(self.cache_file))
+        with mock.patch('requests.Session.post') as post_mock:
+            client.login_custom()
+            self.assertEqual(client.access_token, 'custom1')
+            # the cached custom token came without an admin token, nothing is sent with a None token
+            with self.assertLogs(level='WARNING'):
+                client.logout_custom()
+            self.assertEqual(post_mock.call_count, 0)
+        self.assertIsNone(client.access_token)
+        self.assertIsNone(TokenCache(self.cache_file).get(client._get_token_key('custom')))
+
+        admin_client = FTDClient(address='ftd')
+        admin_client.original_access_token = 'admin2'
+        client.original_custom_token = 'custom1'
+        with mock.patch('requests.Session.post', return_value=FakeResponse(200, {})) as post_mock:
+            client.logout_custom(admin_client=admin_client)
+        self.assertIn('"access_token": "admin2"', post_mock.call_args[1]['data'])
@@ -0,0 +1,54 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import json
+import tempfile
+import unittest
+from ftd_api.tracing import Tracer
+from ftd_api.tracing import JsonLinesTraceExporter
+
+
+class TestTracing(unittest.TestCase):
+
+    def test_nested_spans_written_as_trace_events(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            trace_file = f'{temp_directory}/trace.json'
+            tracer = Tracer(JsonLinesTraceExporter(trace_file))
+            with tracer.span('bulk_export', output_format='CSV'):
+                with tracer.span('download') as span:
+                    span.set_attribute('bytes', 1024)
+                with self.assertRaises(ValueError):
+                    with tracer.span('convert'):
+                        raise ValueError('bad data')
+            tracer.exporter.close()
+
+            with open(trace_file) as file_handle:
+                lines = file_handle.read().splitlines()
+                file_handle.seek(0)
+                events = json.load(file_handle)
+            # one event per line between the brackets
+            self.assertEqual(len(lines), len(events) + 2)
+            by_name = {x['name']: x for x in events}
+            self.assertEqual(by_name['download']['ph'], 'X')
+            self.assertEqual(by_name['download']['args']['bytes'], 1024)
+            self.assertEqual(by_name['download']['args']['parent_id'], by_name['bulk_export']['args']['span_id'])
+            self.assertEqual(by_name['convert']['args']['error'], 'bad data')
+            self.assertIsNone(by_name['bulk_export']['args']['parent_id'])
+            self.assertEqual(by_name['bulk_export']['args']['output_format'], 'CSV')
+
+    def test_disabled_tracer(self):
+        tracer = Tracer()
+        with tracer.span('noop') as span:
+            span.set_attribute('ignored', True)
+            tracer.current_span().set_attribute('ignored', True)
+        self.assertFalse(tracer.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
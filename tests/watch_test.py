@@ -0,0 +1,70 @@
+'''
+Copyright (c) 2020 Cisco and/or its affiliates.
+
+A copy of the License (MIT License) can be found in the LICENSE.TXT
+file of this software.
+
+Author: Jared T. Smith <jarmith@cisco.com>
+Created: Oct 19, 2026
+'''
+import os
+import tempfile
+import unittest
+from ftd_api.parse_ndjson import read_ndjson_file
+from ftd_api.watch import PendingChangeWatcher
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.pending_changes = []
+
+    def do_get_multi_page(self, url, filter_system_defined=True):
+        return [dict(x) for x in self.pending_changes]
+
+
+def pending_change(entity_id, name, version='a'):
+    return {'entityId': entity_id, 'entityType': 'networkobject', 'entityName': name,
+            'currentEntity': {'name': name}, 'version': version}
+
+
+class TestWatch(unittest.TestCase):
+
+    def test_events_and_cursor(self):
+        with tempfile.TemporaryDirectory() as directory:
+            event_file = os.path.join(directory, 'events.ndjson')
+            cursor_file = os.path.join(directory, 'events.cursor')
+            client = FakeClient()
+            watcher = PendingChangeWatcher(client, event_file, cursor_file)
+            self.assertEqual(watcher.poll(), [])
+
+            client.pending_changes = [pending_change('1', 'a'), pending_change('2', 'b')]
+            self.assertEqual([x['event'] for x in watcher.poll()], ['NEW', 'NEW'])
+            # Only the version changed, nothing to report
+            client.pending_changes = [pending_change('1', 'a', version='b'), pending_change('2', 'b')]
+            self.assertEqual(watcher.poll(), [])
+
+            # A restarted watcher picks up the cursor
+            watcher = PendingChangeWatcher(client, event_file, cursor_file)
+            client.pending_changes = [pending_change('1', 'a2'), pending_change('2', 'b'), pending_change('3', 'c')]
+            event_list = watcher.poll()
+            self.assertEqual([(x['event'], x['entity_id']) for x in event_list], [('MODIFIED', '1'), ('NEW', '3')])
+
+            # Deployed changes are forgotten, the same entity changing again is new
+            client.pending_changes = []
+            watcher.poll()
+            client.pending_changes = [pending_change('1', 'a2')]
+            self.assertEqual(watcher.poll()[0]['event'], 'NEW')
+
+            events = list(read_ndjson_file(event_file))
+            self.assertEqual([x['sequence'] for x in events], [1, 2, 3, 4, 5])
+            self.assertEqual(events[2]['entity_name'], 'a2')
+
+    def test_adaptive_interval(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = FakeClient()
+            watcher = PendingChangeWatcher(client, os.path.join(directory, 'events.ndjson'), os.path.join(directory, 'c'),
+                                           min_interval=0.001, max_interval=0.004)
+            watcher.run(max_polls=4)
+            self.assertEqual(watcher.interval, 0.004)
+            self.assertEqual(watcher._next_interval(1), 0.001)